@@ -1,10 +1,11 @@
 import os
-import pandas as pd
-from flask import Flask, render_template, jsonify
+import time
+from flask import Flask, Response, g, render_template, jsonify, request
 
-# Local utilities
-from src.Utils.tools import load_table
+# Local utilities (pandas / numpy-backed modules, the model registry included, are imported
+# inside the routes that need them, so worker boot and /health don't pay for pandas / numpy)
 from src.Utils.config_loader import load_config
+from src.Utils import metrics
 
 # Load configuration
 config = load_config()
@@ -12,9 +13,28 @@ config = load_config()
 # Initialize Flask app
 app = Flask(__name__, template_folder="templates")
 
+# Request timings + hot-path spans, scraped from /metrics ([metrics] flask = false turns them off)
+if config.get("metrics", {}).get("flask", True):
+    metrics.enable()
+
+
+@app.before_request
+def _start_timer():
+    g.started = time.perf_counter()
+
+
+@app.after_request
+def _record_request(response):
+    if metrics.enabled() and "started" in g:
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        metrics.observe("http_request", time.perf_counter() - g.started,
+                        route=route, method=request.method, status=response.status_code)
+    return response
+
 # ✅ Home route — show dashboard
 @app.route("/")
 def index():
+    from src.Utils.tools import load_table
     try:
         # Load today’s NFL games from SQLite
         games = load_table("todays_games")
@@ -39,6 +59,7 @@ def index():
 # ✅ API route — return data as JSON for optional frontend/chart usage
 @app.route("/api/games")
 def api_games():
+    from src.Utils.tools import load_table
     try:
         games = load_table("todays_games")
         if games is None or games.empty:
@@ -51,14 +72,122 @@ def api_games():
         return jsonify({"error": str(e)}), 500
 
 
+# ✅ Cached per-model probabilities, EV and Kelly sizing for today's games
+#    (recomputed only when todays_games or a model file changes; honours If-None-Match / If-Modified-Since)
+@app.route("/api/predictions")
+def api_predictions():
+    from src.Predict import Prediction_Service
+    try:
+        entry = Prediction_Service.get_predictions()
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    if not entry["predictions"]:
+        return jsonify({"message": "No games found"}), 404
+
+    response = jsonify(entry["predictions"])
+    response.set_etag(entry["etag"])
+    response.last_modified = entry["last_modified"]
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+
+# ✅ Logged predictions by indexed lookup (no rescoring):
+#    /api/predictions/history?game_id=2024_05_NO_KC&model=xgb_ml&latest=1  (game_id may repeat; limit=N)
+@app.route("/api/predictions/history")
+def api_prediction_history():
+    from src.Predict import Prediction_Log
+    try:
+        rows = Prediction_Log.lookup(request.args.getlist("game_id"), model=request.args.get("model"),
+                                     model_hash=request.args.get("model_hash"),
+                                     latest=request.args.get("latest", "0") not in ("", "0"),
+                                     limit=request.args.get("limit", type=int))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    return jsonify(rows.to_dict(orient="records"))
+
+
+# ✅ Slate-level Kelly staking over today's cached predictions:
+#    /api/portfolio?family=xgb&bankroll=1000  (caps + fractional Kelly from [portfolio] in config.toml)
+@app.route("/api/portfolio")
+def api_portfolio():
+    from src.Predict import Prediction_Service
+    try:
+        bankroll = request.args.get("bankroll", type=float)
+        portfolio = Prediction_Service.get_portfolio(request.args.get("family"), bankroll)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    if not portfolio["summary"]["games"]:
+        return jsonify({"message": "No games found"}), 404
+    return jsonify(portfolio)
+
+
+# ✅ Online predictions for ad-hoc feature rows or today's matchups, micro-batched across
+#    concurrent requests:  {"matchups": ["BUF@KC"]}  or  {"rows": [{feature: value, ...}]},
+#    optional "families": ["xgb", "nn", "log"]
+@app.route("/api/predict", methods=["POST"])
+def api_predict():
+    from src.Predict import Micro_Batcher, Prediction_Service
+    from src.Predict.Batch_Predictor import FAMILIES
+    payload = request.get_json(silent=True) or {}
+    families = payload.get("families") or list(FAMILIES)
+    unknown = [f for f in families if f not in FAMILIES]
+    if unknown:
+        return jsonify({"error": f"Unknown model families: {unknown}"}), 400
+
+    try:
+        if payload.get("matchups"):
+            ids = list(payload["matchups"])
+            X = Prediction_Service.matchup_features(ids)
+        elif payload.get("rows"):
+            ids = None
+            X = Prediction_Service.row_features(payload["rows"])
+        else:
+            return jsonify({"error": "Send 'matchups' (AWAY@HOME ids) or 'rows' (feature dicts)"}), 400
+    except (KeyError, ValueError, TypeError) as e:
+        return jsonify({"error": str(e).strip('"')}), 400
+
+    try:
+        probs, errors = Micro_Batcher.get_batcher().predict(X, families)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    predictions = probs.round(4).to_dict(orient="records")
+    if ids is not None:
+        for matchup, record in zip(ids, predictions):
+            record["matchup"] = matchup
+    return jsonify({"predictions": predictions, "errors": errors})
+
+
+# ✅ Models currently held in memory by the registry
+@app.route("/api/models")
+def api_models():
+    from src.Predict import Model_Registry
+    return jsonify(Model_Registry.model_info()), 200
+
+
+# ✅ Prometheus scrape endpoint (span timings, counters, uptime)
+@app.route("/metrics")
+def metrics_endpoint():
+    return Response(metrics.prometheus_text(), mimetype="text/plain; version=0.0.4")
+
+
 # ✅ Health check
 @app.route("/health")
 def health():
     return jsonify({"status": "ok"}), 200
 
 
-# ✅ Entry point
+# ✅ Entry point: waitress (multi-threaded WSGI) in one process, so the micro-batcher can
+#    coalesce requests from every thread; FLASK_DEBUG=1 keeps the old dev server
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 5000))
     print(f"🚀 Starting Flask server on http://127.0.0.1:{port}")
-    app.run(host="0.0.0.0", port=port, debug=True)
+    if os.environ.get("FLASK_DEBUG", "") not in ("", "0"):
+        app.run(host="0.0.0.0", port=port, debug=True)
+    else:
+        from waitress import serve
+        serve(app, host="0.0.0.0", port=port, threads=config.get("server", {}).get("threads", 32))
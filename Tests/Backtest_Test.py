@@ -0,0 +1,54 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.Backtest import Backtester, Staking
+
+
+class TestStaking(unittest.TestCase):
+
+    def setUp(self):
+        # two weeks, two -110 games each: win, loss | win, push
+        self.bets = Staking.pick_sides(prob=[0.6, 0.6, 0.6, 0.6], odds_a=[-110] * 4, odds_b=[-110] * 4,
+                                       outcome=np.array([1, 0, 1, -1]))
+        self.period = np.array([1, 1, 2, 2])
+
+    def test_pick_sides(self):
+        self.assertTrue(self.bets["side_a"].all())
+        np.testing.assert_allclose(self.bets["ret"], [100 / 110, -1, 100 / 110, 0])
+
+    def test_flat_sweep(self):
+        result = Staking.simulate(self.bets, self.period, "flat", params=[0.5, 0.7])
+        self.assertEqual(result["bets"].tolist(), [4, 0])
+        self.assertAlmostEqual(result["profit"][0], round(2 * 100 / 110 - 1, 2))
+        self.assertEqual(result["profit"][1], 0)
+
+    def test_kelly_compounds_weekly(self):
+        result = Staking.simulate(self.bets, self.period, "kelly", params=[1.0], bankroll=100)
+        f = (100 / 110 * 0.6 - 0.4) / (100 / 110)
+        week1 = 1 + f * (100 / 110) - f
+        week2 = 1 + f * (100 / 110)
+        self.assertAlmostEqual(result["final_bankroll"][0], round(100 * week1 * week2, 2))
+
+    def test_calibration(self):
+        table = Staking.calibration([0.05, 0.15, 0.95, 0.95], [0, 1, 1, 0], bins=10)
+        self.assertEqual(table["count"].sum(), 4)
+        self.assertEqual(table.loc[9, "observed"], 0.5)
+
+
+class TestWalkForward(unittest.TestCase):
+
+    def test_only_future_seasons_scored(self):
+        rng = np.random.default_rng(0)
+        n = 400
+        season = np.repeat([2019, 2020, 2021, 2022], n // 4)
+        week = np.tile(np.repeat([1, 2], n // 8), 4)
+        X = np.column_stack([season, week, rng.normal(size=n)])
+        data = {"X": X, "y": (X[:, 2] > 0).astype(int), "season": season, "week": week,
+                "odds_a": np.full(n, -110.0), "odds_b": np.full(n, -110.0)}
+        predictions = Backtester.walk_forward(data, "log", window=2)
+        self.assertEqual(sorted(predictions["season"].unique()), [2021, 2022])
+        report = Backtester.evaluate(predictions)
+        self.assertGreater(report["accuracy"], 0.9)
+        self.assertEqual(set(report["results"]["strategy"]), {"flat", "ev", "kelly"})
@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import joblib
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from sklearn.linear_model import LogisticRegression
+
+from src.Predict import Batch_Predictor, Model_Registry
+
+
+class TestBatchPredictor(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(1)
+        self.X = rng.normal(size=(40, 4))
+        y = (self.X[:, 0] > 0).astype(int)
+        models = {}
+        for key, labels in (("ml", y), ("ou", 1 - y)):
+            models[f"log_{key}"] = os.path.join(self.tmp.name, f"log_{key}.pkl")
+            joblib.dump(LogisticRegression().fit(self.X, labels), models[f"log_{key}"])
+            booster = xgb.train({"objective": "multi:softprob", "num_class": 2},
+                                xgb.DMatrix(self.X, label=labels), num_boost_round=3)
+            models[f"xgb_{key}"] = os.path.join(self.tmp.name, f"xgb_{key}.json")
+            booster.save_model(models[f"xgb_{key}"])
+        self.models = models
+        self.patch = mock.patch.object(Model_Registry, "load_config", return_value={"models": models})
+        self.patch.start()
+
+    def tearDown(self):
+        self.patch.stop()
+        Model_Registry.clear()
+        self.tmp.cleanup()
+
+    def test_positive_proba(self):
+        np.testing.assert_array_equal(Batch_Predictor.positive_proba([[0.3, 0.7], [0.9, 0.1]]), [0.7, 0.1])
+        np.testing.assert_array_equal(Batch_Predictor.positive_proba([[0.7], [0.1]]), [0.7, 0.1])
+        np.testing.assert_array_equal(Batch_Predictor.positive_proba([0.7, 0.1]), [0.7, 0.1])
+        with self.assertRaises(ValueError):   # [-1, 0, 1] classes: column 0 would be P(push)
+            Batch_Predictor.positive_proba([[0.06, 0.37, 0.57]])
+
+    def test_l2_normalize(self):
+        out = Batch_Predictor.l2_normalize(np.array([[3.0, 4.0], [0.0, 0.0]]))
+        np.testing.assert_allclose(out, [[0.6, 0.8], [0.0, 0.0]])
+
+    def test_predict_batch_columns(self):
+        games = pd.DataFrame(self.X, columns=["a", "b", "c", "d"])
+        games["home_team"], games["away_team"], games["gameday"] = "KC", "BUF", "2024-10-06"
+        result = Batch_Predictor.predict_batch(games, families=("xgb", "log", "nn"), errors="ignore")
+        self.assertEqual(list(result.columns), ["gameday", "home_team", "away_team",
+                                                "xgb_ml", "xgb_ou", "log_ml", "log_ou"])
+        self.assertIn("nn", result.attrs["errors"])
+        expected = joblib.load(self.models["log_ml"]).predict_proba(self.X)[:, 1]
+        np.testing.assert_allclose(result["log_ml"], expected)
+
+    def test_dmatrix_built_once(self):
+        batch = Batch_Predictor.FeatureBatch(self.X)
+        with mock.patch.object(xgb, "DMatrix", wraps=xgb.DMatrix) as dmatrix:
+            Batch_Predictor.predict_family("xgb", batch)
+            Batch_Predictor.predict_family("xgb", batch)
+        self.assertEqual(dmatrix.call_count, 1)
@@ -0,0 +1,36 @@
+import os
+import tempfile
+import unittest
+
+from benchmarks import run as benchmarks
+
+
+class TestBenchmarks(unittest.TestCase):
+
+    def test_quick_run_is_sandboxed(self):
+        cwd = os.getcwd()
+        result = benchmarks.run_benchmarks("quick", select="odds.")
+        self.assertEqual(os.getcwd(), cwd)
+        self.assertEqual(set(result["results"]), {"odds.vectorized_100k", "odds.scalar_1k"})
+        for timing in result["results"].values():
+            self.assertGreater(timing["median"], 0)
+            self.assertGreaterEqual(timing["repeat"], 2)
+
+    def test_regressions_against_baseline(self):
+        baseline = {"results": {"a": {"median": 1.0}, "b": {"median": 1.0}, "c": {"skipped": True}}}
+        run = {"mode": "quick", "results": {"a": {"median": 1.1}, "b": {"median": 1.5}, "c": {"median": 9.0},
+                                            "d": {"median": 2.0}}}
+        self.assertEqual([r[0] for r in benchmarks.compare(run, baseline, tolerance=0.2)], ["b"])
+
+    def test_history_and_baseline_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            first = {"mode": "quick", "results": {"a": {"median": 1.0}}}
+            benchmarks.save_run(first, tmp, baseline=True)
+            benchmarks.save_run({"mode": "quick", "results": {"a": {"median": 3.0}}}, tmp)
+            with open(os.path.join(tmp, "history.jsonl")) as f:
+                self.assertEqual(len(f.readlines()), 2)
+            self.assertEqual(benchmarks.load_baselines(tmp), {"quick": first})
+
+
+if __name__ == '__main__':
+    unittest.main()
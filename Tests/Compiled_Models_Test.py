@@ -0,0 +1,95 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import xgboost as xgb
+
+from src.Predict import Compiled_Models, Model_Registry
+from src.Predict.Batch_Predictor import predict_batch
+
+
+def _data(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, 6))
+    X[::9, 2] = np.nan
+    y = (np.nan_to_num(X[:, 0]) + 0.5 * X[:, 1] + rng.normal(0, 0.5, n) > 0).astype(int)
+    return X, y
+
+
+class TestCompiledModels(unittest.TestCase):
+
+    def setUp(self):
+        Model_Registry.clear()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.X, self.y = _data()
+
+    def tearDown(self):
+        Model_Registry.clear()
+        self.tmp.cleanup()
+
+    def _train(self, name, params, rounds=60):
+        path = os.path.join(self.tmp.name, name)
+        xgb.train(params, xgb.DMatrix(self.X, label=self.y), rounds).save_model(path)
+        return path
+
+    def test_tree_parity(self):
+        for params in ({"objective": "binary:logistic", "max_depth": 4},
+                       {"objective": "binary:logistic", "max_depth": 1, "base_score": 0.3},
+                       {"objective": "multi:softprob", "num_class": 2, "max_depth": 3}):
+            booster = xgb.Booster(model_file=self._train("model.json", params))
+            expected = booster.predict(xgb.DMatrix(self.X))
+            expected = expected[:, 1] if expected.ndim == 2 else expected
+            got = Compiled_Models.compile_xgb(booster).predict(self.X)
+            np.testing.assert_allclose(got, expected, atol=1e-5, err_msg=str(params))
+
+    def test_mlp_forward_pass(self):
+        rng = np.random.default_rng(1)
+        W0, b0, W1, b1 = rng.normal(size=(6, 4)), rng.normal(size=4), rng.normal(size=(4, 1)), rng.normal(size=1)
+        mlp = Compiled_Models.CompiledMLP(
+            {"steps": [{"op": "dense", "activation": "relu"}, {"op": "dense", "activation": "sigmoid"}]},
+            {"w0": W0, "b0": b0, "w1": W1, "b1": b1})
+        X = rng.normal(size=(5, 6))
+        expected = 1 / (1 + np.exp(-(np.maximum(X @ W0 + b0, 0) @ W1 + b1)))
+        np.testing.assert_allclose(mlp.predict(X), expected[:, 0])
+
+    def test_export_roundtrip_and_registry_preference(self):
+        path = self._train("xgb_ml.json", {"objective": "binary:logistic", "max_depth": 3})
+        diff = Compiled_Models.export_model("xgb_ml", self.X, path=path)
+        self.assertLess(diff, 1e-5)
+        artifact = Compiled_Models.artifact_path(path)
+        self.assertEqual(artifact, os.path.join(self.tmp.name, "xgb_ml.compiled.npz"))
+
+        model = Model_Registry.get_model("xgb_ml", path=path)
+        self.assertIsInstance(model, Compiled_Models.CompiledTrees)
+        self.assertIsInstance(Model_Registry.get_model("xgb_ml", path=path, compiled=False), xgb.Booster)
+        self.assertIs(Model_Registry.get_model("xgb_ml", path=path), model)
+
+        # the batch engine gives the same probabilities through either path
+        models = {"xgb_ml": path, "xgb_ou": path}
+        with mock.patch.object(Model_Registry, "load_config", return_value={"models": models}):
+            compiled = predict_batch(X=self.X[:16], families=("xgb",))
+            native = predict_batch(X=self.X, families=("xgb",)).iloc[:16]   # > COMPILED_TREE_MAX_ROWS
+            with mock.patch.object(Model_Registry, "load_config",
+                                   return_value={"models": models, "inference": {"compiled": False}}):
+                disabled = predict_batch(X=self.X[:16], families=("xgb",))
+        np.testing.assert_allclose(compiled.to_numpy(), native.to_numpy(), atol=1e-5)
+        np.testing.assert_allclose(compiled.to_numpy(), disabled.to_numpy(), atol=1e-5)
+
+    def test_stale_artifact_falls_back(self):
+        path = self._train("xgb_ml.json", {"objective": "binary:logistic", "max_depth": 3})
+        Compiled_Models.export_model("xgb_ml", self.X, path=path)
+        self._train("xgb_ml.json", {"objective": "binary:logistic", "max_depth": 2}, rounds=10)
+        self.assertIsInstance(Model_Registry.get_model("xgb_ml", path=path), xgb.Booster)
+
+    def test_parity_failure_writes_nothing(self):
+        path = self._train("xgb_ml.json", {"objective": "binary:logistic", "max_depth": 3})
+        with mock.patch.object(Compiled_Models.CompiledTrees, "predict", lambda self, X, **_: np.zeros(len(X))):
+            with self.assertRaises(ValueError):
+                Compiled_Models.export_model("xgb_ml", self.X, path=path)
+        self.assertFalse(os.path.exists(Compiled_Models.artifact_path(path)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import os
+import tempfile
+import time
+import unittest
+
+import pandas as pd
+
+from src.DataProviders.DataCache import cached_file, cached_import
+
+
+class TestDataCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.calls = []
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def fetch(self, seasons):
+        self.calls.append(list(seasons))
+        return pd.DataFrame({"season": seasons, "value": [s * 2 for s in seasons]})
+
+    def load(self, seasons, **kwargs):
+        kwargs = {"cache_dir": self.tmp.name, "ttl_hours": 1, "offline": False, "current_season": 2024, **kwargs}
+        return cached_import("test", self.fetch, seasons, **kwargs)
+
+    def test_finished_seasons_fetched_once(self):
+        self.load([2022, 2023])
+        df = self.load([2022, 2023])
+        self.assertEqual(self.calls, [[2022, 2023]])
+        self.assertEqual(sorted(df["value"]), [4044, 4046])
+
+    def test_current_season_expires(self):
+        self.load([2023, 2024])
+        path = os.path.join(self.tmp.name, "test_2024.parquet")
+        old = time.time() - 2 * 3600
+        os.utime(path, (old, old))
+        self.load([2023, 2024])
+        self.assertEqual(self.calls, [[2023, 2024], [2024]])
+
+    def test_offline_serves_stale_cache_and_fails_on_miss(self):
+        self.load([2024])
+        self.load([2024], ttl_hours=0, offline=True)
+        self.assertEqual(len(self.calls), 1)
+        with self.assertRaises(FileNotFoundError):
+            self.load([2020], offline=True)
+
+    def test_empty_seasons_are_not_cached(self):
+        def empty(seasons):
+            self.calls.append(list(seasons))
+            return pd.DataFrame({"season": [], "value": []})
+
+        settings = {"cache_dir": self.tmp.name, "offline": False, "current_season": 2024}
+        cached_import("empty", empty, [2025], **settings)
+        cached_import("empty", empty, [2025], **settings)
+        self.assertEqual(self.calls, [[2025], [2025]])   # not published yet: asked again next time
+        self.assertIsNone(cached_file("empty", empty, 2025, **settings))
+        self.assertEqual(os.listdir(self.tmp.name), [])
+
+    def test_cached_file_fetches_once_and_returns_path(self):
+        path = cached_file("test", self.fetch, 2023, cache_dir=self.tmp.name, offline=False, current_season=2024)
+        again = cached_file("test", self.fetch, 2023, cache_dir=self.tmp.name, offline=False, current_season=2024)
+        self.assertEqual(path, again)
+        self.assertEqual(self.calls, [[2023]])
+        self.assertEqual(pd.read_parquet(path)["value"].tolist(), [4046])
+        self.assertEqual(self.load([2023])["value"].tolist(), [4046])   # same file serves cached_import
+        self.assertEqual(len(self.calls), 1)
@@ -0,0 +1,68 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+
+import pandas as pd
+
+from src.Utils import db, tools
+
+
+class TestDb(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "test.sqlite")
+        self.df = pd.DataFrame({
+            "season": [2023, 2024, 2024],
+            "week": [1, 1, 2],
+            "home_team": ["KC", "PHI", "DAL"],
+            "away_team": ["DET", "GB", "NYG"],
+        })
+        tools.save_table(self.df, "features_all", self.path)
+
+    def tearDown(self):
+        db.close_all()
+        self.tmp.cleanup()
+
+    def test_wal_mode(self):
+        with db.connect(self.path) as conn:
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+
+    def test_connections_are_reused(self):
+        with db.connect(self.path) as first:
+            pass
+        with db.connect(self.path) as second:
+            self.assertIs(first, second)
+
+    def test_indexes_created(self):
+        with db.connect(self.path) as conn:
+            names = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        self.assertIn("idx_features_all_season_week", names)
+        self.assertIn("idx_features_all_home_team_away_team", names)
+
+    def test_parameterized_where(self):
+        df = tools.load_table("features_all", self.path, where={"season": 2024, "week": 2})
+        self.assertEqual(df["home_team"].tolist(), ["DAL"])
+
+    def test_rejects_bad_identifier(self):
+        with self.assertRaises(ValueError):
+            tools.load_table("features_all; DROP TABLE features_all", self.path)
+
+    def test_concurrent_readers(self):
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(len(tools.load_table("features_all", self.path))))
+                   for _ in range(16)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(results, [3] * 16)
+
+    def test_rollback_on_error(self):
+        with self.assertRaises(sqlite3.OperationalError):
+            with db.connect(self.path) as conn:
+                conn.execute("DELETE FROM features_all")
+                conn.execute("SELECT * FROM missing_table")
+        self.assertEqual(len(tools.load_table("features_all", self.path)), 3)
@@ -0,0 +1,100 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import joblib
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+
+from benchmarks import synthetic
+from src.Predict import Ensemble, Model_Registry
+from src.Predict.Batch_Predictor import predict_batch
+from src.Utils import db, stacking, tools
+
+
+def _oof(n=3000, seed=0):
+    """Two noisy, miscalibrated views of the same true probability."""
+    rng = np.random.default_rng(seed)
+    true = rng.uniform(0.1, 0.9, n)
+    y = (rng.uniform(size=n) < true).astype(int)
+    z = Ensemble.logit(true)
+    P = np.column_stack([Ensemble.sigmoid(2.5 * z + rng.normal(0, 0.3, n)),
+                         Ensemble.sigmoid(0.5 * z + rng.normal(0, 0.3, n))])
+    return P, y, np.arange(n) % 5
+
+
+class TestEnsemble(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        Model_Registry.clear()
+        db.close_all()
+        self.tmp.cleanup()
+
+    def test_meta_and_calibration_beat_base_models(self):
+        P, y, folds = _oof()
+        for method, calibration in (("stacking", "isotonic"), ("stacking", "platt"), ("average", "none")):
+            spec, _, report = stacking.fit_market(P, y, folds, ["xgb", "log"], method, calibration)
+            best_base = min(report["xgb"]["log_loss"], report["log"]["log_loss"])
+            self.assertLess(report["calibrated"]["log_loss"], best_base, (method, calibration))
+        self.assertAlmostEqual(sum(spec["weights"]), 1.0)
+
+    def test_artifact_roundtrip(self):
+        P, y, folds = _oof()
+        spec, arrays, _ = stacking.fit_market(P, y, folds, ["xgb", "log"], "stacking", "isotonic")
+        ensemble = Ensemble.Ensemble({"markets": {"ml": spec, "ou": spec}},
+                                     {f"{m}_{k}": v for m in ("ml", "ou") for k, v in arrays.items()})
+        path = os.path.join(self.tmp.name, "ensemble.npz")
+        ensemble.save(path)
+        loaded = Ensemble.load_ensemble(path)
+        self.assertEqual(loaded.families, ["xgb", "log"])
+        np.testing.assert_allclose(loaded.predict("ml", P[:50]), ensemble.predict("ml", P[:50]))
+        probs = loaded.predict("ou", P)
+        self.assertTrue(((probs >= 0) & (probs <= 1)).all())
+
+    def test_train_and_predict_end_to_end(self):
+        db_path = os.path.join(self.tmp.name, "dataset.sqlite")
+        features = synthetic.features(seasons=range(2019, 2024))
+        tools.save_table(features, "features_all", db_path)
+        X = features[synthetic.FEATURE_COLUMNS].drop(columns=["gameday", "home_team", "away_team"]).to_numpy(float)
+
+        models = {"ensemble": os.path.join(self.tmp.name, "Ensemble", "ensemble.npz")}
+        for market, label in (("ml", "home_win"), ("ou", "ou_cover")):
+            models[f"log_{market}"] = os.path.join(self.tmp.name, f"log_{market}.pkl")
+            joblib.dump(LogisticRegression(max_iter=1000).fit(X, features[label]), models[f"log_{market}"])
+            models[f"xgb_{market}"] = os.path.join(self.tmp.name, f"xgb_{market}.json")
+        config = {"models": models, "tuned": {"xgb_ml": {"num_boost_round": 20}, "xgb_ou": {"num_boost_round": 20}},
+                  "ensemble": {"families": ["xgb", "log"], "folds": 5, "calibration": "platt"}}
+
+        import xgboost as xgb
+        for market, label in (("ml", "home_win"), ("ou", "ou_cover")):
+            xgb.train({"objective": "binary:logistic", "max_depth": 3}, xgb.DMatrix(X, label=features[label]),
+                      20).save_model(models[f"xgb_{market}"])
+
+        with mock.patch.object(stacking, "load_config", return_value=config), \
+                mock.patch.object(Model_Registry, "load_config", return_value=config):
+            trained = stacking.train_ensemble(db_path=db_path)
+            games = features[synthetic.FEATURE_COLUMNS].iloc[:16].reset_index(drop=True)
+            results = Ensemble.predict_ensemble(games)
+            base = predict_batch(games, ["xgb", "log"])
+
+        self.assertTrue(os.path.exists(models["ensemble"]))
+        self.assertEqual(trained.spec["markets"]["ml"]["families"], ["xgb", "log"])
+        self.assertIn("calibrated", trained.spec["markets"]["ou"]["oof"])
+        P = np.column_stack([base["xgb_ml"], base["log_ml"]])
+        np.testing.assert_allclose(results["ensemble_ml"], trained.predict("ml", P))
+        self.assertTrue(results[["ensemble_ml", "ensemble_ou"]].apply(lambda c: c.between(0, 1)).all().all())
+
+    def test_season_folds_keep_seasons_together(self):
+        seasons = np.repeat([2019, 2020, 2021, 2022], 3)
+        folds = stacking.season_folds(seasons, 3)
+        for season in np.unique(seasons):
+            self.assertEqual(len(set(folds[seasons == season])), 1)
+        self.assertEqual(len(np.unique(folds)), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.Utils import db, tools
+
+
+def _features():
+    return pd.DataFrame({
+        "season": [2023, 2023, 2024],
+        "week": [1, 2, 1],
+        "gameday": ["2023-09-10", "2023-09-17", "2024-09-08"],
+        "home_team": ["KC", "BUF", "PHI"],
+        "away_team": ["DET", "LV", "GB"],
+        "spread_line": [3.5, -2.5, 1.0],
+        "total_line": [47.5, 44.0, 49.0],
+        "home_win": [0, 1, 1],
+        "ou_cover": [1, 0, 1],
+    })
+
+
+class TestFeatureStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = os.path.join(self.tmp.name, "test.sqlite")
+        tools.upsert_partitions(_features(), "features_all", db_path=self.db, replace=True)
+        self.store = tools.store_dir_for(self.db)
+
+    def tearDown(self):
+        db.close_all()
+        self.tmp.cleanup()
+
+    def test_store_written_with_sqlite(self):
+        X, columns = tools.load_feature_matrix("features_all", store_dir=self.store)
+        self.assertEqual(columns, ["season", "week", "spread_line", "total_line"])
+        self.assertIsInstance(X, np.memmap)
+        np.testing.assert_array_equal(tools.load_store_column("home_team", store_dir=self.store), ["KC", "BUF", "PHI"])
+
+    def test_column_projection(self):
+        X, columns = tools.load_feature_matrix("features_all", columns=["total_line"], store_dir=self.store)
+        self.assertEqual(X.shape, (3, 1))
+        self.assertEqual(X[:, 0].tolist(), [47.5, 44.0, 49.0])
+
+    def test_training_data_follows_sqlite(self):
+        df = _features()
+        df.loc[2, "home_win"] = 0
+        tools.save_table(df, "features_all", self.db)
+        X, y = tools.load_training_data("home_win", db_path=self.db)
+        self.assertEqual(y.tolist(), [0, 1, 0])
+        self.assertEqual(X.shape, (3, 4))
@@ -0,0 +1,101 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import joblib
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+
+from src.Predict import Model_Registry
+from src.Predict.Batch_Predictor import predict_batch
+from src.Utils import metrics
+
+
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.was_enabled = metrics.enabled()
+        metrics.reset()
+
+    def tearDown(self):
+        (metrics.enable if self.was_enabled else metrics.disable)()
+        metrics.reset()
+
+    def test_disabled_is_noop(self):
+        metrics.disable()
+        self.assertIs(metrics.span("load_table", table="x"), metrics._NOOP)
+        with metrics.span("load_table", table="x"):
+            pass
+        metrics.incr("rows_loaded", 5)
+        metrics.observe("http_request", 0.1)
+        self.assertEqual(metrics.summary()["spans"], [])
+        self.assertEqual(metrics.summary()["counters"], [])
+
+    def test_spans_and_counters(self):
+        metrics.enable()
+        for _ in range(3):
+            with metrics.span("load_table", table="features_all"):
+                pass
+        metrics.observe("load_table", 0.5, table="features_all")
+        metrics.incr("rows_loaded", 10, table="features_all")
+        metrics.incr("rows_loaded", 5, table="features_all")
+
+        summary = metrics.summary()
+        span = summary["spans"][0]
+        self.assertEqual((span["name"], span["labels"], span["count"]), ("load_table", {"table": "features_all"}, 4))
+        self.assertGreaterEqual(span["max_ms"], 500)
+        self.assertEqual(summary["counters"],
+                         [{"name": "rows_loaded", "labels": {"table": "features_all"}, "value": 15}])
+
+        text = metrics.prometheus_text()
+        self.assertIn('nfl_span_seconds_count{table="features_all",span="load_table"} 4', text)
+        self.assertIn("# TYPE nfl_rows_loaded_total counter", text)
+        self.assertIn('nfl_rows_loaded_total{table="features_all"} 15', text)
+
+    def test_write_summary(self):
+        metrics.enable()
+        metrics.incr("odds_moves", 2)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "run.json")
+            metrics.write_summary(path, argv=["-A"])
+            with open(path) as f:
+                data = json.load(f)
+        self.assertEqual(data["argv"], ["-A"])
+        self.assertEqual(data["counters"][0]["value"], 2)
+
+    def test_prediction_path_is_instrumented(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            rng = np.random.default_rng(0)
+            X, y = rng.normal(size=(30, 4)), rng.integers(0, 2, 30)
+            models = {"log_ml": os.path.join(tmp, "ml.pkl"), "log_ou": os.path.join(tmp, "ou.pkl")}
+            for path in models.values():
+                joblib.dump(LogisticRegression().fit(X, y), path)
+            metrics.enable()
+            with mock.patch.object(Model_Registry, "load_config", return_value={"models": models}):
+                predict_batch(X=X, families=("log",))
+                predict_batch(X=X, families=("log",))
+            Model_Registry.clear()
+
+        spans = {(s["name"], s["labels"].get("model")): s["count"] for s in metrics.summary()["spans"]}
+        counters = {(c["name"], c["labels"].get("model")): c["value"] for c in metrics.summary()["counters"]}
+        self.assertEqual(spans[("predict", "log_ml")], 2)
+        self.assertEqual(spans[("model_load", "log_ou")], 1)
+        self.assertEqual(counters[("rows_predicted", "log_ml")], 60)
+        self.assertEqual(counters[("model_cache_hits", "log_ml")], 1)
+
+    def test_metrics_route(self):
+        from Flask.app import app
+        metrics.enable()
+        client = app.test_client()
+        client.get("/health")
+        response = client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith("text/plain"))
+        self.assertIn('route="/health"', response.get_data(as_text=True))
+        self.assertIn('status="200"', response.get_data(as_text=True))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+
+from src.Predict import Micro_Batcher, Model_Registry, Prediction_Service
+from src.Predict.Batch_Predictor import predict_batch
+from src.Utils import db, tools
+
+
+def _games():
+    return pd.DataFrame({
+        "season": [2024, 2024],
+        "week": [5, 5],
+        "gameday": ["2024-10-06", "2024-10-06"],
+        "home_team": ["KC", "DAL"],
+        "away_team": ["NO", "PIT"],
+        "spread_line": [5.5, -1.0],
+        "total_line": [43.5, 44.0],
+        "home_moneyline": [-250.0, 110.0],
+        "away_moneyline": [200.0, -130.0],
+    })
+
+
+class TestMicroBatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = os.path.join(self.tmp.name, "test.sqlite")
+        rng = np.random.default_rng(0)
+        X, y = rng.normal(size=(50, 6)), rng.integers(0, 2, 50)
+        models = {key: os.path.join(self.tmp.name, f"{key}.pkl")
+                  for key in ("xgb_ml", "xgb_ou", "nn_ml", "nn_ou", "log_ml", "log_ou")}
+        joblib.dump(LogisticRegression().fit(X, y), models["log_ml"])
+        joblib.dump(LogisticRegression().fit(X, 1 - y), models["log_ou"])
+        self.patch = mock.patch.object(Model_Registry, "load_config", return_value={"models": models})
+        self.patch.start()
+        self.X = rng.normal(size=(40, 6))
+
+    def tearDown(self):
+        self.patch.stop()
+        Model_Registry.clear()
+        db.close_all()
+        self.tmp.cleanup()
+
+    def test_concurrent_requests_are_coalesced(self):
+        batcher = Micro_Batcher.MicroBatcher(max_batch=64, max_latency_ms=50, workers=1)
+        with ThreadPoolExecutor(max_workers=40) as pool:
+            results = list(pool.map(lambda i: batcher.predict(self.X[i], ("log",)), range(40)))
+        expected = predict_batch(X=self.X, families=("log",))
+        got = pd.concat([probs for probs, _ in results], ignore_index=True)
+        pd.testing.assert_frame_equal(got, expected)
+        self.assertEqual(batcher.stats["requests"], 40)
+        self.assertLess(batcher.stats["batches"], 40)
+
+    def test_failing_family_is_reported_not_raised(self):
+        batcher = Micro_Batcher.MicroBatcher(max_batch=8, max_latency_ms=1, workers=1)
+        probs, errors = batcher.predict(self.X[:3], ("log", "xgb"))
+        self.assertEqual(list(probs.columns), ["log_ml", "log_ou"])
+        self.assertIn("xgb", errors)
+
+    def test_predict_route(self):
+        from Flask.app import app
+        tools.save_table(_games(), "todays_games", self.db)
+        batcher = Micro_Batcher.MicroBatcher(max_batch=8, max_latency_ms=1, workers=1)
+        features = Prediction_Service.matchup_features(["PIT@DAL"], self.db)
+        with mock.patch.object(Micro_Batcher, "get_batcher", return_value=batcher), \
+                mock.patch.object(Prediction_Service, "matchup_features", return_value=features):
+            client = app.test_client()
+            ok = client.post("/api/predict", json={"matchups": ["PIT@DAL"], "families": ["log"]})
+            bad = client.post("/api/predict", json={"matchups": ["PIT@DAL"], "families": ["svm"]})
+            empty = client.post("/api/predict", json={})
+        self.assertEqual(ok.status_code, 200)
+        body = ok.get_json()
+        self.assertEqual(body["predictions"][0]["matchup"], "PIT@DAL")
+        expected = predict_batch(X=features, families=("log",))
+        self.assertAlmostEqual(body["predictions"][0]["log_ml"], round(expected["log_ml"][0], 4))
+        self.assertEqual(bad.status_code, 400)
+        self.assertEqual(empty.status_code, 400)
+
+    def test_unknown_matchup(self):
+        tools.save_table(_games(), "todays_games", self.db)
+        with self.assertRaises(KeyError):
+            Prediction_Service.matchup_features(["NYJ@KC"], self.db)
+
+
+if __name__ == '__main__':
+    unittest.main()
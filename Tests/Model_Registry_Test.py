@@ -0,0 +1,73 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import joblib
+import numpy as np
+import xgboost as xgb
+
+from src.Predict import Model_Registry
+
+
+class TestModelRegistry(unittest.TestCase):
+
+    def setUp(self):
+        Model_Registry.clear()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "model.pkl")
+        joblib.dump({"version": 1}, self.path)
+
+    def tearDown(self):
+        Model_Registry.clear()
+        self.tmp.cleanup()
+
+    def test_loads_once(self):
+        first = Model_Registry.get_model("log_ml", path=self.path)
+        second = Model_Registry.get_model("log_ml", path=self.path)
+        self.assertIs(first, second)
+
+    def test_touch_without_change_keeps_model(self):
+        first = Model_Registry.get_model("log_ml", path=self.path)
+        st = os.stat(self.path)
+        os.utime(self.path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        self.assertIs(Model_Registry.get_model("log_ml", path=self.path), first)
+
+    def test_reloads_on_change(self):
+        Model_Registry.get_model("log_ml", path=self.path)
+        joblib.dump({"version": 2}, self.path)
+        st = os.stat(self.path)
+        os.utime(self.path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        self.assertEqual(Model_Registry.get_model("log_ml", path=self.path)["version"], 2)
+
+    def test_legacy_softprob_and_binary_give_same_column(self):
+        rng = np.random.default_rng(0)
+        X = rng.normal(size=(200, 3))
+        y = (X[:, 0] > 0).astype(int)
+        dtrain = xgb.DMatrix(X, label=y)
+        legacy = os.path.join(self.tmp.name, "legacy.json")
+        binary = os.path.join(self.tmp.name, "binary.json")
+        xgb.train({"objective": "multi:softprob", "num_class": 2}, dtrain, 5).save_model(legacy)
+        xgb.train({"objective": "binary:logistic"}, dtrain, 5).save_model(binary)
+
+        old = Model_Registry.get_model("xgb_ml", path=legacy)
+        new = Model_Registry.get_model("xgb_ou", path=binary)
+        self.assertIsInstance(old, Model_Registry.BinaryOutput)
+        self.assertIsInstance(new, xgb.Booster)
+        for model in (old, new):
+            probs = model.predict(dtrain)
+            self.assertEqual(probs.shape, (200,))
+            self.assertGreater(((probs > 0.5) == y).mean(), 0.9)
+        self.assertEqual([m["legacy_softmax"] for m in Model_Registry.model_info()], [True, False])
+
+    def test_flask_boot_skips_numpy(self):
+        probe = "import sys, Flask.app; print(sorted(m for m in ('numpy', 'pandas') if m in sys.modules))"
+        loaded = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        self.assertEqual(loaded.stdout.strip(), "[]")
+
+        from Flask.app import app
+        Model_Registry.get_model("log_ml", path=self.path)
+        models = app.test_client().get("/api/models").get_json()
+        self.assertEqual([m["key"] for m in models], ["log_ml"])
@@ -0,0 +1,160 @@
+import asyncio
+import os
+import sys
+import tempfile
+import types
+import unittest
+from unittest import mock
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+
+from src.DataProviders import OddsStream
+from src.Predict import Model_Registry, Prediction_Service
+from src.Utils import db, tools
+
+
+def _games():
+    return pd.DataFrame({
+        "season": [2024, 2024],
+        "week": [5, 5],
+        "gameday": ["2024-10-06", "2024-10-06"],
+        "home_team": ["KC", "DAL"],
+        "away_team": ["NO", "PIT"],
+        "spread_line": [5.5, -1.0],
+        "total_line": [43.5, 44.0],
+        "home_moneyline": [-250.0, 110.0],
+        "away_moneyline": [200.0, -130.0],
+        "home_epa": [0.12, -0.05],   # a feature after the lines: moved games must keep this column order
+    })
+
+
+def _replay():
+    lines = pd.concat([_games()] * 3, ignore_index=True)
+    lines["ts"] = ["2024-10-06T12:00:00Z"] * 2 + ["2024-10-06T12:00:05Z"] * 2 + ["2024-10-06T12:00:09Z"] * 2
+    lines.loc[2, "home_moneyline"] = -280.0          # KC moves at :05
+    lines.loc[4, "home_moneyline"] = -280.0          # ... and holds
+    lines.loc[5, "total_line"] = 45.5                # DAL total moves at :09
+    return lines.drop(columns=["season", "week", "home_epa"])
+
+
+class TestOddsStream(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = os.path.join(self.tmp.name, "test.sqlite")
+        self.replay = os.path.join(self.tmp.name, "replay.csv")
+        _replay().to_csv(self.replay, index=False)
+
+        rng = np.random.default_rng(0)
+        # feature scales like todays_games (season, week, spread, total, moneylines, EPA), so no output saturates
+        X = rng.normal(size=(50, 7)) * [0.5, 5, 6, 4, 200, 200, 0.1] + [2024, 9, 0, 44, 0, 0, 0]
+        y = rng.integers(0, 2, 50)
+        models = {key: os.path.join(self.tmp.name, f"{key}.pkl")
+                  for key in ("xgb_ml", "xgb_ou", "nn_ml", "nn_ou", "log_ml", "log_ou")}
+        joblib.dump(LogisticRegression().fit(X, y), models["log_ml"])
+        joblib.dump(LogisticRegression().fit(X, 1 - y), models["log_ou"])
+        config = {"models": models, "betting": {"ou_odds": -110}}
+        self.patches = [mock.patch.object(m, "load_config", return_value=config)
+                        for m in (Prediction_Service, Model_Registry)]
+        for p in self.patches:
+            p.start()
+        tools.save_table(_games(), "todays_games", self.db)
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        Prediction_Service.invalidate(self.db)
+        Model_Registry.clear()
+        db.close_all()
+        self.tmp.cleanup()
+
+    def _ingest(self):
+        ingestor = OddsStream.OddsIngestor(OddsStream.ReplayProvider(self.replay), self.db)
+        asyncio.run(ingestor.run())
+        return ingestor
+
+    def test_only_moves_are_stored(self):
+        self._ingest()
+        snapshots = tools.load_table(OddsStream.SNAPSHOTS_TABLE, self.db)
+        self.assertEqual(snapshots["home_team"].tolist(), ["KC", "DAL"])
+        games = tools.load_table("todays_games", self.db)
+        self.assertEqual(games["home_moneyline"].tolist(), [-280.0, 110.0])
+        self.assertEqual(games["total_line"].tolist(), [43.5, 45.5])
+
+        # a restarted ingestor resumes from the stored lines and finds nothing new
+        again = OddsStream.OddsIngestor(OddsStream.ReplayProvider(self.replay), self.db)
+        self.assertTrue(again.process(_replay().pipe(OddsStream.normalize).iloc[4:]).empty)
+
+    def test_partial_update_keeps_missing_lines(self):
+        partial = _replay().iloc[:2].drop(columns=["home_moneyline", "away_moneyline"])
+        partial.loc[0, "spread_line"] = 6.5
+        partial.to_csv(self.replay, index=False)
+        ingestor = self._ingest()
+        games = tools.load_table("todays_games", self.db)
+        self.assertEqual(games["home_moneyline"].tolist(), [-250.0, 110.0])
+        self.assertEqual(games["away_moneyline"].tolist(), [200.0, -130.0])
+        self.assertEqual(games["spread_line"].tolist(), [6.5, -1.0])
+        snapshots = tools.load_table(OddsStream.SNAPSHOTS_TABLE, self.db)
+        self.assertEqual(snapshots["home_team"].tolist(), ["KC"])   # DAL only restated its lines
+        self.assertEqual(snapshots["home_moneyline"].tolist(), [-250.0])
+        latest = ingestor.latest.set_index("home_team")
+        self.assertEqual(latest.loc[["KC", "DAL"], "home_moneyline"].tolist(), [-250.0, 110.0])
+
+        predictions = Prediction_Service.get_predictions(self.db)["predictions"]
+        self.assertFalse(any(pd.isna(v) for row in predictions for v in row.values()))
+
+    def test_only_moved_games_are_rescored(self):
+        before = Prediction_Service.get_predictions(self.db)
+        scored = []
+        original = Prediction_Service.compute_predictions
+
+        def spy(games, *args, **kwargs):
+            scored.append(games["home_team"].tolist())
+            return original(games, *args, **kwargs)
+
+        with mock.patch.object(Prediction_Service, "compute_predictions", side_effect=spy):
+            self._ingest()
+            after = Prediction_Service.get_predictions(self.db)
+        self.assertEqual(scored, [["KC"], ["DAL"]])
+        self.assertNotEqual(before["etag"], after["etag"])
+        self.assertEqual(after["predictions"][0]["home_moneyline"], -280.0)
+        self.assertEqual(after["predictions"][1]["total_line"], 45.5)
+        self.assertEqual(after["predictions"][1]["home_moneyline"], 110.0)
+
+        # the patched-in games score exactly like a full recompute over the updated todays_games
+        Prediction_Service.invalidate(self.db)
+        recomputed = Prediction_Service.get_predictions(self.db)
+        self.assertEqual(after["predictions"], recomputed["predictions"])
+
+
+    def test_nflverse_provider_polls_schedules(self):
+        schedules = _games().assign(game_id=["2024_05_NO_KC", "2024_05_PIT_DAL"], home_score=np.nan,
+                                    away_score=np.nan, stadium="Somewhere Field")
+        schedules.loc[1, "home_moneyline"] = 125.0
+        played = schedules.iloc[[0]].assign(gameday="2024-09-29", home_score=27.0, away_score=20.0)
+        nfl = types.ModuleType("nfl_data_py")
+        nfl.import_schedules = mock.Mock(return_value=pd.concat([played, schedules], ignore_index=True))
+        config = {"data": {"current_season": 2024}}
+
+        async def first_batch(provider):
+            return await provider.updates().__anext__()
+
+        with mock.patch.dict(sys.modules, {"nfl_data_py": nfl}), \
+                mock.patch.object(OddsStream, "load_config", return_value=config):
+            provider = OddsStream.PROVIDERS["nflverse"]({"interval": 0})
+            batch = asyncio.run(first_batch(provider))
+        nfl.import_schedules.assert_called_once_with([2024])
+        self.assertEqual(batch["gameday"].tolist(), ["2024-10-06", "2024-10-06"])
+        self.assertEqual(batch["source"].unique().tolist(), ["nflverse"])
+
+        ingestor = OddsStream.OddsIngestor(provider, self.db, rescore=False)
+        moved = ingestor.process(batch)
+        self.assertEqual(moved["home_team"].tolist(), ["DAL"])
+        self.assertEqual(tools.load_table("todays_games", self.db)["home_moneyline"].tolist(), [-250.0, 125.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+import unittest
+import numpy as np
+from src.Utils import Odds, Expected_Value
+from src.Utils import Kelly_Criterion as kc
+
+
+class TestOdds(unittest.TestCase):
+
+    def test_expected_value_matches_scalar(self):
+        probs = np.array([.76, .3, .6, .2, .8137, .2175, .5298, .638])
+        odds = np.array([-200, -500, 250, -200, -200, -550, 1000, 275])
+        expected = [Expected_Value.expected_value(p, o) for p, o in zip(probs, odds)]
+        self.assertEqual(Odds.expected_value(probs, odds).tolist(), expected)
+
+    def test_kelly_matches_scalar(self):
+        odds = np.array([-110, -110, 400, -500, 100])
+        probs = np.array([.6, .4, .35, .85, .99])
+        expected = [kc.calculate_kelly_criterion(o, p) for o, p in zip(odds, probs)]
+        self.assertEqual(Odds.kelly_criterion(odds, probs).tolist(), expected)
+
+    def test_round_trip_american_decimal(self):
+        odds = np.array([-500, -110, 100, 150, 1000])
+        np.testing.assert_allclose(Odds.decimal_to_american(Odds.american_to_decimal(odds)), odds)
+
+    def test_round_trip_implied(self):
+        odds = np.array([-250, -110, 120, 300])
+        np.testing.assert_allclose(Odds.implied_to_american(Odds.american_to_implied(odds)), odds)
+
+    def test_remove_vig(self):
+        fair_a, fair_b = Odds.remove_vig([-110, -150], [-110, 130])
+        np.testing.assert_allclose(fair_a + fair_b, 1.0)
+        self.assertAlmostEqual(fair_a[0], 0.5)
+
+    def test_nan_passthrough(self):
+        self.assertTrue(np.isnan(Odds.american_to_implied([np.nan]))[0])
@@ -0,0 +1,122 @@
+import importlib
+import os
+import sys
+import tempfile
+import types
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from benchmarks import synthetic
+from src.features.rolling_features import team_games
+from src.Utils import db, tools
+
+
+def _features():
+    return pd.DataFrame({
+        "season": [2023, 2023, 2023, 2024, 2024],
+        "week": [1, 1, 2, 1, 2],
+        "home_team": ["KC", "BUF", "KC", "PHI", "DAL"],
+        "spread_line": [3.5, -2.5, 1.0, 6.0, -3.0],
+        "home_win": [1, 0, 1, 1, 0],
+    })
+
+
+class TestPartitions(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = os.path.join(self.tmp.name, "test.sqlite")
+        complete = {(2023, 1): True, (2023, 2): True, (2024, 1): True, (2024, 2): False}
+        tools.upsert_partitions(_features(), "features_all", complete, self.db, replace=True)
+
+    def tearDown(self):
+        db.close_all()
+        self.tmp.cleanup()
+
+    def test_unchanged_rows_write_nothing(self):
+        changed = tools.upsert_partitions(_features().iloc[::-1], "features_all", db_path=self.db)
+        self.assertEqual(changed, 0)
+
+    def test_only_changed_partition_is_rewritten(self):
+        df = _features()
+        df.loc[4, "home_win"] = 1
+        self.assertEqual(tools.upsert_partitions(df, "features_all", db_path=self.db), 1)
+        stored = tools.load_table("features_all", self.db).sort_values(["season", "week", "home_team"])
+        self.assertEqual(len(stored), 5)
+        self.assertEqual(stored.loc[stored["home_team"] == "DAL", "home_win"].item(), 1)
+
+    def test_stale_seasons(self):
+        stale = tools.stale_seasons([2022, 2023, 2024], "features_all", current_season=2025, db_path=self.db)
+        self.assertEqual(stale, [2022, 2024])
+
+
+class TestHistoricalBuild(unittest.TestCase):
+    """NFLDataProvider.build_historical_features over a current season whose last week is half played."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.addCleanup(db.close_all)
+        # NFLDataProvider imports nfl_data_py at module level; every call into it is patched below
+        modules = mock.patch.dict(sys.modules, {"nfl_data_py": types.ModuleType("nfl_data_py")})
+        modules.start()
+        self.addCleanup(modules.stop)
+        self.provider = importlib.import_module("src.DataProviders.NFLDataProvider")
+
+        self.final = synthetic.schedules([2024])
+        self.final = self.final[self.final["week"] <= 3].reset_index(drop=True)
+        self.schedule = self.final.copy()
+        self.unplayed = (self.schedule["week"] == 3) & (self.schedule.index % 2 == 1)
+        self.schedule.loc[self.unplayed, ["home_score", "away_score"]] = np.nan
+        lines = pd.DataFrame({"game_id": self.final["game_id"], "spread_line": -3.0, "total_line": 44.5,
+                              "home_moneyline": -150.0, "away_moneyline": 130.0})
+
+        self.db = os.path.join(self.tmp.name, "dataset.sqlite")
+        config = {"data": {"seasons": [2024], "current_season": 2024}}
+        for name, value in (
+                ("import_schedules", lambda seasons: self.schedule.copy()),
+                ("import_lines", lambda seasons: lines),
+                ("_team_history", lambda seasons: team_games(self.schedule, synthetic.team_epa(self.schedule))),
+                ("STATE_PATH", os.path.join(self.tmp.name, "team_state.npz")),
+                ("DB_PATH", self.db),
+                ("load_config", lambda: config)):
+            patcher = mock.patch.object(self.provider, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_unplayed_games_get_no_labels(self):
+        built = self.provider.build_historical_features([2024])
+        stored = tools.load_table("features_all", self.db)
+        self.assertEqual(len(stored), len(built))
+        played = self.schedule[~self.unplayed & (self.schedule["week"] > 1)]   # week 1 has no as-of history
+        self.assertEqual(len(stored), len(played))
+        played = played.set_index(["week", "home_team", "away_team"])
+        stored = stored.set_index(["week", "home_team", "away_team"]).loc[played.index]
+        np.testing.assert_array_equal(stored["home_win"], (played["home_score"] > played["away_score"]).astype(int))
+
+        parts = tools.load_partitions("features_all", self.db).set_index("week")
+        self.assertEqual(parts["complete"].to_dict(), {2: 1, 3: 0})
+        self.assertEqual(parts.loc[3, "n_rows"], (self.schedule["week"] == 3).sum() - self.unplayed.sum())
+
+        self.schedule = self.final.copy()   # the rest of week 3 is played
+        self.provider.build_historical_features([2024], incremental=True)
+        self.assertEqual(len(tools.load_table("features_all", self.db)), (self.final["week"] > 1).sum())
+        parts = tools.load_partitions("features_all", self.db).set_index("week")
+        self.assertEqual(parts["complete"].to_dict(), {2: 1, 3: 1})
+
+    def test_builders_share_one_layout(self):
+        feature_builder = importlib.import_module("src.features.feature_builder")
+        feature_builder.build_historical_features([2024])
+        stored = tools.load_table("features_all", self.db)
+        self.assertEqual(list(stored.columns), self.provider.FEATURE_COLUMNS + self.provider.LABEL_COLUMNS)
+
+        self.schedule = self.final.copy()
+        self.assertEqual(self.provider.build_historical_features([2024], incremental=True).shape[1], stored.shape[1])
+        self.assertEqual(len(tools.load_table("features_all", self.db)), (self.final["week"] > 1).sum())
+        version = tools.table_version("features_all", self.db)
+        rows = feature_builder.build_historical_features([2024], save=False)
+        self.assertEqual(len(rows), (self.final["week"] > 1).sum())
+        self.assertEqual(tools.table_version("features_all", self.db), version)
@@ -0,0 +1,91 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from benchmarks import synthetic
+from src.DataProviders import DataCache
+from src.features import pbp_features
+from src.Utils import db, tools
+
+CONFIG = {"data": {"current_season": 2024}, "pbp": {"memory_mb": 64, "batch_rows": 0},
+          "cache": {"ttl_hours": 12, "offline": False}}
+
+
+class TestPbpFeatures(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        config = {**CONFIG, "cache": {**CONFIG["cache"], "dir": os.path.join(self.tmp.name, "cache")}}
+        for module in (pbp_features, DataCache):
+            patcher = mock.patch.object(module, "load_config", return_value=config)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.schedule = synthetic.schedules([2023, 2024])
+        self.plays = synthetic.play_by_play(self.schedule, plays_per_game=60)
+        self.fetched = []
+
+    def fetch(self, seasons):
+        self.fetched.append(list(seasons))
+        return self.plays[self.plays["season"].isin(seasons)]
+
+    def schedules(self, seasons):
+        return self.schedule[self.schedule["season"].isin(seasons)]
+
+    def test_batches_match_one_pass(self):
+        season = self.plays[self.plays["season"] == 2023]
+        whole = pbp_features.aggregate_season([pbp_features.compact(season)], self.schedules([2023]))[0]
+        batches = [b for _, b in pbp_features.iter_pbp([2023], self.fetch, batch_rows=1000)]
+        streamed, n_plays, _ = pbp_features.aggregate_season(batches, self.schedules([2023]))
+        self.assertGreater(len(batches), 10)
+        self.assertEqual(n_plays, len(season))
+        pd.testing.assert_frame_equal(streamed, whole, rtol=1e-5)
+
+        self.assertEqual(len(whole), 2 * (self.schedule["season"] == 2023).sum())
+        offense = season[(season["pass"] == 1) | (season["rush"] == 1)].groupby(["game_id", "posteam"])["epa"].mean()
+        row = whole.iloc[0]
+        self.assertAlmostEqual(row["off_epa_per_play"], offense[(row["game_id"], row["team"])], places=5)
+        home = self.schedule.set_index("game_id").loc[row["game_id"], "home_team"]
+        self.assertEqual(row["home"], int(row["team"] == home))
+
+    def test_compact_dtypes_and_budgeted_batches(self):
+        batches = [b for _, b in pbp_features.iter_pbp([2023], self.fetch, memory_mb=0.25)]
+        self.assertGreater(len(batches), 1)
+        batch = batches[0]
+        self.assertEqual(batch["epa"].dtype, np.float32)
+        self.assertIsInstance(batch["posteam"].dtype, pd.CategoricalDtype)
+        self.assertEqual(batch["sack"].dtype, np.int8)
+        raw = self.plays.iloc[:len(batch)].memory_usage(deep=True).sum()
+        self.assertLess(batch.memory_usage(deep=True).sum(), raw / 2)
+
+        rows = pbp_features.aggregate_season((b for b in batches), self.schedules([2023]))[0]
+        numeric = rows.select_dtypes("number").drop(columns=["season", "week", "home"])
+        self.assertTrue((numeric.dtypes == np.float32).all())
+        self.assertIsInstance(rows["team"].dtype, pd.CategoricalDtype)
+
+    def test_build_appends_seasons_to_store(self):
+        db_path = os.path.join(self.tmp.name, "dataset.sqlite")
+        written = pbp_features.build_pbp_features([2023, 2024], db_path, fetch=self.fetch,
+                                                  schedules=self.schedules, batch_rows=2000)
+        self.assertEqual(written, 2 * len(self.schedule))
+        again = pbp_features.build_pbp_features([2023, 2024], db_path, incremental=True, fetch=self.fetch,
+                                                schedules=self.schedules)
+        self.assertEqual(again, 2 * (self.schedule["season"] == 2024).sum())
+        self.assertEqual(self.fetched, [[2023], [2024]])   # second run: 2023 finished, 2024 read from cache
+
+        stored = tools.load_table(pbp_features.TABLE, db_path)
+        self.assertEqual(len(stored), written)
+        store = tools.store_dir_for(db_path)
+        meta = tools.load_store_meta(pbp_features.TABLE, store)
+        self.assertIn("off_epa_per_play", meta["columns"])
+        self.assertNotIn("team", meta["columns"])
+        self.assertEqual(len(tools.load_store_column("team", pbp_features.TABLE, store)), written)
+        db.close_all()
+
+
+if __name__ == '__main__':
+    unittest.main()
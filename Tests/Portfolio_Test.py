@@ -0,0 +1,109 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from benchmarks import synthetic
+from src.Predict import Prediction_Service
+from src.Utils import Odds, Portfolio, db, tools
+
+CONFIG = {"portfolio": {"correlation": 0.0}, "betting": {"ou_odds": -110}}
+
+
+def _slate(n=14, seed=0):
+    rng = np.random.default_rng(seed)
+    home = rng.choice([-250.0, -150.0, -110.0, 120.0, 180.0], n)
+    games = pd.DataFrame({"gameday": "2024-10-06", "home_team": [f"H{i}" for i in range(n)],
+                          "away_team": [f"A{i}" for i in range(n)], "home_moneyline": home,
+                          "away_moneyline": -home - 20})
+    ml = np.clip(Odds.american_to_implied(home) + rng.normal(0, 0.06, n), 0.05, 0.95)
+    ou = np.clip(0.5 + rng.normal(0, 0.06, n), 0.05, 0.95)
+    return games, ml, ou
+
+
+class TestPortfolio(unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(Portfolio, "load_config", return_value=CONFIG)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_single_bet_is_plain_kelly(self):
+        games, _, _ = _slate(1)
+        games["home_moneyline"], games["away_moneyline"] = 120.0, -140.0
+        bets = Portfolio.optimize_slate(games, [0.5], [0.5], kelly_fraction=0.5, max_bet=1, max_game=1, max_total=0.9)
+        self.assertEqual(len(bets), 1)   # OU at 50% against -110 is no bet
+        self.assertAlmostEqual(bets["fraction"][0], float(Odds.kelly_fraction(120, 0.5, 0.5)), places=5)
+        self.assertTrue(bets.attrs["summary"]["exact"])
+
+    def test_caps_hold_and_slate_shares_bankroll(self):
+        games, ml, ou = _slate()
+        bets = Portfolio.optimize_slate(games, ml, ou, bankroll=500)
+        summary = bets.attrs["summary"]
+        self.assertLessEqual(bets["fraction"].max(), 0.05 + 1e-9)
+        self.assertLessEqual(bets.groupby("game")["fraction"].sum().max(), 0.08 + 1e-9)
+        self.assertLessEqual(summary["total_fraction"], 0.25 + 1e-9)
+        self.assertLess(summary["total_fraction"], summary["independent_fraction"])
+        self.assertGreater(summary["expected_log_growth"], 0)
+        self.assertFalse(summary["exact"])
+        np.testing.assert_allclose(bets["stake"], bets["fraction"] * 500, atol=0.01)
+
+        uncapped = Portfolio.optimize_slate(games.iloc[:4], ml[:4], ou[:4], max_bet=1, max_game=1, max_total=0.9)
+        sampled = Portfolio.optimize_slate(games.iloc[:4], ml[:4], ou[:4], max_bet=1, max_game=1, max_total=0.9,
+                                           scenarios=64)
+        self.assertTrue(uncapped.attrs["summary"]["exact"])
+        np.testing.assert_allclose(sampled["fraction"], uncapped["fraction"], atol=0.02)
+
+    def test_exact_scenarios_reproduce_marginals(self):
+        games, ml, ou = _slate(5)
+        bets = Portfolio.candidate_bets(games, ml, ou)
+        joint = Portfolio.joint_probabilities(ml, ou, 0.3)
+        R, weights, exact = Portfolio.scenario_returns(bets, joint, max_scenarios=4096)
+        self.assertTrue(exact)
+        self.assertAlmostEqual(weights.sum(), 1.0)
+        np.testing.assert_allclose(weights @ R, bets["ev"])
+
+    def test_correlated_sides_get_less_stake(self):
+        games = pd.DataFrame({"home_team": ["KC"], "away_team": ["NO"], "gameday": ["2024-10-06"],
+                              "home_moneyline": [-150.0], "away_moneyline": [130.0]})
+        totals = {rho: Portfolio.optimize_slate(games, [0.66], [0.58], correlation=rho, kelly_fraction=1.0,
+                                                max_bet=1, max_game=1, max_total=0.9)["fraction"].sum()
+                  for rho in (-0.3, 0.0, 0.3)}   # home favourite + over both bet
+        self.assertGreater(totals[-0.3], totals[0.0])
+        self.assertGreater(totals[0.0], totals[0.3])
+
+    def test_favorite_over_correlation_from_features(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, "dataset.sqlite")
+            features = synthetic.features(seasons=range(2022, 2024))
+            tools.save_table(features, "features_all", db_path)
+            rho = Portfolio.favorite_over_correlation(db_path)
+            db.close_all()
+        keep = (features["ou_cover"] >= 0) & (features["spread_line"] != 0)
+        f = features[keep]
+        favorite_won = np.where(f["spread_line"] > 0, f["home_win"], 1 - f["home_win"])
+        self.assertAlmostEqual(rho, np.corrcoef(favorite_won, f["ou_cover"])[0, 1])
+
+    def test_flask_portfolio(self):
+        from Flask.app import app
+        games, ml, ou = _slate(3)
+        predictions = [{**g, "models": {"xgb": {"ml_prob": p, "ou_prob": q}, "nn": {"error": "no model"},
+                                        "log": {"error": "no model"}}}
+                       for g, p, q in zip(games.to_dict(orient="records"), ml, ou)]
+        entry = {"predictions": predictions, "etag": "abc"}
+        with mock.patch.object(Prediction_Service, "get_predictions", return_value=entry), \
+                mock.patch.object(Prediction_Service, "load_config", return_value=CONFIG):
+            client = app.test_client()
+            body = client.get("/api/portfolio?family=xgb&bankroll=200").get_json()
+            self.assertEqual(body["summary"]["bankroll"], 200)
+            self.assertAlmostEqual(sum(b["stake"] for b in body["bets"]), body["summary"]["total_stake"], places=2)
+            self.assertEqual(client.get("/api/portfolio?family=nn").status_code, 500)
+            self.assertEqual(client.get("/api/portfolio?family=bogus").status_code, 400)
+        Prediction_Service.invalidate()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import functools
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import joblib
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+
+from benchmarks import synthetic
+from src.Backtest import Backtester
+from src.Predict import Model_Registry, Prediction_Log
+from src.Predict.Batch_Predictor import feature_matrix, predict_batch
+from src.Utils import db, tools
+
+
+class TestPredictionLog(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = os.path.join(self.tmp.name, "dataset.sqlite")
+        self.features = synthetic.features(seasons=[2022, 2023])
+        self.games = self.features[synthetic.FEATURE_COLUMNS].iloc[:16].reset_index(drop=True)
+        self.models = {key: os.path.join(self.tmp.name, f"{key}.pkl")
+                       for key in ("xgb_ml", "xgb_ou", "nn_ml", "nn_ou", "log_ml", "log_ou")}
+        self._fit("log_ml", "home_win")
+        self._fit("log_ou", "ou_cover")
+        patcher = mock.patch.object(Model_Registry, "load_config", return_value={"models": self.models})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        Model_Registry.clear()
+        db.close_all()
+        self.tmp.cleanup()
+
+    def _fit(self, key, label, C=1.0):
+        X = feature_matrix(self.features)
+        joblib.dump(LogisticRegression(C=C, max_iter=500).fit(X, self.features[label]), self.models[key])
+
+    def test_rerun_is_a_cache_hit(self):
+        first = Prediction_Log.predict_logged(self.games, ("log", "xgb"), errors="ignore", db_path=self.db)
+        self.assertEqual(first.attrs["log"], {"hits": 0, "misses": 16})
+        self.assertIn("xgb", first.attrs["errors"])
+        expected = predict_batch(self.games, ("log",))
+        np.testing.assert_allclose(first["log_ml"], expected["log_ml"])
+
+        with mock.patch.object(Prediction_Log, "predict_batch") as rescored:
+            again = Prediction_Log.predict_logged(self.games, ("log",), db_path=self.db)
+        rescored.assert_not_called()
+        self.assertEqual(again.attrs["log"], {"hits": 16, "misses": 0})
+        np.testing.assert_array_equal(again[["log_ml", "log_ou"]], first[["log_ml", "log_ou"]])
+        self.assertEqual(list(again.columns[:3]), ["gameday", "home_team", "away_team"])
+
+    def test_changed_inputs_and_models_are_rescored(self):
+        Prediction_Log.predict_logged(self.games, ("log",), db_path=self.db)
+        moved = self.games.copy()
+        moved.loc[3, "home_moneyline"] -= 20
+        self.assertEqual(Prediction_Log.predict_logged(moved, ("log",), db_path=self.db).attrs["log"]["misses"], 1)
+
+        old_hash = Model_Registry.model_hash("log_ml")
+        self._fit("log_ml", "home_win", C=0.01)   # retrained: new artifact hash
+        self.assertNotEqual(Model_Registry.model_hash("log_ml"), old_hash)
+        retrained = Prediction_Log.predict_logged(self.games, ("log",), db_path=self.db)
+        self.assertEqual(retrained.attrs["log"]["misses"], 16)
+
+        game_id = Prediction_Log.game_ids(self.games.iloc[[3]])[0]
+        history = Prediction_Log.lookup([game_id], model="log_ml", db_path=self.db)
+        self.assertEqual(len(history), 3)   # original, moved line, retrained model
+        self.assertEqual(len(Prediction_Log.lookup(model="log_ml", model_hash=old_hash, db_path=self.db)), 17)
+        self.assertEqual(len(Prediction_Log.lookup([game_id], latest=True, db_path=self.db)), 2)
+        with self.assertRaises(ValueError):
+            Prediction_Log.lookup(db_path=self.db)
+
+        mirror = Prediction_Log.load_history(self.db)
+        self.assertEqual(len(mirror), 2 * (16 + 1) + 16)   # log_ou rows stayed valid after the retrain
+        self.assertEqual(len(mirror), len(tools.load_table(Prediction_Log.TABLE, self.db)))
+
+    def test_flask_history_lookup(self):
+        from Flask.app import app
+        Prediction_Log.predict_logged(self.games, ("log",), db_path=self.db)
+        game_id = Prediction_Log.game_ids(self.games)[0]
+        lookup = functools.partial(Prediction_Log.lookup, db_path=self.db)
+        with mock.patch.object(Prediction_Log, "lookup", side_effect=lookup):
+            client = app.test_client()
+            rows = client.get(f"/api/predictions/history?game_id={game_id}&latest=1").get_json()
+            self.assertEqual(sorted(r["model"] for r in rows), ["log_ml", "log_ou"])
+            self.assertEqual(client.get("/api/predictions/history").status_code, 400)
+
+    def test_backtester_reads_the_log(self):
+        tools.save_table(self.features, "features_all", self.db)
+        first = Backtester.run_backtest("ml", "log", db_path=self.db, from_log=True)
+        with mock.patch.object(Prediction_Log, "predict_batch") as rescored:
+            again = Backtester.run_backtest("ml", "log", db_path=self.db, from_log=True)
+        rescored.assert_not_called()
+        self.assertEqual(len(again["predictions"]), len(self.features))
+        self.assertAlmostEqual(again["brier"], first["brier"])
+
+
+if __name__ == '__main__':
+    unittest.main()
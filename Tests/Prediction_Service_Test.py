@@ -0,0 +1,79 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+
+from src.Predict import Model_Registry, Prediction_Service
+from src.Utils import Expected_Value, db, tools
+
+
+def _games():
+    return pd.DataFrame({
+        "season": [2024, 2024],
+        "week": [5, 5],
+        "gameday": ["2024-10-06", "2024-10-06"],
+        "home_team": ["KC", "DAL"],
+        "away_team": ["NO", "PIT"],
+        "spread_line": [5.5, -1.0],
+        "total_line": [43.5, 44.0],
+        "home_moneyline": [-250, 110],
+        "away_moneyline": [200, -130],
+    })
+
+
+class TestPredictionService(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = os.path.join(self.tmp.name, "test.sqlite")
+        rng = np.random.default_rng(0)
+        X, y = rng.normal(size=(50, 6)), rng.integers(0, 2, 50)
+        models = {key: os.path.join(self.tmp.name, f"{key}.pkl")
+                  for key in ("xgb_ml", "xgb_ou", "nn_ml", "nn_ou", "log_ml", "log_ou")}
+        joblib.dump(LogisticRegression().fit(X, y), models["log_ml"])
+        joblib.dump(LogisticRegression().fit(X, 1 - y), models["log_ou"])
+        config = {"models": models, "betting": {"ou_odds": -110}}
+        self.patches = [mock.patch.object(m, "load_config", return_value=config)
+                        for m in (Prediction_Service, Model_Registry)]
+        for p in self.patches:
+            p.start()
+        tools.save_table(_games(), "todays_games", self.db)
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        Prediction_Service.invalidate(self.db)
+        Model_Registry.clear()
+        db.close_all()
+        self.tmp.cleanup()
+
+    def test_predictions_include_ev_and_kelly(self):
+        games = Prediction_Service.get_predictions(self.db)["predictions"]
+        self.assertEqual([g["home_team"] for g in games], ["KC", "DAL"])
+        log = games[0]["models"]["log"]
+        self.assertAlmostEqual(log["home_ev"], Expected_Value.expected_value(log["ml_prob"], -250), delta=0.05)
+        self.assertGreaterEqual(log["over_kelly"], 0)
+        self.assertIn("error", games[0]["models"]["xgb"])
+
+    def test_cached_until_games_change(self):
+        first = Prediction_Service.get_predictions(self.db)
+        self.assertIs(Prediction_Service.get_predictions(self.db), first)
+        tools.save_table(_games().iloc[:1], "todays_games", self.db)
+        second = Prediction_Service.get_predictions(self.db)
+        self.assertNotEqual(first["etag"], second["etag"])
+        self.assertEqual(len(second["predictions"]), 1)
+
+    def test_flask_conditional_get(self):
+        from Flask.app import app
+        client = app.test_client()
+        entry = Prediction_Service.get_predictions(self.db)
+        with mock.patch.object(Prediction_Service, "get_predictions", return_value=entry):
+            first = client.get("/api/predictions")
+            self.assertEqual(first.status_code, 200)
+            again = client.get("/api/predictions", headers={"If-None-Match": first.headers["ETag"]})
+            self.assertEqual(again.status_code, 304)
@@ -0,0 +1,104 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from benchmarks import synthetic
+from src.features import rolling_features as rf
+
+
+def _schedule():
+    return pd.DataFrame({
+        "game_id": ["g1", "g2", "g3", "g5", "g6"],
+        "season": [2023] * 5,
+        "week": [1, 1, 2, 3, 3],
+        "gameday": ["2023-09-10", "2023-09-10", "2023-09-17", "2023-09-24", "2023-09-24"],
+        "home_team": ["BUF", "KC", "KC", "BUF", "LV"],
+        "away_team": ["KC", "OAK", "BUF", "KC", "NYJ"],
+        "home_score": [20, 30, 24, np.nan, np.nan],
+        "away_score": [17, 7, 21, np.nan, np.nan],
+    })
+
+
+TODAY = "2023-09-20"   # week 3 (2023-09-24) is still upcoming
+
+
+def _epa():
+    return pd.DataFrame({
+        "season": [2023] * 6, "week": [1, 1, 1, 2, 2, 2],
+        "team": ["BUF", "KC", "OAK", "KC", "BUF", "OAK"],
+        "epa": [0.2, 0.1, -0.3, 0.4, 0.0, np.nan],
+    })
+
+
+class TestRollingFeatures(unittest.TestCase):
+
+    def setUp(self):
+        self.games = _schedule()
+        self.history = rf.team_games(self.games, _epa())
+
+    def test_features_only_use_earlier_weeks(self):
+        out, engine = rf.as_of_features(self.games, self.history, today=TODAY)
+        week1 = out[out["week"] == 1]
+        self.assertTrue(week1[["home_epa", "away_epa", "home_ppg", "away_ppg"]].isna().all().all())
+        self.assertEqual(week1["home_rest"].tolist(), [14.0, 14.0])
+
+        kc_buf = out[out["game_id"] == "g3"].iloc[0]
+        self.assertAlmostEqual(kc_buf["home_epa"], 0.1)      # KC's week 1 only
+        self.assertAlmostEqual(kc_buf["home_ppg"], 30)
+        self.assertAlmostEqual(kc_buf["away_ppg"], 20)
+        self.assertEqual(kc_buf["away_rest"], 7)
+        # BUF played week 1 at home, now at KC
+        self.assertAlmostEqual(kc_buf["away_travel"], rf.haversine_miles(42.774, -78.787, 39.049, -94.484), 3)
+
+        buf_kc = out[out["game_id"] == "g5"].iloc[0]
+        self.assertAlmostEqual(buf_kc["away_epa"], 0.3 * 0.4 + 0.7 * 0.1)
+        self.assertAlmostEqual(buf_kc["home_ppg"], (20 + 21) / 2)
+        # week 3 isn't final, so it never enters the state
+        self.assertEqual(engine.applied, 202302)
+
+    def test_relocated_franchise_shares_state(self):
+        out, _ = rf.as_of_features(self.games, self.history, today=TODAY)
+        lv = out[out["game_id"] == "g6"].iloc[0]
+        self.assertAlmostEqual(lv["home_ppg"], 7)            # scored as OAK in week 1
+        self.assertAlmostEqual(lv["home_epa"], -0.3)         # week 2 EPA missing -> EWMA unchanged
+
+    def test_saved_state_matches_full_replay(self):
+        full, _ = rf.as_of_features(self.games, self.history, today=TODAY)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "team_state.npz")
+            early = self.history["week"] == 1
+            rf.as_of_features(self.games[self.games["week"] == 1], self.history[early], state_path=path,
+                              today=TODAY)
+            engine = rf.TeamFeatureEngine.load(path)
+            self.assertEqual(engine.applied, 202301)
+            later = self.games[self.games["week"] > 1]
+            partial, _ = rf.as_of_features(later, self.history, engine, today=TODAY)
+        expected = full[full["week"] > 1].reset_index(drop=True)
+        pd.testing.assert_frame_equal(partial.reset_index(drop=True), expected)
+
+    def test_past_game_without_score_does_not_stall_the_state(self):
+        games = synthetic.schedules([2022, 2023, 2024])
+        cancelled = games[(games["season"] == 2022) & (games["week"] == 17)].index[:1]   # like BUF@CIN 2022
+        games.loc[cancelled, ["home_score", "away_score"]] = np.nan
+        epa = synthetic.team_epa(games)
+        out, engine = rf.as_of_features(games, rf.team_games(games, epa), today="2025-03-01")
+        self.assertEqual(engine.applied, 2024 * 100 + games["week"].max())
+
+        # the unscored game is a no-op: every other game sees the state it would without it
+        kept = games.drop(cancelled)
+        expected, _ = rf.as_of_features(kept, rf.team_games(kept, epa), today="2025-03-01")
+        pd.testing.assert_frame_equal(out[out["game_id"] != games.loc[cancelled[0], "game_id"]]
+                                      .reset_index(drop=True), expected.reset_index(drop=True))
+        late = out[out["season"] == 2024]
+        self.assertLess(late["home_rest"].mean(), 14)
+
+        # the same game still upcoming holds its week (and everything after it) back
+        _, held = rf.as_of_features(games, rf.team_games(games, epa), today=games.loc[cancelled[0], "gameday"])
+        self.assertEqual(held.applied, 202216)
+
+
+if __name__ == '__main__':
+    unittest.main()
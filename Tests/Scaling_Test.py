@@ -0,0 +1,81 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from benchmarks import synthetic
+from src.Predict import Compiled_Models, Model_Registry
+from src.Predict.Batch_Predictor import l2_normalize, predict_batch
+from src.Utils import db, scaling, tools
+
+
+class TestScaling(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(0)
+        self.X = rng.normal([5.0, -2.0, 100.0], [1.0, 3.0, 20.0], size=(1000, 3))
+        self.X[::7, 1] = np.nan
+
+    def tearDown(self):
+        Model_Registry.clear()
+        db.close_all()
+        self.tmp.cleanup()
+
+    def test_streaming_stats_match_numpy(self):
+        for chunk_rows in (1, 64, 333, 5000):
+            standard = scaling.fit_scaler(self.X, "standard", chunk_rows=chunk_rows)
+            np.testing.assert_allclose(standard.offset, np.nanmean(self.X, axis=0))
+            np.testing.assert_allclose(standard.scale, np.nanstd(self.X, axis=0))
+        minmax = scaling.fit_scaler(self.X, "minmax", chunk_rows=100)
+        np.testing.assert_allclose(minmax.offset, np.nanmin(self.X, axis=0))
+        out = minmax.transform(self.X)
+        self.assertAlmostEqual(out.max(), 1.0)
+        self.assertEqual(np.isnan(out).sum(), 0)
+
+    def test_constant_column_and_roundtrip(self):
+        X = np.column_stack([self.X[:, 0], np.full(len(self.X), 3.0)])
+        scaler = scaling.fit_scaler(X, columns=["a", "b"])
+        np.testing.assert_allclose(scaler.transform(X)[:, 1], 0.0)
+        path = scaling.scaler_path(os.path.join(self.tmp.name, "model.h5"))
+        self.assertTrue(path.endswith("model.scaler.npz"))
+        scaler.save(path)
+        loaded = scaling.load_scaler(path)
+        self.assertEqual(loaded.columns, ["a", "b"])
+        np.testing.assert_allclose(loaded.transform(X), scaler.transform(X))
+        with self.assertRaises(ValueError):
+            loaded.transform(self.X)
+
+    def test_fit_feature_store(self):
+        db_path = os.path.join(self.tmp.name, "dataset.sqlite")
+        features = synthetic.features(seasons=range(2021, 2024))
+        tools.save_table(features, "features_all", db_path)
+        scaler = scaling.fit_feature_store(db_path=db_path, chunk_rows=50)
+        X, _ = tools.load_training_data("home_win", db_path=db_path)
+        np.testing.assert_allclose(scaler.offset, np.asarray(X).mean(axis=0))
+        self.assertEqual(scaler.n_rows, len(features))
+        self.assertIn("spread_line", scaler.columns)
+
+    def test_batch_engine_uses_saved_scaler(self):
+        rng = np.random.default_rng(1)
+        models = {key: os.path.join(self.tmp.name, f"{key}.h5") for key in ("nn_ml", "nn_ou")}
+        mlp = Compiled_Models.CompiledMLP({"steps": [{"op": "dense", "activation": "sigmoid"}]},
+                                          {"w0": rng.normal(size=(3, 1)), "b0": np.zeros(1)})
+        for path in models.values():   # compiled artifacts stand in for the Keras files
+            mlp.save(Compiled_Models.artifact_path(path))
+        X = np.nan_to_num(self.X[:20])
+
+        with mock.patch.object(Model_Registry, "load_config", return_value={"models": models}):
+            legacy = predict_batch(X=X, families=("nn",))
+            scaler = scaling.fit_scaler(self.X)
+            scaler.save(scaling.scaler_path(models["nn_ml"]))
+            scaled = predict_batch(X=X, families=("nn",))
+        np.testing.assert_allclose(legacy["nn_ml"], mlp.predict(l2_normalize(X)))
+        np.testing.assert_allclose(scaled["nn_ml"], mlp.predict(scaler.transform(X)))
+        np.testing.assert_allclose(scaled["nn_ou"], legacy["nn_ou"])   # nn_ou has no scaler yet
+
+
+if __name__ == '__main__':
+    unittest.main()
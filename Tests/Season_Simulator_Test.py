@@ -0,0 +1,158 @@
+import importlib
+import os
+import sys
+import tempfile
+import types
+import unittest
+from unittest import mock
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+
+from benchmarks import synthetic
+from src.features.rolling_features import team_games
+from src.Predict import Model_Registry, Season_Simulator
+from src.Predict.Batch_Predictor import feature_matrix, predict_batch
+from src.Utils import db, tools
+
+
+def _schedule(played_weeks=8, p_home=0.5):
+    schedule = synthetic.schedules([2024])
+    schedule.loc[schedule["week"] > played_weeks, ["home_score", "away_score"]] = np.nan
+    schedule["p_home"] = p_home
+    return schedule
+
+
+class TestSeasonSimulator(unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(Season_Simulator, "load_config", return_value={})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_certain_outcomes_reproduce_final_standings(self):
+        full = synthetic.schedules([2024])
+        schedule = _schedule(played_weeks=8)
+        rest = schedule["home_score"].isna()
+        schedule.loc[rest, "p_home"] = np.sign(full["home_score"] - full["away_score"])[rest] / 2 + 0.5
+        keep = ~rest | (schedule["p_home"] != 0.5)   # a draw can't replay a tie
+        schedule, final = schedule[keep], Season_Simulator.season_arrays(full[keep])["base"]
+
+        result = Season_Simulator.simulate(schedule, sims=500, batch=128, workers=1, seed=1)
+        summary = result.summary()
+        np.testing.assert_allclose(summary["mean_wins"], final)
+        np.testing.assert_allclose(summary["std_wins"], 0.0)
+        self.assertEqual(list(summary.index), Season_Simulator.TEAMS)
+        self.assertIn("LAR", summary.index)   # nflverse "LA" is keyed by the current code
+
+    def test_probabilities_are_consistent(self):
+        result = Season_Simulator.simulate(_schedule(), sims=20_000, batch=3_000, workers=1, seed=3)
+        summary = result.summary()
+        self.assertAlmostEqual(summary["p_division"].sum(), 8.0)
+        self.assertAlmostEqual(summary["p_playoffs"].sum(), 14.0)
+        np.testing.assert_allclose(result.seed_probabilities().sum(axis=0), 2.0)
+        np.testing.assert_allclose(result.win_totals().sum(axis=1), 1.0)
+        for division in Season_Simulator.DIVISIONS:
+            self.assertAlmostEqual(summary.loc[summary["division"] == division, "p_division"].sum(), 1.0)
+        self.assertTrue((summary["p_division"] <= summary["p_playoffs"] + 1e-12).all())
+
+        base = Season_Simulator.season_arrays(_schedule())["base"]
+        np.testing.assert_allclose(summary["mean_wins"], base + 4.5, atol=0.1)   # 9 coin flips left each
+        over = result.prob_over("LA", 8.5)
+        totals = result.win_totals().loc["LAR"]
+        self.assertAlmostEqual(over, totals[totals.index > 8.5].sum())
+
+    def test_seeded_result_independent_of_workers(self):
+        schedule = _schedule(p_home=0.6)
+        serial = Season_Simulator.simulate(schedule, sims=4_000, batch=1_000, workers=1, seed=5)
+        pooled = Season_Simulator.simulate(schedule, sims=4_000, batch=1_000, workers=2, seed=5)
+        for key in ("win_hist", "division", "seeds"):
+            np.testing.assert_array_equal(serial.totals[key], pooled.totals[key])
+        self.assertEqual(pooled.n, 4_000)
+
+    def test_rejects_unscored_and_unknown_games(self):
+        schedule = _schedule()
+        schedule.loc[schedule["home_score"].isna().idxmax(), "p_home"] = np.nan
+        with self.assertRaises(ValueError):
+            Season_Simulator.season_arrays(schedule)
+        schedule = _schedule()
+        schedule.loc[0, "home_team"] = "XYZ"
+        with self.assertRaises(ValueError):
+            Season_Simulator.season_arrays(schedule)
+
+
+class TestSeasonSimulatorRun(unittest.TestCase):
+    """run() end to end on stubbed nflverse schedules / lines and logistic models."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        # NFLDataProvider imports nfl_data_py at module level; every call into it is patched below
+        modules = mock.patch.dict(sys.modules, {"nfl_data_py": types.ModuleType("nfl_data_py")})
+        modules.start()
+        self.addCleanup(modules.stop)
+        self.provider = importlib.import_module("src.DataProviders.NFLDataProvider")
+
+        schedule = synthetic.schedules([2024])
+        schedule.loc[schedule["week"] > 12, ["home_score", "away_score"]] = np.nan
+        schedule["game_type"] = "REG"
+        schedule["stadium"] = "Somewhere Field"   # nflverse carries text columns the models never see
+        self.schedule = schedule
+        rng = np.random.default_rng(1)
+        lines = pd.DataFrame({"game_id": schedule["game_id"], "spread_line": rng.normal(0, 6, len(schedule)),
+                              "total_line": rng.normal(44, 4, len(schedule)),
+                              "home_moneyline": rng.choice([-200.0, -120.0, 110.0, 170.0], len(schedule))})
+        lines["away_moneyline"] = -lines["home_moneyline"]
+
+        features = synthetic.features(seasons=[2022, 2023])
+        models = {key: os.path.join(self.tmp.name, f"{key}.pkl")
+                  for key in ("xgb_ml", "xgb_ou", "nn_ml", "nn_ou", "log_ml", "log_ou")}
+        model = LogisticRegression(max_iter=500).fit(feature_matrix(features), features["home_win"])
+        joblib.dump(model, models["log_ml"])
+        joblib.dump(model, models["log_ou"])
+
+        config = {"data": {"seasons": [2024], "current_season": 2024}, "models": models}
+        for target, name, value in (
+                (self.provider, "import_schedules", lambda seasons: self.schedule.copy()),
+                (self.provider, "import_lines", lambda seasons: lines),
+                (self.provider, "_team_history", lambda seasons: team_games(self.schedule,
+                                                                             synthetic.team_epa(self.schedule))),
+                (self.provider, "STATE_PATH", os.path.join(self.tmp.name, "team_state.npz")),
+                (self.provider, "load_config", lambda: config),
+                (Model_Registry, "load_config", lambda: config),
+                (Season_Simulator, "load_config", lambda: config)):
+            patcher = mock.patch.object(target, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(Model_Registry.clear)
+        self.addCleanup(db.close_all)
+
+    def test_run_scores_remaining_games_in_schedule_order(self):
+        db_path = os.path.join(self.tmp.name, "dataset.sqlite")
+        simulated = []
+        simulate = Season_Simulator.simulate
+
+        def spy(schedule, **kwargs):
+            simulated.append(schedule)
+            return simulate(schedule, **kwargs)
+
+        with mock.patch.object(Season_Simulator, "simulate", side_effect=spy):
+            Season_Simulator.run(2024, db_path, family="log", sims=500, batch=250, workers=1)
+
+        schedule = simulated[0]
+        remaining = schedule["home_score"].isna()
+        self.assertTrue(schedule.loc[remaining, "p_home"].between(0, 1).all())
+        self.assertTrue(schedule.loc[~remaining, "p_home"].isna().all())
+        # every unplayed game carries its own probability (same game -> same row)
+        built = self.provider._build_games([2024], schedules=self.schedule[self.schedule["home_score"].isna()].copy())
+        expected = predict_batch(built[self.provider.FEATURE_COLUMNS], ["log"])["log_ml"]
+        expected.index = built["game_id"].to_numpy()
+        np.testing.assert_allclose(schedule.loc[remaining, "p_home"],
+                                   expected.loc[schedule.loc[remaining, "game_id"]].to_numpy())
+        self.assertEqual(len(tools.load_table("season_simulation", db_path)), 32)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import xgboost as xgb
+
+from src.Utils import train_harness
+
+
+class TestTrainHarness(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.X = rng.normal(size=(400, 5))
+        self.y = (self.X[:, 0] + rng.normal(scale=0.5, size=400) > 0).astype(int)
+        self.params = {"max_depth": 2, "eta": 0.3, "objective": "multi:softprob", "num_class": 2}
+
+    def test_split_indices_reproducible(self):
+        a = train_harness.split_indices(100, 0.1, seed=7)
+        b = train_harness.split_indices(100, 0.1, seed=7)
+        np.testing.assert_array_equal(a[1], b[1])
+        self.assertEqual(len(a[1]), 10)
+        self.assertEqual(len(np.intersect1d(a[0], a[1])), 0)
+
+    def test_run_saves_best_model(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "model.json")
+            reports = [train_harness.run_monte_carlo(self.X, self.y, self.params, 10, path,
+                                                     iterations=6, workers=2, seed=1)
+                       for _ in range(2)]
+            self.assertEqual(reports[0], reports[1])
+            self.assertEqual(reports[0]["max"], reports[0]["best_accuracy"])
+            booster = xgb.Booster()
+            booster.load_model(path)
+            self.assertEqual(os.listdir(tmp), ["model.json"])
@@ -0,0 +1,88 @@
+import os
+import tempfile
+import tomllib
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from src.Utils import db, tools, tuning
+
+FAST = {"max_rounds": 40, "report_every": 10, "early_stopping": 10, "min_trials": 1}
+
+
+def _features(n=300):
+    rng = np.random.default_rng(0)
+    spread = rng.normal(scale=5, size=n)
+    return pd.DataFrame({
+        "season": 2015 + np.arange(n) // 30,
+        "week": np.arange(n) % 30 // 2 + 1,
+        "gameday": [f"2020-01-{i:04d}" for i in range(n)],
+        "home_team": ["KC"] * n,
+        "away_team": ["BUF"] * n,
+        "spread_line": spread,
+        "total_line": rng.normal(45, 4, size=n),
+        "home_win": (spread + rng.normal(scale=3, size=n) < 0).astype(int),
+        "ou_cover": rng.integers(0, 2, size=n),
+    })
+
+
+class TestTuning(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = os.path.join(self.tmp.name, "test.sqlite")
+        tools.upsert_partitions(_features(), "features_all", db_path=self.db, replace=True)
+        patcher = mock.patch.object(tuning, "load_config", return_value={})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        db.close_all()
+        self.tmp.cleanup()
+
+    def test_study_resumes_and_exports(self):
+        best = tuning.run_study("xgb_ml", trials=3, workers=2, db_path=self.db, **FAST)
+        trials = tuning.load_trials("xgb_ml", self.db)
+        self.assertEqual(sorted(trials["trial"]), [0, 1, 2])
+        self.assertTrue(set(trials["state"]) <= {"complete", "pruned"})
+        self.assertEqual(best["value"], trials.loc[trials["state"] == "complete", "value"].min())
+
+        # same trial count -> nothing reruns; larger count -> only the new trials run
+        finished = trials["finished_at"].tolist()
+        tuning.run_study("xgb_ml", trials=3, workers=2, db_path=self.db, **FAST)
+        self.assertEqual(tuning.load_trials("xgb_ml", self.db)["finished_at"].tolist(), finished)
+        tuning.run_study("xgb_ml", trials=5, workers=2, db_path=self.db, **FAST)
+        self.assertEqual(len(tuning.load_trials("xgb_ml", self.db)), 5)
+
+        path = os.path.join(self.tmp.name, "config.toml")
+        with open(path, "w") as f:
+            f.write('[training]\nseed = 42\n\n[tuned.xgb_ml]\nmax_depth = 99\n\n[betting]\nou_odds = -110\n')
+        exported = tuning.export_best("xgb_ml", db_path=self.db, path=path)
+        with open(path, "rb") as f:
+            config = tomllib.load(f)
+        self.assertEqual(config["training"], {"seed": 42})
+        self.assertEqual(config["betting"], {"ou_odds": -110})
+        params, rounds = tuning.xgb_params(config, "xgb_ml", {"objective": "multi:softprob"})
+        self.assertEqual(params["max_depth"], exported["max_depth"])
+        self.assertEqual(rounds, exported["num_boost_round"])
+
+    def test_median_pruning(self):
+        with db.connect(self.db) as conn:
+            tuning._ensure_tables(conn)
+        for trial, value in enumerate([0.60, 0.62, 0.64]):
+            tuning._start_trial(self.db, "s", trial, {})
+            tuning.report_step(self.db, "s", trial, 10, value, min_trials=3)
+            tuning._finish_trial(self.db, "s", trial, "complete", value, 10)
+        self.assertFalse(tuning.report_step(self.db, "s", 3, 10, 0.61, min_trials=3))
+        self.assertTrue(tuning.report_step(self.db, "s", 4, 10, 0.70, min_trials=3))
+        self.assertFalse(tuning.report_step(self.db, "s", 5, 10, 0.70, min_trials=4))
+
+    def test_defaults_without_tuned_section(self):
+        self.assertEqual(tuning.xgb_params({}, "xgb_ml", {"max_depth": 3}), ({"max_depth": 3}, 750))
+        self.assertEqual(tuning.nn_params({}, "nn_ml"), tuning.NN_DEFAULTS)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,429 @@
+"""
+Benchmark suite: data loading, feature building, training and inference on synthetic data
+- Runs in a throwaway sandbox (its own config.toml, SQLite DB, feature store and models),
+  so it needs no network and never touches Data/ or Models/
+- Each benchmark is timed until it has run for min_time (median / min / mean recorded)
+- Every run is appended to benchmarks/results/history.jsonl and compared against
+  benchmarks/results/baseline.json; benchmarks slower than baseline x (1 + tolerance) are flagged
+
+Usage:
+    python -m benchmarks.run                       # full scale (13 synthetic seasons)
+    python -m benchmarks.run --quick -k inference  # small scale, names containing "inference"
+    python -m benchmarks.run --save-baseline       # make this run the baseline
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from datetime import datetime
+
+import numpy as np
+
+from benchmarks import synthetic
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(REPO, "benchmarks", "results")
+MODEL_FILES = {
+    "xgb_ml": "Models/xgb_ml.json", "xgb_ou": "Models/xgb_ou.json",
+    "nn_ml": "Models/nn_ml.keras", "nn_ou": "Models/nn_ou.keras",
+    "log_ml": "Models/log_ml.pkl", "log_ou": "Models/log_ou.pkl",
+}
+SCALES = {
+    "full": {"seasons": range(2012, 2025), "rounds": 750, "min_time": 0.5, "min_repeat": 3},
+    "quick": {"seasons": range(2023, 2025), "rounds": 50, "min_time": 0.05, "min_repeat": 2},
+}
+SLATE, SEASON = 16, 285   # rows per inference call: one week, one regular season + playoffs
+
+BENCHMARKS = {}
+
+
+def bench(name: str):
+    """Register a benchmark: fn(ctx) returns the callable to time, or None to skip."""
+    def register(fn):
+        BENCHMARKS[name] = fn
+        return fn
+    return register
+
+
+# ---------------------------------------------------------------- sandbox
+
+class Context:
+    """Sandbox state shared by the benchmarks; models are trained on first use."""
+
+    def __init__(self, root: str, scale: dict):
+        from src.Utils.tools import upsert_partitions, save_table
+        self.root, self.scale = root, scale
+        self.db_path = "Data/dataset.sqlite"
+        self.features = synthetic.features(seasons=scale["seasons"])
+        complete = {(int(s), int(w)): True for s, w in self.features[["season", "week"]].drop_duplicates().to_numpy()}
+        upsert_partitions(self.features, "features_all", complete, self.db_path, replace=True)
+        save_table(self.features[synthetic.FEATURE_COLUMNS].iloc[:SLATE], "todays_games", self.db_path)
+        self.X = self.features.drop(columns=["gameday", "home_team", "away_team"] + synthetic.LABEL_COLUMNS) \
+            .to_numpy(dtype=float)
+        self.y = self.features["home_win"].to_numpy()
+        self._trained = {}
+
+    def model(self, family: str) -> bool:
+        """Train and save both markets of a family once; False if its framework is missing."""
+        if family not in self._trained:
+            try:
+                for market, label in (("ml", "home_win"), ("ou", "ou_cover")):
+                    _train(family, self.X, self.features[label].to_numpy(), MODEL_FILES[f"{family}_{market}"],
+                           self.scale["rounds"])
+                self._trained[family] = True
+            except ImportError:
+                self._trained[family] = False
+        return self._trained[family]
+
+
+def _train(family, X, y, path, rounds):
+    if family == "xgb":
+        import xgboost as xgb
+        from src.Utils.train_harness import OBJECTIVES
+        params = {"max_depth": 3, "eta": 0.01, **OBJECTIVES["binary"]}
+        xgb.train(params, xgb.DMatrix(X, label=y), num_boost_round=rounds).save_model(path)
+    elif family == "log":
+        import joblib
+        from sklearn.linear_model import LogisticRegression
+        joblib.dump(LogisticRegression(max_iter=1000).fit(X, y), path)
+    elif family == "nn":
+        from src.Utils.scaling import fit_scaler, scaler_path
+        from src.Utils.tuning import NN_DEFAULTS, build_nn
+        scaler = fit_scaler(X)
+        scaler.save(scaler_path(path))
+        model = build_nn(NN_DEFAULTS)
+        model.fit(scaler.transform(X), y, epochs=1, batch_size=32, verbose=0)
+        model.save(path)
+
+
+@contextlib.contextmanager
+def sandbox(scale: dict):
+    """Temp working directory with its own config.toml / Data / Models; restores cwd afterwards."""
+    from src.Utils import db
+    from src.Utils.tuning import write_config_section
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as root:
+        os.makedirs(os.path.join(root, "Data"))
+        os.makedirs(os.path.join(root, "Models"))
+        path = os.path.join(root, "config.toml")
+        open(path, "w").close()
+        seasons = list(scale["seasons"])
+        write_config_section("data", {"db_path": "Data/dataset.sqlite", "seasons": seasons,
+                                      "current_season": seasons[-1]}, path)
+        write_config_section("models", MODEL_FILES, path)
+        write_config_section("training", {"iterations": 1, "workers": 1, "seed": 42, "test_size": 0.1,
+                                          "objective": "binary"}, path)
+        write_config_section("betting", {"ou_odds": -110}, path)
+        os.chdir(root)
+        try:
+            yield Context(root, scale)
+        finally:
+            from src.Predict import Model_Registry
+            Model_Registry.clear()
+            db.close_all()
+            os.chdir(cwd)
+
+
+# ---------------------------------------------------------------- benchmarks
+
+@bench("load_table.features_all")
+def _load_table(ctx):
+    from src.Utils.tools import load_table
+    return lambda: load_table("features_all", ctx.db_path)
+
+
+@bench("load_training_data.store")
+def _load_training(ctx):
+    from src.Utils.tools import load_training_data
+    return lambda: np.asarray(load_training_data("home_win", db_path=ctx.db_path)[0]).sum()
+
+
+@bench("feature_build.as_of")
+def _feature_build(ctx):
+    from src.features.rolling_features import as_of_features, team_games
+    games = synthetic.schedules(ctx.scale["seasons"])
+    history = team_games(games, synthetic.team_epa(games))
+    return lambda: as_of_features(games, history)
+
+
+@bench("feature_build.upsert")
+def _feature_upsert(ctx):
+    from src.Utils.tools import upsert_partitions
+    df = ctx.features.copy()
+    state = {"flip": 0}
+
+    def run():
+        # change every partition so each run really rewrites the table and the store
+        state["flip"] ^= 1
+        df["spread_vs_epa"] = ctx.features["spread_vs_epa"] + state["flip"]
+        upsert_partitions(df, "features_all", db_path=ctx.db_path, replace=True)
+    return run
+
+
+@bench("feature_build.scaler_fit")
+def _scaler_fit(ctx):
+    from src.Utils.scaling import fit_feature_store
+    fit_feature_store(db_path=ctx.db_path)   # refresh the store outside the timing
+    return lambda: fit_feature_store(db_path=ctx.db_path)
+
+
+@bench("train.xgb_split")
+def _train_xgb(ctx):
+    try:
+        import xgboost  # noqa: F401
+    except ImportError:
+        return None
+    from src.Utils import train_harness
+    params = {"max_depth": 3, "eta": 0.01, **train_harness.OBJECTIVES["binary"], "nthread": os.cpu_count()}
+    train_harness._init_worker(ctx.X.astype(np.float32), ctx.y, params, ctx.scale["rounds"], 0.1)
+    seeds = iter(range(10**9))
+    return lambda: train_harness._run_split(next(seeds))
+
+
+@bench("train.log_fit")
+def _train_log(ctx):
+    from sklearn.linear_model import LogisticRegression
+    return lambda: LogisticRegression(max_iter=1000).fit(ctx.X, ctx.y)
+
+
+@bench("train.nn_epoch")
+def _train_nn(ctx):
+    try:
+        import tensorflow  # noqa: F401
+    except ImportError:
+        return None
+    from src.Utils.scaling import fit_scaler
+    from src.Utils.tuning import NN_DEFAULTS, build_nn
+    model, X = build_nn(NN_DEFAULTS), fit_scaler(ctx.X).transform(ctx.X)
+    return lambda: model.fit(X, ctx.y, epochs=1, batch_size=NN_DEFAULTS["batch_size"], verbose=0)
+
+
+def _inference(family, rows):
+    def setup(ctx):
+        from src.Predict.Batch_Predictor import FeatureBatch, predict_family
+        if not ctx.model(family):
+            return None
+        X = ctx.X[:len(ctx.X) if rows is None else rows]
+        predict_family(family, FeatureBatch(X))   # load the models outside the timing
+        return lambda: predict_family(family, FeatureBatch(X))
+    return setup
+
+
+for _family in ("xgb", "nn", "log"):
+    for _scale, _rows in (("slate", SLATE), ("season", SEASON), ("history", None)):
+        bench(f"inference.{_family}.{_scale}")(_inference(_family, _rows))
+
+
+def _compiled_inference(family, rows):
+    def setup(ctx):
+        from src.Predict.Batch_Predictor import FeatureBatch, nn_input
+        from src.Predict.Compiled_Models import export_model, load_compiled
+        if not ctx.model(family):
+            return None
+        # written outside Models/ so the registry-backed inference.* benchmarks keep the original models
+        out = os.path.join(ctx.root, f"{family}_ml.bench.npz")
+        export_model(f"{family}_ml", ctx.X[:SEASON], path=MODEL_FILES[f"{family}_ml"], out=out)
+        model, X = load_compiled(out), ctx.X[:len(ctx.X) if rows is None else rows]
+        X = nn_input("nn_ml", FeatureBatch(X)) if family == "nn" else X
+        return lambda: model.predict(X)
+    return setup
+
+
+for _family in ("xgb", "nn"):
+    for _scale, _rows in (("slate", SLATE), ("season", SEASON)):
+        bench(f"inference.compiled_{_family}.{_scale}")(_compiled_inference(_family, _rows))
+
+
+@bench("inference.batch_all.slate")
+def _batch_all(ctx):
+    from src.Predict.Batch_Predictor import predict_batch
+    from src.Utils.tools import load_table
+    families = [f for f in ("xgb", "nn", "log") if ctx.model(f)]
+    games = load_table("todays_games", ctx.db_path)
+    predict_batch(games, families)
+    return lambda: predict_batch(games, families)
+
+
+@bench("inference.logged.slate")
+def _logged_slate(ctx):
+    from src.Predict.Prediction_Log import predict_logged
+    from src.Utils.tools import load_table
+    families = [f for f in ("xgb", "nn", "log") if ctx.model(f)]
+    games = load_table("todays_games", ctx.db_path)
+    predict_logged(games, families, db_path=ctx.db_path)   # fill the log: the timed reruns are cache hits
+    return lambda: predict_logged(games, families, db_path=ctx.db_path)
+
+
+@bench("odds.vectorized_100k")
+def _odds_vectorized(ctx):
+    from src.Utils import Odds
+    rng = np.random.default_rng(0)
+    odds = rng.choice([-300, -200, -150, -110, 100, 120, 150, 250], 100_000).astype(float)
+    probs = rng.uniform(0.2, 0.8, 100_000)
+    return lambda: (Odds.expected_value(probs, odds), Odds.kelly_criterion(odds, probs))
+
+
+@bench("odds.scalar_1k")
+def _odds_scalar(ctx):
+    from src.Utils import Expected_Value, Kelly_Criterion
+    rng = np.random.default_rng(0)
+    pairs = list(zip(rng.uniform(0.2, 0.8, 1000).tolist(), rng.choice([-200, -110, 120, 250], 1000).tolist()))
+
+    def run():
+        for p, o in pairs:
+            Expected_Value.expected_value(p, o)
+            Kelly_Criterion.calculate_kelly_criterion(o, p)
+    return run
+
+
+@bench("simulation.season_100k")
+def _season_simulation(ctx):
+    from src.Predict.Season_Simulator import simulate
+    schedule = synthetic.schedules([2024])
+    schedule.loc[schedule["week"] > 8, ["home_score", "away_score"]] = np.nan
+    schedule["p_home"] = np.random.default_rng(0).uniform(0.2, 0.8, len(schedule))
+    return lambda: simulate(schedule, sims=100_000, workers=1)
+
+
+@bench("portfolio.slate_kelly")
+def _portfolio(ctx):
+    from src.Utils.Odds import american_to_implied
+    from src.Utils.Portfolio import optimize_slate
+    rng = np.random.default_rng(0)
+    games = ctx.features[synthetic.FEATURE_COLUMNS].iloc[:SLATE].reset_index(drop=True)
+    ml = np.clip(american_to_implied(games["home_moneyline"]) + rng.normal(0, 0.06, SLATE), 0.05, 0.95)
+    ou = np.clip(0.5 + rng.normal(0, 0.06, SLATE), 0.05, 0.95)
+    return lambda: optimize_slate(games, ml, ou, correlation=0.1)
+
+
+@bench("feature_build.pbp_season")
+def _pbp_season(ctx):
+    from src.features.pbp_features import aggregate_season, iter_pbp
+    games = synthetic.schedules([2024])
+    plays = synthetic.play_by_play(games)
+    next(iter_pbp([2024], lambda seasons: plays, batch_rows=8192))   # fill the cache outside the timing
+    return lambda: aggregate_season((b for _, b in iter_pbp([2024], batch_rows=8192)), games)
+
+
+# ---------------------------------------------------------------- timing, history, regressions
+
+def measure(fn, min_time: float, min_repeat: int, max_repeat: int = 100) -> dict:
+    fn()   # warm-up
+    times = []
+    while len(times) < min_repeat or (sum(times) < min_time and len(times) < max_repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return {"median": float(np.median(times)), "min": float(min(times)),
+            "mean": float(np.mean(times)), "repeat": len(times)}
+
+
+def run_benchmarks(mode: str = "full", select: str = None) -> dict:
+    scale = SCALES[mode]
+    results = {}
+    with sandbox(scale) as ctx:
+        for name, setup in BENCHMARKS.items():
+            if select and select not in name:
+                continue
+            with warnings.catch_warnings(), contextlib.redirect_stdout(io.StringIO()):
+                warnings.simplefilter("ignore")
+                fn = setup(ctx)
+            if fn is None:
+                results[name] = {"skipped": True}
+                print(f"[benchmarks] {name:32s} skipped (framework not installed)")
+                continue
+            # library log lines / convergence warnings would drown the report
+            with warnings.catch_warnings(), contextlib.redirect_stdout(io.StringIO()):
+                warnings.simplefilter("ignore")
+                results[name] = measure(fn, scale["min_time"], scale["min_repeat"])
+            print(f"[benchmarks] {name:32s} {results[name]['median'] * 1000:10.2f} ms "
+                  f"(min {results[name]['min'] * 1000:.2f}, n={results[name]['repeat']})")
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()} x{os.cpu_count()}",
+        "mode": mode,
+        "results": results,
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(run: dict, baseline: dict, tolerance: float = 0.2) -> list:
+    """Benchmarks whose median got slower than baseline x (1 + tolerance): [(name, base, now, ratio)]."""
+    regressions = []
+    for name, result in run["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base or "median" not in base or "median" not in result:
+            continue
+        ratio = result["median"] / base["median"]
+        if ratio > 1 + tolerance:
+            regressions.append((name, base["median"], result["median"], ratio))
+    return regressions
+
+
+def save_run(run: dict, results_dir: str = RESULTS_DIR, baseline: bool = False):
+    os.makedirs(results_dir, exist_ok=True)
+    with open(os.path.join(results_dir, "history.jsonl"), "a") as f:
+        f.write(json.dumps(run) + "\n")
+    if baseline:
+        baselines = load_baselines(results_dir)
+        baselines[run["mode"]] = run
+        with open(os.path.join(results_dir, "baseline.json"), "w") as f:
+            json.dump(baselines, f, indent=2)
+
+
+def load_baselines(results_dir: str = RESULTS_DIR) -> dict:
+    """Baseline run per mode ({"full": run, "quick": run})."""
+    path = os.path.join(results_dir, "baseline.json")
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Performance benchmarks on synthetic data")
+    parser.add_argument("--quick", action="store_true", help="Small scale (2 seasons, 50 boosting rounds)")
+    parser.add_argument("-k", dest="select", help="Only benchmarks whose name contains this")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown vs baseline (0.2 = 20%%)")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit 1 if anything regressed")
+    parser.add_argument("--results-dir", default=RESULTS_DIR)
+    args = parser.parse_args(argv)
+
+    run = run_benchmarks("quick" if args.quick else "full", args.select)
+    baseline = load_baselines(args.results_dir).get(run["mode"])
+    save_run(run, args.results_dir, baseline=args.save_baseline)
+
+    if args.save_baseline:
+        print(f"[benchmarks] Saved as the {run['mode']} baseline")
+    if baseline is None:
+        if not args.save_baseline:
+            print(f"[benchmarks] No {run['mode']} baseline yet (use --save-baseline)")
+        return 0
+    regressions = compare(run, baseline, args.tolerance)
+    for name, base, now, ratio in regressions:
+        print(f"[benchmarks] REGRESSION {name}: {base * 1000:.2f} ms -> {now * 1000:.2f} ms ({ratio:.2f}x)")
+    if not regressions:
+        print(f"[benchmarks] No regressions vs baseline {baseline.get('commit')} ({baseline['timestamp']})")
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""
+Synthetic, features_all-shaped data for the benchmarks (no network, seeded)
+"""
+
+import numpy as np
+import pandas as pd
+
+# Same layout as NFLDataProvider.FEATURE_COLUMNS + LABEL_COLUMNS
+FEATURE_COLUMNS = [
+    "season", "week", "gameday",
+    "home_team", "away_team",
+    "spread_line", "total_line", "home_moneyline", "away_moneyline",
+    "home_epa", "away_epa", "home_ppg", "away_ppg",
+    "home_rest", "away_rest", "home_travel", "away_travel",
+    "epa_diff", "ppg_diff", "rest_diff", "spread_vs_epa",
+]
+LABEL_COLUMNS = ["home_win", "ou_cover"]
+
+TEAMS = ["ARI", "ATL", "BAL", "BUF", "CAR", "CHI", "CIN", "CLE", "DAL", "DEN", "DET", "GB",
+         "HOU", "IND", "JAX", "KC", "LV", "LAC", "LA", "MIA", "MIN", "NE", "NO", "NYG",
+         "NYJ", "PHI", "PIT", "SEA", "SF", "TB", "TEN", "WAS"]
+GAMES_PER_WEEK = 16
+WEEKS = 17
+
+
+def schedules(seasons=range(2012, 2025), seed: int = 0) -> pd.DataFrame:
+    """Completed schedules (game_id, season, week, gameday, teams, scores) for full seasons."""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for season in seasons:
+        opening = np.datetime64(f"{season}-09-08")
+        for week in range(1, WEEKS + 1):
+            order = rng.permutation(len(TEAMS))
+            day = str(opening + np.timedelta64(7 * (week - 1), "D"))
+            for g in range(GAMES_PER_WEEK):
+                home, away = TEAMS[order[2 * g]], TEAMS[order[2 * g + 1]]
+                rows.append((f"{season}_{week:02d}_{away}_{home}", season, week, day, home, away))
+    games = pd.DataFrame(rows, columns=["game_id", "season", "week", "gameday", "home_team", "away_team"])
+    games["home_score"] = rng.poisson(23, len(games)).astype(float)
+    games["away_score"] = rng.poisson(21, len(games)).astype(float)
+    return games
+
+
+def team_epa(games: pd.DataFrame, seed: int = 0) -> pd.DataFrame:
+    """Per-game offensive EPA/play rows (season, week, team, epa) for a schedule."""
+    rng = np.random.default_rng(seed)
+    teams = np.r_[games["home_team"].to_numpy(), games["away_team"].to_numpy()]
+    return pd.DataFrame({
+        "season": np.r_[games["season"].to_numpy(), games["season"].to_numpy()],
+        "week": np.r_[games["week"].to_numpy(), games["week"].to_numpy()],
+        "team": teams,
+        "epa": rng.normal(0, 0.15, len(teams)),
+    })
+
+
+def features(n_games: int = None, seasons=range(2012, 2025), seed: int = 0) -> pd.DataFrame:
+    """features_all rows with plausible value ranges and learnable labels."""
+    games = schedules(seasons, seed)
+    if n_games is not None:
+        games = games.iloc[:n_games]
+    rng = np.random.default_rng(seed + 1)
+    n = len(games)
+    df = games[["season", "week", "gameday", "home_team", "away_team"]].copy()
+    df["home_epa"], df["away_epa"] = rng.normal(0, 0.1, n), rng.normal(0, 0.1, n)
+    df["home_ppg"], df["away_ppg"] = rng.normal(22, 4, n), rng.normal(22, 4, n)
+    df["home_rest"], df["away_rest"] = rng.choice([6.0, 7.0, 10.0, 14.0], n), rng.choice([6.0, 7.0, 10.0, 14.0], n)
+    df["home_travel"], df["away_travel"] = np.zeros(n), rng.uniform(0, 2500, n)
+    df["epa_diff"] = df["home_epa"] - df["away_epa"]
+    df["ppg_diff"] = df["home_ppg"] - df["away_ppg"]
+    df["rest_diff"] = df["home_rest"] - df["away_rest"]
+    df["spread_line"] = np.round(-(df["epa_diff"] * 40 + 2.5 + rng.normal(0, 2, n)) * 2) / 2
+    df["total_line"] = np.round((df["home_ppg"] + df["away_ppg"] + rng.normal(0, 2, n)) * 2) / 2
+    fav = df["spread_line"] < 0
+    df["home_moneyline"] = np.where(fav, -110 - 25 * df["spread_line"].abs(), 100 + 20 * df["spread_line"].abs())
+    df["away_moneyline"] = np.where(fav, 100 + 20 * df["spread_line"].abs(), -110 - 25 * df["spread_line"].abs())
+    df["spread_vs_epa"] = df["spread_line"] - df["epa_diff"]
+
+    margin = -df["spread_line"] + rng.normal(0, 13, n)
+    df["home_win"] = (margin > 0).astype(int)
+    df["ou_cover"] = (df["total_line"] + rng.normal(0, 10, n) > df["total_line"]).astype(int)
+    return df[FEATURE_COLUMNS + LABEL_COLUMNS].reset_index(drop=True)
+
+
+def play_by_play(games: pd.DataFrame, plays_per_game: int = 130, seed: int = 0) -> pd.DataFrame:
+    """nflverse-shaped play-by-play rows (float64 flags, string team codes) for a schedule."""
+    rng = np.random.default_rng(seed)
+    n = len(games) * plays_per_game
+    game = np.repeat(np.arange(len(games)), plays_per_game)
+    home_has_ball = rng.random(n) < 0.5
+    home, away = games["home_team"].to_numpy()[game], games["away_team"].to_numpy()[game]
+    kind = rng.choice(["pass", "run", "kickoff", "punt", "no_play"], n, p=[0.5, 0.38, 0.04, 0.04, 0.04])
+    passing, rushing = kind == "pass", kind == "run"
+    yards = np.where(passing | rushing, np.round(rng.gamma(1.2, 4.5, n) - 2), 0.0)
+    epa = rng.normal(0.0, 1.2, n) + 0.08 * (yards - 4)
+    df = pd.DataFrame({
+        "game_id": games["game_id"].to_numpy()[game],
+        "season": games["season"].to_numpy()[game],
+        "week": games["week"].to_numpy()[game],
+        "game_date": games["gameday"].to_numpy()[game],
+        "home_team": home,
+        "away_team": away,
+        "posteam": np.where(home_has_ball, home, away),
+        "defteam": np.where(home_has_ball, away, home),
+        "play_type": kind,
+        "epa": epa,
+        "success": (epa > 0).astype(float),
+        "yards_gained": yards,
+        "pass": passing.astype(float),
+        "rush": rushing.astype(float),
+        "sack": (passing & (rng.random(n) < 0.065)).astype(float),
+        "interception": (passing & (rng.random(n) < 0.025)).astype(float),
+        "fumble_lost": ((passing | rushing) & (rng.random(n) < 0.008)).astype(float),
+        "down": np.where(passing | rushing, rng.integers(1, 5, n), np.nan),
+        "yardline_100": rng.integers(1, 100, n).astype(float),
+    })
+    df.loc[kind == "no_play", ["posteam", "defteam"]] = None
+    return df
@@ -1,14 +1,27 @@
+import sys
+
+from src.Utils import startup_profile
+
+# Must run before the other imports so they are timed too
+if "--profile-startup" in sys.argv:
+    startup_profile.enable()
+
 import argparse
-import tensorflow as tf
-import xgboost as xgb
-import pandas as pd
+import os
 
-from src.DataProviders.NFLDataProvider import get_todays_nfl_games
-from src.Predict import NN_Runner, XGBoost_Runner
+# Heavy frameworks (xgboost, tensorflow) are imported by the batch engine / model registry
+# only when the selected model family actually needs them.
+from src.Predict.Batch_Predictor import predict_batch
+from src.Utils import metrics
 from src.Utils.config_loader import load_config
-from src.Utils.tools import load_table
+from src.Utils.tools import load_table, print_game_predictions, save_table
 
-config = load_config()
+TITLES = {
+    "nn": "------------ Neural Network Model Predictions -----------",
+    "xgb": "--------------- XGBoost Model Predictions ---------------",
+    "log": "---------- Logistic Regression Model Predictions ----------",
+    "ensemble": "------- Ensemble (stacked + calibrated) Predictions -------",
+}
 
 def main():
     # Get today's games
@@ -17,28 +30,81 @@ def main():
         print("No NFL games found today. Run Create_Games first.")
         return
 
-    # Features for models
-    X = games.drop(columns=["gameday", "home_team", "away_team"]).values.astype(float)
+    families = [f for f in ("nn", "xgb", "log") if getattr(args, f)]
+    if args.A:
+        print("--------------- Running All Models ---------------")
+        results = run_ensemble(games)
+        if results is not None:
+            print(TITLES["ensemble"])
+            print_game_predictions(games, ml_probs=results["ensemble_ml"], ou_probs=results["ensemble_ou"])
+            if args.kelly is not None:
+                show_portfolio(games, results, "ensemble")
+            if args.save:
+                save_table(results, "todays_predictions")
+            return
+        families = ["xgb", "nn", "log"]
+    if not families:
+        return
 
-    if args.nn:
-        print("------------ Neural Network Model Predictions -----------")
-        X_norm = tf.keras.utils.normalize(X, axis=1)
-        NN_Runner.nn_runner(X_norm, games)
+    # One feature matrix / DMatrix / normalization shared by every model; unchanged games and
+    # models are read back from the prediction log instead of being rescored
+    if load_config().get("prediction_log", {}).get("enabled", True):
+        from src.Predict.Prediction_Log import predict_logged
+        results = predict_logged(games, families)
+        print(f"[main] Prediction log: {results.attrs['log']['hits']} cached, "
+              f"{results.attrs['log']['misses']} scored")
+    else:
+        results = predict_batch(games, families)
 
-    if args.xgb:
-        print("--------------- XGBoost Model Predictions ---------------")
-        XGBoost_Runner.xgb_runner(X, games)
+    for family in families:
+        print(TITLES[family])
+        print_game_predictions(games, ml_probs=results[f"{family}_ml"], ou_probs=results[f"{family}_ou"])
 
-    if args.A:
-        print("--------------- Running All Models ---------------")
-        XGBoost_Runner.xgb_runner(X, games)
-        X_norm = tf.keras.utils.normalize(X, axis=1)
-        NN_Runner.nn_runner(X_norm, games)
+    if args.kelly is not None:
+        preferred = load_config().get("portfolio", {}).get("family", "xgb")
+        show_portfolio(games, results, preferred if preferred in families else families[0])
+
+    if args.save:
+        save_table(results, "todays_predictions")
+
+def run_ensemble(games):
+    """Calibrated ensemble probabilities, or None (with a hint) if no ensemble has been trained."""
+    path = load_config()["models"].get("ensemble")
+    if not path or not os.path.exists(path):
+        print("No ensemble model found (python src/Train-Models/Ensemble_Model.py), showing each family instead.")
+        return None
+    from src.Predict.Ensemble import predict_ensemble
+    return predict_ensemble(games)
+
+def show_portfolio(games, results, family):
+    """Simultaneous Kelly stakes for the slate from one family's probabilities (--kelly)."""
+    from src.Utils.Portfolio import optimize_slate, print_portfolio
+    print(f"------------ Slate Kelly Portfolio ({family}) ------------")
+    bets = optimize_slate(games, results[f"{family}_ml"], results[f"{family}_ou"], bankroll=args.kelly or None)
+    print_portfolio(bets)
+    if args.save:
+        save_table(bets, "todays_portfolio")
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="NFL ML Prediction Runner")
     parser.add_argument("-xgb", action="store_true", help="Run with XGBoost Model")
     parser.add_argument("-nn", action="store_true", help="Run with Neural Network Model")
-    parser.add_argument("-A", action="store_true", help="Run all Models")
+    parser.add_argument("-log", action="store_true", help="Run with Logistic Regression Model")
+    parser.add_argument("-A", action="store_true", help="Run all Models as one calibrated ensemble")
+    parser.add_argument("-save", action="store_true", help="Store the batch predictions in todays_predictions")
+    parser.add_argument("--kelly", nargs="?", type=float, const=0, metavar="BANKROLL",
+                        help="Size the slate's bets jointly (caps from [portfolio]; default bankroll from config)")
+    parser.add_argument("--profile-startup", action="store_true", help="Report import time per module")
+    parser.add_argument("--metrics", nargs="?", const="-", metavar="PATH",
+                        help="Write a JSON timing/counter summary of the run (stdout if no PATH)")
     args = parser.parse_args()
-    main()
+    metrics_path = args.metrics or ("-" if load_config().get("metrics", {}).get("enabled") else None)
+    if metrics_path:
+        metrics.enable()
+    try:
+        main()
+    finally:
+        if args.profile_startup:
+            print(startup_profile.report())
+        if metrics_path:
+            metrics.write_summary(metrics_path, argv=sys.argv[1:])
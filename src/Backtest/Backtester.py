@@ -0,0 +1,171 @@
+"""
+Walk-forward backtesting
+- Replays features_all season by season (or week by week), refitting on a rolling window of prior seasons
+- Each refit scores its whole test block in one batch call
+- Feeds the out-of-sample probabilities to the vectorized staking simulation (flat, EV threshold, Kelly)
+- Reports ROI, drawdown, Brier score and a calibration table
+- --from-log evaluates the deployed models instead: their probabilities are read from the
+  prediction log (only games never scored under the current model/inputs are scored and logged)
+
+Usage:
+    python -m src.Backtest.Backtester --market ml --family log --window 3
+    python -m src.Backtest.Backtester --market ml --family xgb --from-log
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from src.Backtest import Staking
+from src.Utils.config_loader import load_config
+from src.Utils.tools import DB_PATH, KEY_COLUMNS, load_feature_matrix, load_store_column, load_training_data, \
+    store_dir_for
+
+MARKETS = {"ml": "home_win", "ou": "ou_cover"}
+
+DEFAULT_SWEEPS = {
+    "flat": np.round(np.arange(0.50, 0.71, 0.02), 2),
+    "ev": np.round(np.arange(0.0, 0.21, 0.02), 2),
+    "kelly": np.array([0.1, 0.25, 0.5, 1.0]),
+}
+
+
+def make_model(family: str):
+    """Fresh, unfitted classifier with fit / predict_proba for a model family."""
+    if family == "log":
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.pipeline import make_pipeline
+        from sklearn.preprocessing import StandardScaler
+        return make_pipeline(StandardScaler(), LogisticRegression(max_iter=1000))
+    if family == "xgb":
+        from xgboost import XGBClassifier
+        return XGBClassifier(max_depth=3, learning_rate=0.01, n_estimators=750)
+    raise ValueError(f"Unknown backtest model family: {family}")
+
+
+def load_backtest_data(market: str = "ml", db_path: str = DB_PATH) -> dict:
+    """Feature matrix, labels, season/week, game ids and the market's odds columns from the feature store."""
+    from src.Predict.Prediction_Log import game_ids
+    X, y = load_training_data(MARKETS[market], db_path=db_path)
+    _, columns = load_feature_matrix(store_dir=store_dir_for(db_path))
+    X = np.asarray(X)
+    col = columns.index
+    order = np.lexsort((X[:, col("week")], X[:, col("season")]))
+    keys = pd.DataFrame({c: np.asarray(load_store_column(c, store_dir=store_dir_for(db_path)))[order]
+                         for c in KEY_COLUMNS})
+    keys["season"], keys["week"] = X[order, col("season")].astype(int), X[order, col("week")].astype(int)
+    data = {
+        "X": X[order],
+        "y": np.asarray(y)[order],
+        "season": keys["season"].to_numpy(),
+        "week": keys["week"].to_numpy(),
+        "game_id": np.array(game_ids(keys)),
+    }
+    if market == "ml":
+        data["odds_a"] = X[order, col("home_moneyline")]
+        data["odds_b"] = X[order, col("away_moneyline")]
+    else:
+        ou_odds = load_config().get("betting", {}).get("ou_odds", -110)
+        data["odds_a"] = data["odds_b"] = np.full(len(order), float(ou_odds))
+    return data
+
+
+def walk_forward(data: dict, family: str = "log", window: int = 3, refit: str = "season",
+                 start_season: int = None) -> pd.DataFrame:
+    """
+    Out-of-sample probabilities for every game after the first `window` seasons.
+    refit="season": one model per test season, trained on the previous `window` seasons.
+    refit="week":   one model per test week, also trained on the test season's earlier weeks.
+    """
+    X, y, season, week = data["X"], data["y"], data["season"], data["week"]
+    seasons = np.unique(season)
+    start_season = start_season or seasons[min(window, len(seasons) - 1)]
+    probs = np.full(len(y), np.nan)
+
+    for s in seasons[seasons >= start_season]:
+        in_window = (season >= s - window) & (season < s)
+        blocks = [(season == s, in_window)] if refit == "season" else [
+            ((season == s) & (week == w), in_window | ((season == s) & (week < w)))
+            for w in np.unique(week[season == s])
+        ]
+        for test, train in blocks:
+            # pushes (-1) can't be learned as a class
+            train = train & (y >= 0)
+            if not test.any() or len(np.unique(y[train])) < 2:
+                continue
+            model = make_model(family).fit(X[train], y[train])
+            probs[test] = model.predict_proba(X[test])[:, 1]
+
+    scored = ~np.isnan(probs)
+    return pd.DataFrame({
+        "season": season[scored], "week": week[scored], "prob": probs[scored], "outcome": y[scored],
+        "odds_a": data["odds_a"][scored], "odds_b": data["odds_b"][scored],
+    })
+
+
+def logged_predictions(data: dict, market: str = "ml", family: str = "xgb", db_path: str = DB_PATH) -> pd.DataFrame:
+    """
+    The deployed `family` model's probability for every game, served from the prediction log
+    (indexed lookups; games never scored under the current model hash / inputs are scored and logged).
+    Same frame as walk_forward. Deployed models saw most of these seasons in training, so this
+    audits what they said rather than measuring out-of-sample skill.
+    """
+    from src.Predict.Prediction_Log import predict_logged
+    scored = predict_logged(X=data["X"], ids=data["game_id"], families=(family,), db_path=db_path)
+    log = scored.attrs["log"]
+    print(f"[Backtester] Prediction log: {log['hits']} cached, {log['misses']} scored")
+    return pd.DataFrame({
+        "season": data["season"], "week": data["week"], "prob": scored[f"{family}_{market}"].to_numpy(),
+        "outcome": data["y"], "odds_a": data["odds_a"], "odds_b": data["odds_b"],
+    })
+
+
+def evaluate(predictions: pd.DataFrame, sweeps: dict = None, bankroll: float = 100.0) -> dict:
+    """Run every staking strategy over its parameter sweep; returns results, calibration and Brier."""
+    sweeps = sweeps or DEFAULT_SWEEPS
+    predictions = predictions.dropna(subset=["odds_a", "odds_b"])
+    bets = Staking.pick_sides(predictions["prob"], predictions["odds_a"], predictions["odds_b"],
+                              predictions["outcome"].to_numpy())
+    period = predictions["season"].to_numpy() * 100 + predictions["week"].to_numpy()
+    results = pd.concat(
+        [Staking.simulate(bets, period, strategy, params, bankroll) for strategy, params in sweeps.items()],
+        ignore_index=True,
+    )
+    outcome = predictions["outcome"].to_numpy()
+    return {
+        "results": results,
+        "calibration": Staking.calibration(predictions["prob"], outcome),
+        "brier": Staking.brier_score(predictions["prob"], outcome),
+        "accuracy": float(((predictions["prob"] > 0.5) == (outcome == 1))[outcome >= 0].mean()),
+    }
+
+
+def run_backtest(market: str = "ml", family: str = "log", window: int = 3, refit: str = "season",
+                 db_path: str = DB_PATH, sweeps: dict = None, from_log: bool = False) -> dict:
+    data = load_backtest_data(market, db_path)
+    if from_log:
+        predictions = logged_predictions(data, market, family, db_path)
+    else:
+        predictions = walk_forward(data, family, window, refit)
+    report = evaluate(predictions, sweeps)
+    report["predictions"] = predictions
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Walk-forward NFL backtest")
+    parser.add_argument("--market", choices=list(MARKETS), default="ml")
+    parser.add_argument("--family", choices=["log", "xgb", "nn"], default="log",
+                        help="nn only with --from-log (walk-forward refits log / xgb)")
+    parser.add_argument("--window", type=int, default=3, help="Training seasons before each test season")
+    parser.add_argument("--refit", choices=["season", "week"], default="season")
+    parser.add_argument("--from-log", action="store_true",
+                        help="Evaluate the deployed models' logged probabilities instead of walk-forward refits")
+    args = parser.parse_args()
+
+    report = run_backtest(args.market, args.family, args.window, args.refit, from_log=args.from_log)
+    print(f"[Backtester] {len(report['predictions'])} games scored, "
+          f"accuracy {report['accuracy']:.3f}, Brier {report['brier']:.4f}")
+    print(report["results"].to_string(index=False))
+    print(report["calibration"].to_string(index=False))
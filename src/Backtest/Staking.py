@@ -0,0 +1,115 @@
+"""
+Vectorized staking simulation
+- Flat, EV-threshold and Kelly staking over a whole backtest in a few array ops
+- Every strategy takes an array of parameters and simulates all of them at once
+  (shape: params x bets), so a parameter sweep costs one call
+- Bets within a week are placed from the bankroll at the start of that week
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.Utils import Odds
+
+
+def pick_sides(prob, odds_a, odds_b, outcome):
+    """
+    Choose the higher-EV side of each two-way market.
+    prob    = model P(side A)    (home win / over)
+    outcome = 1 side A, 0 side B, -1 push
+    Returns dict of per-bet arrays: p, net (profit per unit), ev (per unit), ret (realized per unit).
+    """
+    prob = np.asarray(prob, dtype=float)
+    outcome = np.asarray(outcome)
+    net_a, net_b = Odds.american_to_net(odds_a), Odds.american_to_net(odds_b)
+    ev_a = prob * net_a - (1 - prob)
+    ev_b = (1 - prob) * net_b - prob
+    take_a = ev_a >= ev_b
+
+    p = np.where(take_a, prob, 1 - prob)
+    net = np.where(take_a, net_a, net_b)
+    won = np.where(take_a, outcome == 1, outcome == 0)
+    ret = np.where(outcome == -1, 0.0, np.where(won, net, -1.0))
+    return {"side_a": take_a, "p": p, "net": net, "ev": np.where(take_a, ev_a, ev_b), "ret": ret}
+
+
+def _week_starts(period):
+    period = np.asarray(period)
+    return np.flatnonzero(np.r_[True, period[1:] != period[:-1]])
+
+
+def _max_drawdown(paths):
+    peaks = np.maximum.accumulate(paths, axis=1)
+    return ((peaks - paths) / peaks).max(axis=1)
+
+
+def simulate(bets: dict, period, strategy: str = "kelly", params=(1.0,), bankroll: float = 100.0,
+             unit: float = 1.0, max_exposure: float = 1.0) -> pd.DataFrame:
+    """
+    Simulate one staking strategy for every value in params. `period` (sorted) groups bets into weeks.
+      flat   -> 1 unit on the picked side whenever its model probability >= param (min confidence)
+      ev     -> 1 unit on every bet whose per-unit EV >= param
+      kelly  -> param x Kelly fraction of the week-start bankroll; a week's total stake is
+                scaled down to at most max_exposure of the bankroll
+    Returns one row per param with bets, staked, profit, roi, final_bankroll, max_drawdown.
+    """
+    params = np.atleast_1d(np.asarray(params, dtype=float))[:, None]
+    p, ev, net, ret = bets["p"], bets["ev"], bets["net"], bets["ret"]
+    starts = _week_starts(period)
+
+    if strategy in ("flat", "ev"):
+        score = p if strategy == "flat" else ev
+        stakes = np.where(score[None, :] >= params, unit, 0.0)
+        weekly = np.add.reduceat(stakes * ret[None, :], starts, axis=1)
+        paths = bankroll + np.cumsum(weekly, axis=1)
+        staked = stakes.sum(axis=1)
+    elif strategy == "kelly":
+        # same formula as Odds.kelly_fraction, on the picked side's net odds
+        fractions = np.maximum((net * p - (1 - p)) / net, 0)[None, :] * params
+        exposure = np.add.reduceat(fractions, starts, axis=1)
+        scale = np.where(exposure > max_exposure, max_exposure / np.where(exposure > 0, exposure, 1), 1.0)
+        fractions = fractions * np.repeat(scale, np.diff(np.r_[starts, len(p)]), axis=1)
+        growth = 1 + np.add.reduceat(fractions * ret[None, :], starts, axis=1)
+        paths = bankroll * np.cumprod(growth, axis=1)
+        # money staked each week = fraction x bankroll at the start of that week
+        start_bankroll = np.concatenate([np.full((len(params), 1), bankroll), paths[:, :-1]], axis=1)
+        staked = (np.add.reduceat(fractions, starts, axis=1) * start_bankroll).sum(axis=1)
+        stakes = fractions
+    else:
+        raise ValueError(f"Unknown staking strategy: {strategy}")
+
+    paths = np.concatenate([np.full((len(params), 1), bankroll), paths], axis=1)
+    profit = paths[:, -1] - bankroll
+    return pd.DataFrame({
+        "strategy": strategy,
+        "param": params[:, 0],
+        "bets": (stakes > 0).sum(axis=1),
+        "staked": staked.round(2),
+        "profit": profit.round(2),
+        "roi": np.divide(profit, staked, out=np.zeros_like(profit), where=staked > 0).round(4),
+        "final_bankroll": paths[:, -1].round(2),
+        "max_drawdown": _max_drawdown(np.maximum(paths, 1e-12)).round(4),
+    })
+
+
+def calibration(prob, outcome, bins: int = 10) -> pd.DataFrame:
+    """Reliability table (mean predicted vs observed rate per probability bin). Pushes are ignored."""
+    prob, outcome = np.asarray(prob, dtype=float), np.asarray(outcome)
+    keep = outcome >= 0
+    prob, outcome = prob[keep], outcome[keep].astype(float)
+    idx = np.clip((prob * bins).astype(int), 0, bins - 1)
+    count = np.bincount(idx, minlength=bins)
+    with np.errstate(invalid="ignore"):
+        return pd.DataFrame({
+            "bin_low": np.arange(bins) / bins,
+            "bin_high": np.arange(1, bins + 1) / bins,
+            "count": count,
+            "mean_pred": np.bincount(idx, prob, bins) / count,
+            "observed": np.bincount(idx, outcome, bins) / count,
+        })
+
+
+def brier_score(prob, outcome) -> float:
+    prob, outcome = np.asarray(prob, dtype=float), np.asarray(outcome)
+    keep = outcome >= 0
+    return float(np.mean((prob[keep] - outcome[keep]) ** 2))
@@ -0,0 +1,129 @@
+"""
+On-disk cache for nfl_data_py imports
+- One Parquet file per (source, season) under Data/cache
+- Finished seasons are cached forever; the current season expires after [cache] ttl_hours
+- Offline mode ([cache] offline = true or NFL_OFFLINE=1) only serves from the cache
+"""
+
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from src.Utils import metrics
+from src.Utils.config_loader import load_config
+
+
+def _settings(cache_dir, ttl_hours, offline, current_season):
+    config = load_config()
+    cache = config.get("cache", {})
+    if cache_dir is None:
+        cache_dir = cache.get("dir", "Data/cache")
+    if ttl_hours is None:
+        ttl_hours = cache.get("ttl_hours", 12)
+    if offline is None:
+        offline = os.environ.get("NFL_OFFLINE", "") not in ("", "0") or cache.get("offline", False)
+    if current_season is None:
+        current_season = config["data"]["current_season"]
+    return cache_dir, ttl_hours, offline, current_season
+
+
+def _path(cache_dir: str, name: str, season: int, ext: str = "parquet") -> str:
+    return os.path.join(cache_dir, f"{name}_{season}.{ext}")
+
+
+def _read(cache_dir: str, name: str, season: int):
+    """Cached frame and its age in seconds, or (None, None)."""
+    for ext, reader in (("parquet", pd.read_parquet), ("pkl", pd.read_pickle)):
+        path = _path(cache_dir, name, season, ext)
+        if os.path.exists(path):
+            return reader(path), time.time() - os.path.getmtime(path)
+    return None, None
+
+
+def _write(df: pd.DataFrame, cache_dir: str, name: str, season: int) -> str:
+    """Atomic write; frames pyarrow can't encode (mixed object columns) fall back to pickle. Returns the path."""
+    os.makedirs(cache_dir, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    os.close(fd)
+    try:
+        try:
+            df.to_parquet(tmp, index=False)
+            ext = "parquet"
+        except (ImportError, ValueError, TypeError) as e:
+            print(f"[DataCache] Parquet failed for {name} {season} ({e}), using pickle")
+            df.to_pickle(tmp)
+            ext = "pkl"
+        os.replace(tmp, _path(cache_dir, name, season, ext))
+    finally:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+    return _path(cache_dir, name, season, ext)
+
+
+def cached_import(name: str, fetch, seasons, cache_dir: str = None, ttl_hours: float = None,
+                  offline: bool = None, current_season: int = None) -> pd.DataFrame:
+    """
+    Serve fetch(seasons) from the per-season cache, calling fetch only for missing/expired seasons.
+    fetch takes a list of seasons and returns one frame (split on its 'season' column when present).
+    """
+    cache_dir, ttl_hours, offline, current_season = _settings(cache_dir, ttl_hours, offline, current_season)
+    frames, missing = [], []
+    for season in seasons:
+        df, age = _read(cache_dir, name, season)
+        expired = df is not None and (df.empty or season == current_season and age > ttl_hours * 3600)
+        if df is not None and (not expired or offline):
+            frames.append(df)
+        else:
+            missing.append(season)
+
+    metrics.incr("cache_hits", len(frames), source=name)
+    metrics.incr("cache_misses", len(missing), source=name)
+    if missing and offline:
+        raise FileNotFoundError(f"[DataCache] Offline and no cached {name} for seasons {missing}")
+
+    if missing:
+        print(f"[DataCache] Fetching {name} for seasons {missing}")
+        with metrics.span("provider_call", source=name):
+            fetched = fetch(missing)
+        if "season" in fetched.columns:
+            parts = {season: fetched[fetched["season"] == season] for season in missing}
+        else:
+            parts = {missing[0]: fetched} if len(missing) == 1 else {s: fetch([s]) for s in missing}
+        for season, part in parts.items():
+            if not part.empty:   # an empty season (not published yet) is refetched next time
+                _write(part, cache_dir, name, season)
+            frames.append(part)
+
+    frames = [f for f in frames if not f.empty] or frames[:1]
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
+
+def cached_file(name: str, fetch, season: int, cache_dir: str = None, ttl_hours: float = None,
+                offline: bool = None, current_season: int = None) -> str:
+    """
+    Path of one season's cache file, calling fetch([season]) first if it is missing or expired.
+    Unlike cached_import nothing is read back, so big sources (play-by-play) can be streamed from disk.
+    None (nothing cached) when the source has no rows for the season yet.
+    """
+    cache_dir, ttl_hours, offline, current_season = _settings(cache_dir, ttl_hours, offline, current_season)
+    path = next((p for p in (_path(cache_dir, name, season, ext) for ext in ("parquet", "pkl"))
+                 if os.path.exists(p)), None)
+    expired = path is not None and season == current_season and time.time() - os.path.getmtime(path) > ttl_hours * 3600
+    if path is not None and (not expired or offline):
+        metrics.incr("cache_hits", 1, source=name)
+        return path
+    metrics.incr("cache_misses", 1, source=name)
+    if offline:
+        raise FileNotFoundError(f"[DataCache] Offline and no cached {name} for season {season}")
+
+    print(f"[DataCache] Fetching {name} for season {season}")
+    with metrics.span("provider_call", source=name):
+        fetched = fetch([season])
+    if fetched.empty:
+        print(f"[DataCache] No {name} rows for season {season}, nothing cached")
+        return None
+    return _write(fetched, cache_dir, name, season)
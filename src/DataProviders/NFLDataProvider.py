@@ -1,9 +1,28 @@
+import os
+
 import nfl_data_py as nfl
 import pandas as pd
 from datetime import datetime
-import sqlite3
+
+from src.DataProviders.DataCache import cached_import
+from src.features.rolling_features import (
+    TeamFeatureEngine, as_of_features, engine_from_config, team_games, weekly_team_epa,
+)
+from src.Utils.config_loader import load_config
+from src.Utils.tools import save_table, stale_seasons, store_dir_for, upsert_partitions
 
 DB_PATH = "Data/dataset.sqlite"
+STATE_PATH = os.path.join(store_dir_for(DB_PATH), "team_state.npz")
+
+FEATURE_COLUMNS = [
+    "season", "week", "gameday",
+    "home_team", "away_team",
+    "spread_line", "total_line", "home_moneyline", "away_moneyline",
+    "home_epa", "away_epa", "home_ppg", "away_ppg",
+    "home_rest", "away_rest", "home_travel", "away_travel",
+    "epa_diff", "ppg_diff", "rest_diff", "spread_vs_epa",
+]
+LABEL_COLUMNS = ["home_win", "ou_cover"]
 
 def _import_lines_fallback(seasons):
     """
@@ -51,14 +70,41 @@ def _import_lines_fallback(seasons):
     return df
 
 
-def build_historical_features(seasons=range(2012, 2025)) -> pd.DataFrame:
-    """Build historical dataset with outcomes (home_win, ou_cover) and features."""
-    print(f"[NFLDataProvider] Building features for seasons: {list(seasons)}")
+def import_schedules(seasons) -> pd.DataFrame:
+    """nfl.import_schedules served through the on-disk season cache."""
+    return cached_import("schedules", nfl.import_schedules, list(seasons))
+
+
+def import_lines(seasons) -> pd.DataFrame:
+    """_import_lines_fallback served through the on-disk season cache."""
+    return cached_import("lines", _import_lines_fallback, list(seasons))
+
+
+def import_weekly_stats(seasons) -> pd.DataFrame:
+    """nfl.import_weekly_data (player-level, per game) served through the on-disk season cache."""
+    return cached_import("weekly", nfl.import_weekly_data, list(seasons))
+
 
-    schedules = nfl.import_schedules(seasons)
+def _team_history(seasons) -> pd.DataFrame:
+    """Team-game rows (score, per-game EPA/play, site) the as-of feature engine learns from."""
+    return team_games(import_schedules(seasons), weekly_team_epa(import_weekly_stats(seasons)))
+
+
+def save_to_sqlite(df: pd.DataFrame, table: str, db_path: str = DB_PATH):
+    save_table(df, table, db_path)
+
+
+def _build_games(seasons, schedules: pd.DataFrame = None, engine: TeamFeatureEngine = None) -> pd.DataFrame:
+    """
+    Schedules + lines + as-of team features + derived features for the given seasons.
+    The team state is learned from every configured season up to the requested ones (a fresh
+    engine) or only from the weeks a saved engine hasn't seen yet, then saved for the next call.
+    """
+    if schedules is None:
+        schedules = import_schedules(seasons)
     schedules["gameday"] = pd.to_datetime(schedules["gameday"])
 
-    lines = _import_lines_fallback(seasons)
+    lines = import_lines(seasons)
     print(f"[NFLDataProvider] Lines columns: {list(lines.columns)}")  # Debug info
 
     df = schedules.merge(
@@ -66,28 +112,69 @@ def build_historical_features(seasons=range(2012, 2025)) -> pd.DataFrame:
         on="game_id", how="left"
     )
 
-    # Labels
+    config = load_config()
+    engine = engine or engine_from_config(config)
+    history = {s for s in config["data"]["seasons"] if s <= max(seasons)} | set(seasons)
+    history = [s for s in sorted(history) if (s + 1) * 100 > engine.applied]
+    df, _ = as_of_features(df, _team_history(history), engine, state_path=STATE_PATH)
+
+    df["spread_vs_epa"] = df["spread_line"] - df["epa_diff"]
+    return df
+
+
+def build_historical_features(seasons=range(2012, 2025), incremental: bool = False,
+                              save: bool = True) -> pd.DataFrame:
+    """
+    Build historical dataset with outcomes (home_win, ou_cover) and features.
+    Only games with both scores get a row; unplayed games join once they're final.
+    incremental=True only fetches seasons that aren't fully materialized yet (plus the current
+    season) and upserts the (season, week) partitions whose contents changed.
+    save=False returns the rows without writing features_all.
+    """
+    seasons = list(seasons)
+    if incremental:
+        current_season = load_config()["data"]["current_season"]
+        seasons = stale_seasons(seasons, "features_all", current_season, DB_PATH)
+        if not seasons:
+            print("[NFLDataProvider] features_all is up to date.")
+            return pd.DataFrame(columns=FEATURE_COLUMNS + LABEL_COLUMNS)
+    print(f"[NFLDataProvider] Building features for seasons: {seasons}")
+
+    df = _build_games(seasons)
+
+    # A (season, week) partition is final once every game in it has a score
+    scored = df["home_score"].notna() & df["away_score"].notna()
+    complete = scored.groupby([df["season"], df["week"]]).all()
+    complete = {(int(s), int(w)): bool(v) for (s, w), v in complete.items()}
+
+    # Labels (unplayed games have none: NaN scores would compare as a home loss / under)
+    df = df[scored].copy()
     df["home_win"] = (df["home_score"] > df["away_score"]).astype(int)
     df["total_points"] = df["home_score"] + df["away_score"]
     df["ou_cover"] = (df["total_points"] > df["total_line"]).astype(int)
     df.loc[df["total_points"] == df["total_line"], "ou_cover"] = -1
 
-    team_stats = nfl.import_team_stats(seasons)[["season", "team", "epa_per_play", "points_per_game"]]
-    df = _merge_team_stats(df, team_stats)
+    features = df[FEATURE_COLUMNS + LABEL_COLUMNS].dropna()
 
-    df["epa_diff"] = df["home_epa"] - df["away_epa"]
-    df["ppg_diff"] = df["home_ppg"] - df["away_ppg"]
-    df["spread_vs_epa"] = df["spread_line"] - df["epa_diff"]
-
-    features = df[
-        ["season", "week", "gameday",
-         "home_team", "away_team",
-         "spread_line", "total_line", "home_moneyline", "away_moneyline",
-         "home_epa", "away_epa", "home_ppg", "away_ppg",
-         "epa_diff", "ppg_diff", "spread_vs_epa",
-         "home_win", "ou_cover"]
-    ].dropna()
-
-    save_to_sqlite(features, "features_all")
-    print(f"[NFLDataProvider] Saved {len(features)} feature rows to SQLite.")
+    if save:
+        upsert_partitions(features, "features_all", complete, DB_PATH, replace=not incremental)
+        print(f"[NFLDataProvider] Saved {len(features)} feature rows to SQLite.")
     return features
+
+
+def get_todays_nfl_games(date=None) -> pd.DataFrame:
+    """Build model features for games on `date` (default today) and save them to todays_games."""
+    day = pd.Timestamp(date or datetime.now().date())
+    season = load_config()["data"]["current_season"]
+
+    schedules = import_schedules([season])
+    schedules = schedules[pd.to_datetime(schedules["gameday"]) == day]
+    if schedules.empty:
+        return pd.DataFrame(columns=FEATURE_COLUMNS)
+
+    engine = TeamFeatureEngine.load(STATE_PATH) if os.path.exists(STATE_PATH) else None
+    games = _build_games([season], schedules=schedules.copy(), engine=engine)[FEATURE_COLUMNS]
+    games = games.assign(gameday=games["gameday"].dt.strftime("%Y-%m-%d"))
+    save_to_sqlite(games, "todays_games")
+    print(f"[NFLDataProvider] Saved {len(games)} games for {day.date()} to todays_games.")
+    return games
@@ -0,0 +1,244 @@
+"""
+Live odds ingestion
+- asyncio loop over a pluggable provider adapter (replay file offline, polling for live sources)
+- Every batch is diffed against the latest known line per game; only real moves are kept
+- Moves are appended to odds_snapshots (indexed by game + timestamp) in one executemany,
+  written back to todays_games, and only the moved games are re-scored in the cached slate
+
+Usage:
+    python -m src.DataProviders.OddsStream --provider replay --path Data/odds_replay.csv --speed 60
+"""
+
+import argparse
+import asyncio
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.Utils import metrics
+from src.Utils.config_loader import load_config
+from src.Utils.db import DB_PATH, connect, table_exists
+from src.Utils.tools import KEY_COLUMNS, load_table, save_table, table_version, update_rows
+
+SNAPSHOTS_TABLE = "odds_snapshots"
+LINE_COLUMNS = ["home_moneyline", "away_moneyline", "spread_line", "total_line"]
+
+
+def normalize(lines: pd.DataFrame, source: str = None) -> pd.DataFrame:
+    """Provider frame -> KEY_COLUMNS + ts (epoch seconds) + LINE_COLUMNS + source."""
+    lines = lines.copy()
+    if "ts" not in lines.columns:
+        lines["ts"] = time.time()
+    elif not pd.api.types.is_numeric_dtype(lines["ts"]):
+        lines["ts"] = pd.to_datetime(lines["ts"], utc=True).astype("int64") / 1e9
+    lines["gameday"] = pd.to_datetime(lines["gameday"]).dt.strftime("%Y-%m-%d")
+    for col in LINE_COLUMNS:
+        lines[col] = pd.to_numeric(lines[col], errors="coerce") if col in lines.columns else np.nan
+    if "source" not in lines.columns:
+        lines["source"] = source
+    return lines[KEY_COLUMNS + ["ts"] + LINE_COLUMNS + ["source"]]
+
+
+class OddsProvider:
+    """Adapter interface: `updates()` is an async iterator of line batches (DataFrames)."""
+
+    name = "base"
+
+    async def updates(self):
+        raise NotImplementedError
+        yield
+
+
+class ReplayProvider(OddsProvider):
+    """
+    Offline stand-in: replays a CSV / JSONL / Parquet of timestamped lines in ts order.
+    speed = 0 replays as fast as possible, otherwise N x real time.
+    """
+
+    name = "replay"
+
+    def __init__(self, path: str, speed: float = 0.0):
+        self.path, self.speed = path, speed
+
+    def _read(self) -> pd.DataFrame:
+        if self.path.endswith(".parquet"):
+            return pd.read_parquet(self.path)
+        if self.path.endswith((".jsonl", ".json")):
+            return pd.read_json(self.path, lines=self.path.endswith(".jsonl"))
+        return pd.read_csv(self.path)
+
+    async def updates(self):
+        lines = normalize(self._read(), self.name).sort_values("ts", kind="stable")
+        previous = None
+        for ts, batch in lines.groupby("ts", sort=True):
+            if self.speed and previous is not None:
+                await asyncio.sleep((ts - previous) / self.speed)
+            previous = ts
+            yield batch.reset_index(drop=True)
+
+
+class PollingProvider(OddsProvider):
+    """Calls `fetch()` (sync, run in a thread) every `interval` seconds; for HTTP / feed adapters."""
+
+    name = "poll"
+
+    def __init__(self, fetch, interval: float = 15.0, name: str = None):
+        self.fetch, self.interval = fetch, interval
+        self.name = name or self.name
+
+    async def updates(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            try:
+                yield normalize(await loop.run_in_executor(None, self.fetch), self.name)
+            except Exception as e:
+                print(f"[OddsStream] {self.name} poll failed: {e}")
+            await asyncio.sleep(max(0.0, self.interval - (loop.time() - started)))
+
+
+def _nflverse_lines(season: int) -> pd.DataFrame:
+    """
+    Lines of the season's unplayed games from nflverse schedules (gameday, teams, moneylines,
+    spread_line, total_line). Called directly: the DataCache TTL would hide moves for hours.
+    """
+    import nfl_data_py as nfl
+    schedules = nfl.import_schedules([season])
+    return schedules[schedules["home_score"].isna()]
+
+
+def _nflverse_provider(settings: dict) -> OddsProvider:
+    """Polls nflverse lines for the current season (slow-moving, but needs no API key)."""
+    season = load_config()["data"]["current_season"]
+    return PollingProvider(lambda: _nflverse_lines(season), settings.get("interval", 15), "nflverse")
+
+
+PROVIDERS = {
+    "replay": lambda settings: ReplayProvider(settings.get("replay_path", "Data/odds_replay.csv"),
+                                              settings.get("speed", 0.0)),
+    "nflverse": _nflverse_provider,
+}
+
+
+def latest_lines(db_path: str = DB_PATH) -> pd.DataFrame:
+    """Last known line per game: todays_games, overridden by the newest snapshot of each game."""
+    frames = []
+    with connect(db_path) as conn:
+        if table_exists(conn, "todays_games"):
+            frames.append(pd.read_sql_query(
+                f"SELECT {', '.join(KEY_COLUMNS + LINE_COLUMNS)}, 0.0 AS ts FROM todays_games", conn))
+        if table_exists(conn, SNAPSHOTS_TABLE):
+            # newest row per game, found through the (game, ts) index
+            frames.append(pd.read_sql_query(
+                f"SELECT {', '.join(KEY_COLUMNS + LINE_COLUMNS)}, ts FROM {SNAPSHOTS_TABLE} s "
+                f"WHERE ts = (SELECT MAX(ts) FROM {SNAPSHOTS_TABLE} WHERE gameday = s.gameday "
+                "AND home_team = s.home_team AND away_team = s.away_team)", conn))
+    if not frames:
+        return pd.DataFrame(columns=KEY_COLUMNS + LINE_COLUMNS + ["ts"])
+    lines = pd.concat(frames, ignore_index=True).sort_values("ts", kind="stable")
+    return lines.drop_duplicates(KEY_COLUMNS, keep="last").drop(columns="ts").reset_index(drop=True)
+
+
+def moved_lines(batch: pd.DataFrame, latest: pd.DataFrame) -> pd.DataFrame:
+    """
+    Rows of batch whose lines differ from the latest known line (new games count as moved).
+    A line the provider left out (NaN) keeps its latest known value, in the diff and in the rows returned.
+    """
+    batch = batch.drop_duplicates(KEY_COLUMNS, keep="last").reset_index(drop=True)
+    merged = batch.merge(latest, on=KEY_COLUMNS, how="left", suffixes=("", "_old"), indicator=True)
+    for col in LINE_COLUMNS:
+        batch[col] = batch[col].fillna(merged[f"{col}_old"]).astype(float)
+    new = batch[LINE_COLUMNS].to_numpy(dtype=float)
+    old = merged[[f"{c}_old" for c in LINE_COLUMNS]].to_numpy(dtype=float)
+    changed = ~((new == old) | (np.isnan(new) & np.isnan(old))).all(axis=1)
+    return batch[changed | (merged["_merge"] == "left_only").to_numpy()].reset_index(drop=True)
+
+
+def apply_lines(games: pd.DataFrame, lines: pd.DataFrame) -> pd.DataFrame:
+    """
+    todays_games rows for the moved games, with the new lines and line-derived features.
+    Column order is kept: the models read feature_matrix by position.
+    """
+    columns = games.columns
+    games = games.drop(columns=LINE_COLUMNS).merge(lines[KEY_COLUMNS + LINE_COLUMNS], on=KEY_COLUMNS)[columns]
+    if "spread_vs_epa" in games.columns:
+        games["spread_vs_epa"] = games["spread_line"] - games["epa_diff"]
+    return games
+
+
+class OddsIngestor:
+    """Consumes a provider, stores moves and re-scores the moved games."""
+
+    def __init__(self, provider: OddsProvider, db_path: str = DB_PATH, rescore: bool = True):
+        self.provider, self.db_path, self.rescore = provider, db_path, rescore
+        self.latest = latest_lines(db_path)
+        self._games, self._version = None, None
+
+    def _todays_games(self) -> pd.DataFrame:
+        version = table_version("todays_games", self.db_path)
+        if self._games is None or version != self._version:
+            with connect(self.db_path) as conn:
+                exists = table_exists(conn, "todays_games")
+            self._games = load_table("todays_games", self.db_path) if exists else pd.DataFrame(columns=KEY_COLUMNS)
+            self._version = version
+        return self._games
+
+    def process(self, batch: pd.DataFrame) -> pd.DataFrame:
+        """Handle one provider batch; returns the todays_games rows that were re-scored."""
+        with metrics.span("odds_batch"):
+            return self._process(batch)
+
+    def _process(self, batch: pd.DataFrame) -> pd.DataFrame:
+        metrics.incr("odds_updates", len(batch))
+        moved = moved_lines(batch, self.latest)
+        if moved.empty:
+            return moved
+        metrics.incr("odds_moves", len(moved))
+        save_table(moved, SNAPSHOTS_TABLE, self.db_path, mode="append")
+        self.latest = pd.concat([self.latest, moved[self.latest.columns]]).drop_duplicates(
+            KEY_COLUMNS, keep="last").reset_index(drop=True)
+
+        games = self._todays_games()
+        if games.empty:
+            return games
+        updated = apply_lines(games, moved)
+        if updated.empty:
+            return updated
+        columns = LINE_COLUMNS + [c for c in ["spread_vs_epa"] if c in updated.columns]
+        update_rows(updated, "todays_games", columns, db_path=self.db_path)
+        self._games = pd.concat([games, updated]).drop_duplicates(KEY_COLUMNS, keep="last")
+        self._version = table_version("todays_games", self.db_path)
+        if self.rescore:
+            from src.Predict import Prediction_Service
+            Prediction_Service.refresh_games(updated, self.db_path)
+        return updated
+
+    async def run(self, max_batches: int = None):
+        loop = asyncio.get_running_loop()
+        n = 0
+        async for batch in self.provider.updates():
+            started = time.perf_counter()
+            updated = await loop.run_in_executor(None, self.process, batch)
+            if len(updated):
+                print(f"[OddsStream] {len(updated)} game(s) moved, re-scored in "
+                      f"{(time.perf_counter() - started) * 1000:.0f} ms")
+            n += 1
+            if max_batches is not None and n >= max_batches:
+                break
+
+
+def run(provider: str = None, db_path: str = DB_PATH, max_batches: int = None, **overrides):
+    settings = {**load_config().get("odds", {}), **overrides}
+    adapter = PROVIDERS[provider or settings.get("provider", "replay")](settings)
+    asyncio.run(OddsIngestor(adapter, db_path).run(max_batches))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream odds updates into odds_snapshots / todays_games")
+    parser.add_argument("--provider", choices=list(PROVIDERS))
+    parser.add_argument("--path", dest="replay_path", help="Replay file (CSV / JSONL / Parquet)")
+    parser.add_argument("--speed", type=float, help="Replay speed, 0 = as fast as possible")
+    parser.add_argument("--interval", type=float, help="Polling interval in seconds")
+    args = parser.parse_args()
+    run(args.provider, **{k: v for k, v in vars(args).items() if k != "provider" and v is not None})
@@ -0,0 +1,168 @@
+"""
+Batch inference engine
+- Builds the feature matrix once per batch (plus one DMatrix and one scaled copy, on demand)
+- Runs any of the XGBoost / NN / logistic families over it, one vectorized call per model
+  (compiled NumPy artifacts when exported, so slates need neither xgboost nor TensorFlow)
+- Returns one columnar DataFrame (<family>_ml, <family>_ou) that printing, Flask and storage share
+Works the same for today's slate and for a whole season from the feature store.
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.Predict.Compiled_Models import CompiledTrees
+from src.Predict.Model_Registry import get_model, get_scaler
+from src.Utils import metrics
+from src.Utils.tools import KEY_COLUMNS, NON_FEATURE_COLUMNS, load_feature_matrix, load_store_column
+
+# family -> config["models"] keys (ML, OU)
+FAMILIES = {
+    "xgb": ("xgb_ml", "xgb_ou"),
+    "nn": ("nn_ml", "nn_ou"),
+    "log": ("log_ml", "log_ou"),
+}
+
+# Largest batch scored with a compiled tree artifact (covers slates and /api/predict micro-batches)
+COMPILED_TREE_MAX_ROWS = 256
+
+
+def positive_proba(raw) -> np.ndarray:
+    """
+    P(class 1) as a 1-D array from binary (flat or single-column) or 2-class model output.
+    Anything wider (e.g. a model fit with push labels) raises instead of picking a column.
+    """
+    raw = np.asarray(raw, dtype=float)
+    if raw.ndim == 2:
+        if raw.shape[1] > 2:
+            raise ValueError(f"[Batch_Predictor] Expected 1 or 2 probability columns, got {raw.shape[1]} "
+                             f"(retrain the model without push labels)")
+        return raw[:, 1] if raw.shape[1] == 2 else raw[:, 0]
+    return raw
+
+
+def l2_normalize(X) -> np.ndarray:
+    """NumPy equivalent of tf.keras.utils.normalize(X, axis=1)."""
+    norms = np.linalg.norm(X, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return X / norms
+
+
+def feature_matrix(games: pd.DataFrame) -> np.ndarray:
+    """Numeric model inputs from a games/features frame (keys and labels dropped)."""
+    return np.ascontiguousarray(games.drop(columns=NON_FEATURE_COLUMNS, errors="ignore").to_numpy(dtype=float))
+
+
+class FeatureBatch:
+    """A feature matrix plus the per-family views derived from it, each built at most once."""
+
+    def __init__(self, X, normalized=None):
+        self.X = np.ascontiguousarray(X, dtype=float)
+        self._dmatrix = None
+        self._normalized = normalized
+        self._scaled = {}
+
+    def __len__(self):
+        return self.X.shape[0]
+
+    @property
+    def dmatrix(self):
+        if self._dmatrix is None:
+            import xgboost as xgb
+            with metrics.span("dmatrix"):
+                self._dmatrix = xgb.DMatrix(self.X)
+        return self._dmatrix
+
+    @property
+    def normalized(self):
+        if self._normalized is None:
+            with metrics.span("normalize"):
+                self._normalized = l2_normalize(self.X)
+        return self._normalized
+
+    def scaled(self, scaler):
+        """X through a fitted column scaler, once per scaler (nn_ml / nn_ou usually share the statistics)."""
+        key = (scaler.offset.tobytes(), scaler.scale.tobytes())
+        if key not in self._scaled:
+            with metrics.span("scale"):
+                self._scaled[key] = scaler.transform(self.X)
+        return self._scaled[key]
+
+
+def nn_input(key, batch, path: str = None):
+    """What an NN model was trained on: its saved column scaler, or per-row L2 norms for older models."""
+    scaler = get_scaler(key, path)
+    return batch.normalized if scaler is None else batch.scaled(scaler)
+
+
+def _predict_xgb(key, batch):
+    # the NumPy tree walk beats DMatrix + booster on slates; big batches go to xgboost's C++ path
+    model = get_model(key, compiled=len(batch) <= COMPILED_TREE_MAX_ROWS)
+    if isinstance(model, CompiledTrees):
+        return model.predict(batch.X)
+    return positive_proba(model.predict(batch.dmatrix))
+
+
+def _predict_nn(key, batch):
+    return positive_proba(get_model(key).predict(nn_input(key, batch), batch_size=max(len(batch), 1), verbose=0))
+
+
+def _predict_log(key, batch):
+    return positive_proba(get_model(key).predict_proba(batch.X))
+
+
+PREDICTORS = {"xgb": _predict_xgb, "nn": _predict_nn, "log": _predict_log}
+
+
+def predict_family(family: str, batch: FeatureBatch):
+    """(ML probs, OU probs) for one family over a batch."""
+    ml_key, ou_key = FAMILIES[family]
+    predictor = PREDICTORS[family]
+    probs = []
+    for key in (ml_key, ou_key):
+        with metrics.span("predict", model=key):
+            probs.append(predictor(key, batch))
+        metrics.incr("rows_predicted", len(batch), model=key)
+    return tuple(probs)
+
+
+def predict_batch(games=None, families=tuple(FAMILIES), X=None, errors: str = "raise") -> pd.DataFrame:
+    """
+    Score every game with every requested family.
+    Pass a games frame (keys are carried into the result) or a bare matrix X.
+    errors="ignore" skips families whose models/frameworks fail and lists them in result.attrs["errors"].
+    """
+    batch = FeatureBatch(feature_matrix(games) if X is None else X)
+    if games is not None:
+        result = games[[c for c in KEY_COLUMNS if c in games.columns]].reset_index(drop=True)
+    else:
+        result = pd.DataFrame(index=range(len(batch)))
+
+    failures = {}
+    for family in families:
+        try:
+            ml, ou = predict_family(family, batch)
+        except Exception as e:
+            if errors == "raise":
+                raise
+            failures[family] = str(e)
+            continue
+        result[f"{family}_ml"] = ml
+        result[f"{family}_ou"] = ou
+    result.attrs["errors"] = failures
+    return result
+
+
+def predict_season(season: int = None, families=tuple(FAMILIES), table: str = "features_all",
+                   errors: str = "raise") -> pd.DataFrame:
+    """Backtest-scale scoring straight from the columnar feature store (optionally one season)."""
+    X, columns = load_feature_matrix(table)
+    keys = pd.DataFrame({c: np.asarray(load_store_column(c, table)) for c in KEY_COLUMNS})
+    keys["season"] = np.asarray(X[:, columns.index("season")]).astype(int)
+    keys["week"] = np.asarray(X[:, columns.index("week")]).astype(int)
+    if season is not None:
+        mask = keys["season"].to_numpy() == season
+        X, keys = X[mask], keys[mask].reset_index(drop=True)
+    result = predict_batch(X=X, families=families, errors=errors)
+    scored = pd.concat([keys, result], axis=1)
+    scored.attrs["errors"] = result.attrs["errors"]
+    return scored
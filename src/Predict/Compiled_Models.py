@@ -0,0 +1,272 @@
+"""
+Compiled CPU inference artifacts
+- XGBoost boosters are re-laid out as perfect binary trees in flat arrays and scored by a
+  vectorized NumPy traversal (rows x trees per depth step, no DMatrix, no xgboost import)
+- Keras dense stacks are reduced to their weight matrices and run as a NumPy forward pass
+  (no TensorFlow import)
+- One .compiled.npz per model, written next to it by export_model() after a parity check;
+  the model registry prefers it over the original file while its source hash still matches
+"""
+
+import io
+import json
+import os
+
+import numpy as np
+
+SUFFIX = ".compiled.npz"
+MAX_DEPTH = 12   # perfect-tree layout holds 2^depth leaves per tree
+
+ACTIVATIONS = {
+    "linear": lambda z: z,
+    "relu": lambda z: np.maximum(z, 0),
+    "sigmoid": lambda z: 1 / (1 + np.exp(-z)),
+    "tanh": np.tanh,
+    "elu": lambda z: np.where(z > 0, z, np.expm1(np.minimum(z, 0))),
+    "selu": lambda z: 1.0507009873554805 * np.where(z > 0, z, 1.6732632423543772 * np.expm1(np.minimum(z, 0))),
+    "softmax": lambda z: _softmax(z),
+}
+
+
+def _softmax(z):
+    e = np.exp(z - z.max(axis=1, keepdims=True))
+    return e / e.sum(axis=1, keepdims=True)
+
+
+def artifact_path(path: str) -> str:
+    """Models/XGBoost_Models/XGBoost_NFL_ML.json -> Models/XGBoost_Models/XGBoost_NFL_ML.compiled.npz"""
+    return os.path.splitext(path.rstrip("/\\"))[0] + SUFFIX
+
+
+class CompiledModel:
+    """Base for the NumPy runtimes: predict(X) returns P(class 1) as a 1-D array."""
+
+    kind = None
+
+    def __init__(self, spec: dict, arrays: dict, source_hash: str = None):
+        self.spec, self.arrays, self.source_hash = spec, arrays, source_hash
+
+    def predict(self, X, **_):
+        raise NotImplementedError
+
+    def save(self, path: str):
+        from src.Utils.train_harness import save_atomic
+        buffer = io.BytesIO()
+        meta = {"kind": self.kind, "spec": self.spec, "source_hash": self.source_hash}
+        np.savez(buffer, __meta__=np.array(json.dumps(meta)), **self.arrays)
+        save_atomic(buffer.getvalue(), path)
+
+
+class CompiledTrees(CompiledModel):
+    """
+    A gbtree ensemble re-laid out as perfect binary trees of one common depth D
+    (node i has children 2i+1 / 2i+2; shallower leaves become pass-through nodes that
+    always go left), so scoring is D vectorized steps of gather + compare over rows x trees.
+    """
+
+    kind = "trees"
+
+    def __init__(self, spec, arrays, source_hash=None):
+        super().__init__(spec, arrays, source_hash)
+        a = arrays
+        self._feature = a["feature"].astype(np.int32)
+        self._threshold, self._default_left, self._leaves = a["threshold"], a["default_left"], a["leaves"]
+        n_trees, depth = len(a["tree_class"]), spec["depth"]
+        # node ids are global (tree offset + position); leaves are addressed the same way
+        self._offset = np.arange(n_trees, dtype=np.int32) * (2 ** depth - 1)
+        self._to_leaf = np.arange(n_trees, dtype=np.int32) * 2 ** depth - (2 ** depth - 1)
+        self._classes = np.eye(spec["num_class"])[a["tree_class"]]   # tree -> one-hot output column
+
+    def margin(self, X) -> np.ndarray:
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[None, :]
+        flat = X.ravel()
+        row_offset = (np.arange(len(X), dtype=np.int32) * X.shape[1])[:, None]
+        has_nan = bool(np.isnan(flat).any())
+        node = np.broadcast_to(self._offset, (len(X), len(self._offset))).copy()
+        for _ in range(self.spec["depth"]):
+            index = self._feature.take(node)
+            index += row_offset
+            x = flat.take(index)
+            go_right = x >= self._threshold.take(node)
+            if has_nan:
+                go_right |= np.isnan(x) & ~self._default_left.take(node)
+            # position p -> 2p + 1 + go_right, kept in global ids
+            node *= 2
+            node -= self._offset
+            node += 1
+            node += go_right
+        node -= self._offset
+        node += self._to_leaf
+        return self._leaves.take(node) @ self._classes + np.asarray(self.spec["base_margin"])
+
+    def predict(self, X, **_):
+        margin = self.margin(X)
+        if self.spec["objective"] in ("multi:softprob", "multi:softmax"):
+            return _softmax(margin)[:, 1]
+        return 1 / (1 + np.exp(-margin[:, 0]))
+
+
+class CompiledMLP(CompiledModel):
+    """A Keras dense stack as (W, b, activation) steps; BatchNormalization is folded to scale/shift."""
+
+    kind = "mlp"
+
+    def predict(self, X, **_):
+        out = np.asarray(X, dtype=float)
+        for i, step in enumerate(self.spec["steps"]):
+            if step["op"] == "dense":
+                out = out @ self.arrays[f"w{i}"] + self.arrays[f"b{i}"]
+            elif step["op"] == "scale":
+                out = out * self.arrays[f"w{i}"] + self.arrays[f"b{i}"]
+            out = ACTIVATIONS[step["activation"]](out)
+        return out[:, 1] if out.shape[1] == 2 else out[:, 0]
+
+
+KINDS = {"trees": CompiledTrees, "mlp": CompiledMLP}
+
+
+def load_compiled(path: str) -> CompiledModel:
+    with np.load(path, allow_pickle=False) as npz:
+        meta = json.loads(str(npz["__meta__"]))
+        arrays = {name: npz[name] for name in npz.files if name != "__meta__"}
+    return KINDS[meta["kind"]](meta["spec"], arrays, meta["source_hash"])
+
+
+# ---------------------------------------------------------------- compilers
+
+def compile_xgb(booster) -> CompiledTrees:
+    """Flatten a numeric-split gbtree booster (binary:logistic or 2-class softprob)."""
+    model = json.loads(bytes(booster.save_raw(raw_format="json")))
+    learner = model["learner"]
+    objective = learner["objective"]["name"]
+    if objective not in ("binary:logistic", "reg:logistic", "multi:softprob", "multi:softmax"):
+        raise ValueError(f"[Compiled_Models] Unsupported objective {objective}")
+    gbm = learner["gradient_booster"]
+    if gbm.get("name", "gbtree") != "gbtree":
+        raise ValueError(f"[Compiled_Models] Unsupported booster {gbm.get('name')}")
+    trees = gbm["model"]["trees"]
+    num_class = max(1, int(learner["learner_model_param"]["num_class"]))
+    base_score = float(learner["learner_model_param"]["base_score"])
+    if num_class == 1:
+        base_margin = [np.log(base_score / (1 - base_score))]   # stored as a probability
+    else:
+        base_margin = [base_score] * num_class
+
+    depth = max(_tree_depth(t["left_children"], t["right_children"]) for t in trees)
+    if depth > MAX_DEPTH:
+        raise ValueError(f"[Compiled_Models] Trees of depth {depth} exceed MAX_DEPTH={MAX_DEPTH}")
+    inner, width = 2 ** depth - 1, 2 ** depth
+    feature = np.zeros((len(trees), inner), dtype=np.int64)
+    threshold = np.full((len(trees), inner), np.inf, dtype=np.float32)
+    default_left = np.ones((len(trees), inner), dtype=bool)
+    leaves = np.zeros((len(trees), width), dtype=float)
+    for t, tree in enumerate(trees):
+        if any(int(s) != 0 for s in tree.get("split_type", [])):
+            raise ValueError("[Compiled_Models] Categorical splits are not supported")
+        lc, rc = tree["left_children"], tree["right_children"]
+        stack = [(0, 0, 0)]   # (xgboost node, perfect-tree position, level)
+        while stack:
+            node, pos, level = stack.pop()
+            if lc[node] == -1:
+                # a leaf above the last level: keep going left (threshold +inf) down to its leftmost slot
+                leaves[t, (pos + 1) * 2 ** (depth - level) - 1 - inner] = tree["split_conditions"][node]
+                continue
+            feature[t, pos] = tree["split_indices"][node]
+            threshold[t, pos] = tree["split_conditions"][node]
+            default_left[t, pos] = bool(tree["default_left"][node])
+            stack += [(lc[node], 2 * pos + 1, level + 1), (rc[node], 2 * pos + 2, level + 1)]
+
+    arrays = {
+        "feature": feature.ravel(), "threshold": threshold.ravel(), "default_left": default_left.ravel(),
+        "leaves": leaves.ravel(), "tree_class": np.asarray(gbm["model"]["tree_info"], dtype=np.int64),
+    }
+    spec = {"objective": objective, "num_class": num_class, "base_margin": base_margin,
+            "depth": depth, "num_feature": int(learner["learner_model_param"]["num_feature"])}
+    return CompiledTrees(spec, arrays)
+
+
+def _tree_depth(lc, rc) -> int:
+    depth, frontier = 0, [0]
+    while True:
+        frontier = [c for n in frontier for c in (lc[n], rc[n]) if c != -1]
+        if not frontier:
+            return depth
+        depth += 1
+
+
+def compile_keras(model) -> CompiledMLP:
+    """Reduce a Keras model made of Dense / Dropout / Flatten / BatchNormalization / Activation layers."""
+    steps, arrays = [], {}
+    for layer in model.layers:
+        name = type(layer).__name__
+        config = layer.get_config()
+        i = len(steps)
+        if name == "Dense":
+            W, b = layer.get_weights() if config.get("use_bias", True) else (layer.get_weights()[0], None)
+            arrays[f"w{i}"] = np.asarray(W, dtype=float)
+            arrays[f"b{i}"] = np.zeros(W.shape[1]) if b is None else np.asarray(b, dtype=float)
+            steps.append({"op": "dense", "activation": config["activation"]})
+        elif name == "BatchNormalization":
+            gamma, beta, mean, var = _bn_weights(layer, config)
+            scale = gamma / np.sqrt(var + config["epsilon"])
+            arrays[f"w{i}"], arrays[f"b{i}"] = scale, beta - mean * scale
+            steps.append({"op": "scale", "activation": "linear"})
+        elif name == "Activation":
+            steps.append({"op": "activation", "activation": config["activation"]})
+        elif name not in ("Dropout", "Flatten", "InputLayer"):
+            raise ValueError(f"[Compiled_Models] Unsupported layer {name}")
+    unknown = {s["activation"] for s in steps} - set(ACTIVATIONS)
+    if unknown:
+        raise ValueError(f"[Compiled_Models] Unsupported activations {sorted(unknown)}")
+    return CompiledMLP({"steps": steps}, arrays)
+
+
+def _bn_weights(layer, config):
+    weights = [np.asarray(w, dtype=float) for w in layer.get_weights()]
+    gamma = weights.pop(0) if config.get("scale", True) else 1.0
+    beta = weights.pop(0) if config.get("center", True) else 0.0
+    mean, var = weights
+    return gamma, beta, mean, var
+
+
+COMPILERS = {"xgb": compile_xgb, "nn": compile_keras}
+
+
+def export_model(key: str, X, path: str = None, out: str = None, tolerance: float = 1e-4) -> float:
+    """
+    Compile the model behind a config["models"] key, check it against the original on the raw
+    feature rows X and write the artifact. Returns the max |p_compiled - p_original|;
+    raises ValueError (nothing written) if it exceeds tolerance.
+    """
+    from src.Predict.Batch_Predictor import FeatureBatch, nn_input, positive_proba
+    from src.Predict.Model_Registry import LOADERS, BinaryOutput, file_hash
+    from src.Utils.config_loader import load_config
+
+    family = key.split("_")[0]
+    if family not in COMPILERS:
+        raise ValueError(f"[Compiled_Models] No compiler for {key}")
+    path = path or load_config()["models"][key]
+    out = out or artifact_path(path)
+
+    original = LOADERS[family](path)
+    raw = original.model if isinstance(original, BinaryOutput) else original
+    compiled = COMPILERS[family](raw)
+    compiled.source_hash = file_hash(path)
+
+    batch = FeatureBatch(X)
+    if family == "xgb":
+        expected = positive_proba(original.predict(batch.dmatrix))
+        got = compiled.predict(batch.X)
+    else:
+        inputs = nn_input(key, batch, path)
+        expected = positive_proba(original.predict(inputs, batch_size=max(len(batch), 1), verbose=0))
+        got = compiled.predict(inputs)
+    diff = float(np.max(np.abs(got - expected))) if len(batch) else 0.0
+    if diff > tolerance:
+        raise ValueError(f"[Compiled_Models] {key}: parity check failed (max diff {diff:.2e} > {tolerance:g})")
+
+    compiled.save(out)
+    print(f"[Compiled_Models] Exported {key} to {out} (parity max diff {diff:.2e} over {len(batch)} rows)")
+    return diff
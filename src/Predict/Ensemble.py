@@ -0,0 +1,98 @@
+"""
+Ensemble predictor: one calibrated probability per market from every model family
+- A meta-model (logistic stacking or a weighted average) combines the per-family
+  probabilities of a batch, then a Platt or isotonic calibrator maps it to the final one
+- Trained on out-of-fold base predictions by src/Utils/stacking.py and stored as a single
+  .npz (config [models] ensemble), loaded through the model registry
+- Scoring reuses predict_batch's shared feature matrix, so the ensemble costs one pass
+  over the base models plus a few vector ops
+"""
+
+import io
+import json
+
+import numpy as np
+
+from src.Predict.Batch_Predictor import FAMILIES, predict_batch
+from src.Predict.Model_Registry import get_model
+
+MARKETS = ("ml", "ou")
+EPS = 1e-6
+
+
+def logit(p) -> np.ndarray:
+    p = np.clip(np.asarray(p, dtype=float), EPS, 1 - EPS)
+    return np.log(p / (1 - p))
+
+
+def sigmoid(z) -> np.ndarray:
+    return 1 / (1 + np.exp(-np.asarray(z, dtype=float)))
+
+
+class Ensemble:
+    """
+    Per-market combiners. spec["markets"][market] holds families, method ("stacking" | "average"),
+    weights, intercept and calibration ("platt" | "isotonic" | "none"); isotonic breakpoints
+    live in arrays["<market>_iso_x"] / arrays["<market>_iso_y"].
+    """
+
+    def __init__(self, spec: dict, arrays: dict = None):
+        self.spec, self.arrays = spec, arrays or {}
+
+    @property
+    def families(self) -> list:
+        """Base families needed by any market, in FAMILIES order."""
+        needed = {f for market in self.spec["markets"].values() for f in market["families"]}
+        return [f for f in FAMILIES if f in needed]
+
+    def raw(self, market: str, P) -> np.ndarray:
+        """Meta-model output for a (rows, families) probability matrix, before calibration."""
+        m = self.spec["markets"][market]
+        weights = np.asarray(m["weights"], dtype=float)
+        if m["method"] == "stacking":
+            return sigmoid(logit(P) @ weights + m["intercept"])
+        return np.asarray(P, dtype=float) @ weights
+
+    def calibrate(self, market: str, p) -> np.ndarray:
+        m = self.spec["markets"][market]
+        if m["calibration"] == "platt":
+            a, b = m["platt"]
+            return sigmoid(a * logit(p) + b)
+        if m["calibration"] == "isotonic":
+            return np.interp(p, self.arrays[f"{market}_iso_x"], self.arrays[f"{market}_iso_y"])
+        return np.asarray(p, dtype=float)
+
+    def predict(self, market: str, P) -> np.ndarray:
+        return self.calibrate(market, self.raw(market, P))
+
+    def add_to(self, results):
+        """Add ensemble_ml / ensemble_ou to a predict_batch frame holding <family>_<market> columns."""
+        for market, m in self.spec["markets"].items():
+            P = np.column_stack([results[f"{family}_{market}"].to_numpy() for family in m["families"]])
+            results[f"ensemble_{market}"] = self.predict(market, P)
+        return results
+
+    def save(self, path: str):
+        from src.Utils.train_harness import save_atomic
+        buffer = io.BytesIO()
+        np.savez(buffer, __meta__=np.array(json.dumps(self.spec)), **self.arrays)
+        save_atomic(buffer.getvalue(), path)
+
+
+def load_ensemble(path: str) -> Ensemble:
+    with np.load(path, allow_pickle=False) as npz:
+        spec = json.loads(str(npz["__meta__"]))
+        arrays = {name: npz[name] for name in npz.files if name != "__meta__"}
+    return Ensemble(spec, arrays)
+
+
+def predict_ensemble(games=None, X=None, errors: str = "raise"):
+    """
+    predict_batch over the ensemble's base families plus ensemble_ml / ensemble_ou.
+    The base columns stay in the frame so callers can still show or store them.
+    """
+    ensemble = get_model("ensemble")
+    results = predict_batch(games, ensemble.families, X=X, errors=errors)
+    if results.attrs["errors"]:
+        raise RuntimeError(f"[Ensemble] Base models failed: {results.attrs['errors']}")
+    return ensemble.add_to(results)
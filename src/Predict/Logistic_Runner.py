@@ -1,8 +1,9 @@
-import joblib
+from src.Predict.Batch_Predictor import FeatureBatch, predict_family
 from src.Utils.tools import print_game_predictions
-from src.Utils.config_loader import load_config
 
-config = load_config()
+def logistic_predict(X):
+    """(home win probs, over probs) from the Logistic Regression models."""
+    return predict_family("log", FeatureBatch(X))
 
 def logistic_runner(X, games):
     """
@@ -11,12 +12,5 @@ def logistic_runner(X, games):
       X     = features as numpy array
       games = dataframe of today's games
     """
-    # Load models
-    log_ml = joblib.load(config["models"]["log_ml"])
-    log_ou = joblib.load(config["models"]["log_ou"])
-
-    # Predictions
-    ml_probs = log_ml.predict_proba(X)[:, 1]   # P(home win)
-    ou_probs = log_ou.predict_proba(X)[:, 1]   # P(over)
-
+    ml_probs, ou_probs = logistic_predict(X)
     print_game_predictions(games, ml_probs=ml_probs, ou_probs=ou_probs)
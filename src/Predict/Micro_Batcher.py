@@ -0,0 +1,104 @@
+"""
+Micro-batching for online predictions
+- Concurrent predict() calls are queued and coalesced into one feature matrix
+- A batch closes when it reaches max_batch rows or max_latency_ms after its first request
+- Worker threads run each batch through the batch engine (one vectorized call per model),
+  against the models the registry keeps resident, then hand every caller its own rows
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+from src.Predict.Batch_Predictor import FAMILIES, predict_batch
+from src.Utils import metrics
+from src.Utils.config_loader import load_config
+
+
+class MicroBatcher:
+
+    def __init__(self, max_batch: int = 256, max_latency_ms: float = 5.0, workers: int = 2):
+        self.max_batch = max_batch
+        self.max_latency = max_latency_ms / 1000
+        self._queue = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self.stats = {"requests": 0, "batches": 0, "rows": 0}
+        self._threads = [threading.Thread(target=self._loop, name=f"micro-batcher-{i}", daemon=True)
+                         for i in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, X, families=tuple(FAMILIES)) -> Future:
+        """Queue feature rows; the future resolves to (probabilities DataFrame, errors dict)."""
+        future = Future()
+        self._queue.put((np.atleast_2d(np.asarray(X, dtype=float)), tuple(families), future))
+        return future
+
+    def predict(self, X, families=tuple(FAMILIES), timeout: float = 30.0):
+        return self.submit(X, families).result(timeout)
+
+    def _collect(self) -> list:
+        """Block for the first request, then gather more until the batch is full or its deadline passes."""
+        items = [self._queue.get()]
+        rows = len(items[0][0])
+        deadline = time.perf_counter() + self.max_latency
+        while rows < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            items.append(item)
+            rows += len(item[0])
+        return items
+
+    def _loop(self):
+        while True:
+            items = self._collect()
+            # one engine call per distinct family set in the batch
+            groups = {}
+            for item in items:
+                groups.setdefault(item[1], []).append(item)
+            for families, group in groups.items():
+                self._run(families, group)
+            with self._stats_lock:
+                self.stats["requests"] += len(items)
+                self.stats["batches"] += 1
+                self.stats["rows"] += sum(len(item[0]) for item in items)
+
+    @staticmethod
+    def _run(families, group):
+        try:
+            X = np.vstack([item[0] for item in group])
+            metrics.incr("micro_batch_rows", len(X))
+            with metrics.span("micro_batch"):
+                result = predict_batch(X=X, families=families, errors="ignore")
+        except Exception as e:
+            for _, _, future in group:
+                future.set_exception(e)
+            return
+        errors = result.attrs["errors"]
+        start = 0
+        for rows, _, future in group:
+            future.set_result((result.iloc[start:start + len(rows)].reset_index(drop=True), errors))
+            start += len(rows)
+
+
+_batcher = None
+_batcher_lock = threading.Lock()
+
+
+def get_batcher() -> MicroBatcher:
+    """Process-wide batcher configured from [server] in config.toml."""
+    global _batcher
+    with _batcher_lock:
+        if _batcher is None:
+            server = load_config().get("server", {})
+            _batcher = MicroBatcher(server.get("max_batch", 256), server.get("max_latency_ms", 5.0),
+                                    server.get("batch_workers", 2))
+        return _batcher
@@ -0,0 +1,237 @@
+"""
+Model registry for the prediction runners
+- Loads each model in config["models"] once per process and keeps it in memory
+- Reloads a model only when its file changes on disk (mtime/size first, then content hash)
+- Legacy 2-class softmax files are wrapped so every model predicts one P(class 1) column
+- A compiled NumPy artifact exported next to a model file is preferred while it matches it
+- NN input scalers saved next to a model file are cached the same way (get_scaler)
+- model_hash names the exact artifact behind a key (prediction log), rehashed only when a file changes
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+
+from src.Predict.Compiled_Models import CompiledModel, artifact_path, load_compiled
+from src.Utils import metrics
+from src.Utils.config_loader import load_config
+from src.Utils.scaling import load_scaler, scaler_path
+
+
+class BinaryOutput:
+    """
+    Compatibility wrapper for models trained as 2-class softmax (XGBoost multi:softprob,
+    Keras Dense(2, softmax)): predict() returns the P(class 1) column only, like a binary model.
+    """
+
+    def __init__(self, model):
+        self.model = model
+
+    def predict(self, *args, **kwargs):
+        return np.asarray(self.model.predict(*args, **kwargs))[:, 1]
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+
+def _load_xgb(path):
+    import xgboost as xgb
+    booster = xgb.Booster()
+    booster.load_model(path)
+    learner = json.loads(booster.save_config())["learner"]
+    if int(learner["learner_model_param"]["num_class"]) == 2:
+        print(f"[Model_Registry] {path} is a legacy 2-class softprob model, reading P(class 1)")
+        return BinaryOutput(booster)
+    return booster
+
+
+def _load_nn(path):
+    import tensorflow as tf
+    model = tf.keras.models.load_model(path)
+    if model.output_shape[-1] == 2:
+        print(f"[Model_Registry] {path} is a legacy Dense(2, softmax) model, reading P(class 1)")
+        return BinaryOutput(model)
+    return model
+
+
+def _load_joblib(path):
+    import joblib
+    return joblib.load(path)
+
+
+def _load_ensemble(path):
+    from src.Predict.Ensemble import load_ensemble
+    return load_ensemble(path)
+
+
+# Model key prefix (xgb_ml -> xgb) -> loader
+LOADERS = {
+    "xgb": _load_xgb,
+    "nn": _load_nn,
+    "log": _load_joblib,
+    "ensemble": _load_ensemble,
+}
+
+_models = {}
+_scalers = {}
+_hashes = {}
+_lock = threading.Lock()
+_key_locks = {}
+
+
+def _stat(path: str):
+    """Cheap change signature: (mtime_ns, size). Directories (SavedModel) use the newest file."""
+    if os.path.isdir(path):
+        newest, total = 0, 0
+        for root, _, files in os.walk(path):
+            for name in files:
+                st = os.stat(os.path.join(root, name))
+                newest, total = max(newest, st.st_mtime_ns), total + st.st_size
+        return newest, total
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def file_hash(path: str) -> str:
+    """SHA-256 of a model file (or of every file in a model directory)."""
+    h = hashlib.sha256()
+    paths = [path]
+    if os.path.isdir(path):
+        paths = sorted(os.path.join(root, name) for root, _, files in os.walk(path) for name in files)
+    for p in paths:
+        with open(p, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+    return h.hexdigest()
+
+
+def _key_lock(key: str) -> threading.Lock:
+    with _lock:
+        return _key_locks.setdefault(key, threading.Lock())
+
+
+def _stat_or_none(path: str):
+    try:
+        return _stat(path)
+    except OSError:
+        return None
+
+
+def _load_artifact(path: str, digest: str):
+    """The compiled artifact for a model file, or None if it was exported from a different file."""
+    artifact = load_compiled(artifact_path(path))
+    if digest is not None and artifact.source_hash != digest:
+        print(f"[Model_Registry] {artifact_path(path)} is stale (model retrained), using {path}")
+        return None
+    return artifact
+
+
+def get_model(key: str, path: str = None, compiled: bool = True):
+    """
+    Return the in-memory model for a config["models"] key (e.g. "xgb_ml").
+    The model is loaded on first use and reloaded only if its file changed.
+    compiled=True prefers the NumPy artifact exported next to the file (see Compiled_Models),
+    unless [inference] compiled = false; the artifact also serves if the original file is absent.
+    """
+    if path is None:
+        config = load_config()
+        path = config["models"][key]
+        compiled = compiled and config.get("inference", {}).get("compiled", True)
+    slot = f"{key}:compiled" if compiled else key
+
+    with _key_lock(slot):
+        entry = _models.get(slot)
+        stat = (_stat_or_none(path), _stat_or_none(artifact_path(path)) if compiled else None)
+        if stat == (None, None):
+            _stat(path)   # raises FileNotFoundError for the model file
+        if entry is not None and entry["path"] == path:
+            if entry["stat"] == stat:
+                metrics.incr("model_cache_hits", model=key)
+                return entry["model"]
+            # mtime changed: only reload if the content really did
+            digest = file_hash(path) if stat[0] is not None else None
+            if digest == entry["hash"] and stat[1] == entry["stat"][1]:
+                entry["stat"] = stat
+                return entry["model"]
+        else:
+            digest = file_hash(path) if stat[0] is not None else None
+
+        with metrics.span("model_load", model=key):
+            model = _load_artifact(path, digest) if stat[1] is not None else None
+            if model is not None:
+                print(f"[Model_Registry] Loading {key} from {artifact_path(path)}")
+            else:
+                print(f"[Model_Registry] Loading {key} from {path}")
+                model = LOADERS[key.split("_")[0]](path)
+        _models[slot] = {"key": key, "path": path, "stat": stat, "hash": digest, "model": model}
+        return model
+
+
+def get_scaler(key: str, path: str = None):
+    """
+    The fitted scaler saved next to a model file (<model>.scaler.npz), or None for models
+    trained on per-row L2-normalized inputs. Cached like the models, reloaded when the file changes.
+    """
+    if path is None:
+        path = load_config()["models"][key]
+    path = scaler_path(path)
+    stat = _stat_or_none(path)
+    with _key_lock(f"{key}:scaler"):
+        entry = _scalers.get(key)
+        if entry is None or entry[0] != (path, stat):
+            entry = _scalers[key] = ((path, stat), load_scaler(path) if stat is not None else None)
+        return entry[1]
+
+
+def file_signature(keys, config: dict = None) -> tuple:
+    """Cheap version stamp of the model files (and compiled artifacts) behind config keys (None if missing)."""
+    models = (config or load_config())["models"]
+    return tuple((key, _stat_or_none(models[key]), _stat_or_none(artifact_path(models[key])),
+                  _stat_or_none(scaler_path(models[key]))) for key in keys)
+
+
+def model_hash(key: str, config: dict = None) -> str:
+    """
+    Short content hash of what a config key predicts with: the model file (or, without it, the
+    compiled artifact) plus its NN scaler. None if the model doesn't exist. Cached per file signature.
+    """
+    config = config or load_config()
+    path = config["models"][key]
+    signature = file_signature([key], config)[0]
+    with _lock:
+        cached = _hashes.get(key)
+    if cached is not None and cached[0] == (path, signature):
+        return cached[1]
+    _, model_stat, artifact_stat, scaler_stat = signature
+    source = path if model_stat else artifact_path(path) if artifact_stat else None
+    digest = None
+    if source is not None:
+        h = hashlib.sha256(file_hash(source).encode())
+        if scaler_stat:
+            h.update(file_hash(scaler_path(path)).encode())
+        digest = h.hexdigest()[:16]
+    with _lock:
+        _hashes[key] = ((path, signature), digest)
+    return digest
+
+
+def model_info() -> list:
+    """Describe the currently loaded models (no model objects)."""
+    return [
+        {"key": e["key"], "path": e["path"], "hash": e["hash"],
+         "mtime_ns": e["stat"][0][0] if e["stat"][0] else None,
+         "compiled": isinstance(e["model"], CompiledModel),
+         "legacy_softmax": isinstance(e["model"], BinaryOutput)}
+        for _, e in sorted(_models.items())
+    ]
+
+
+def clear():
+    """Drop every cached model (mainly for tests)."""
+    with _lock:
+        _models.clear()
+        _scalers.clear()
+        _hashes.clear()
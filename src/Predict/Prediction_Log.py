@@ -0,0 +1,223 @@
+"""
+Prediction log: every probability a model produced, with what produced it
+- One row per (game_id, model key, model hash, feature hash): the model hash names the exact
+  artifact (Model_Registry.model_hash), the feature hash the exact input row
+- predict_logged is predict_batch through the log: rows already logged for the current models and
+  inputs are read back with one indexed lookup, only the rest are scored, then appended in one
+  executemany (INSERT OR IGNORE, so concurrent writers can't duplicate a row)
+- Every write is mirrored as an Arrow/Parquet part next to the DB (Data/prediction_log/) for
+  columnar history scans (load_history); Flask and the backtester query SQLite by index
+"""
+
+import hashlib
+import os
+import tempfile
+import uuid
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from src.Predict import Model_Registry
+from src.Predict.Batch_Predictor import FAMILIES, feature_matrix, predict_batch
+from src.Utils import metrics
+from src.Utils.db import DB_PATH, connect, ensure_indexes, quote_identifier, table_exists
+from src.Utils.tools import KEY_COLUMNS
+
+TABLE = "prediction_log"
+COLUMNS = ["game_id", "gameday", "home_team", "away_team", "model", "model_hash", "feature_hash", "prob",
+           "created_at"]
+UNIQUE_KEY = ["game_id", "model", "model_hash", "feature_hash"]
+MAX_PARAMS = 900   # bound parameters per IN (...) chunk, under SQLite's default limit
+
+
+def game_ids(games: pd.DataFrame) -> list:
+    """nflverse-style ids: game_id when present, else SEASON_WW_AWAY_HOME (or GAMEDAY_AWAY_HOME without a week)."""
+    if "game_id" in games.columns:
+        return games["game_id"].astype(str).tolist()
+    if {"season", "week"} <= set(games.columns):
+        return [f"{int(s)}_{int(w):02d}_{a}_{h}" for s, w, a, h in
+                zip(games["season"], games["week"], games["away_team"], games["home_team"])]
+    return [f"{d}_{a}_{h}" for d, a, h in zip(games["gameday"], games["away_team"], games["home_team"])]
+
+
+def feature_hashes(X) -> list:
+    """Short hash of each float64 input row (a moved line or refreshed stat changes it)."""
+    X = np.ascontiguousarray(X, dtype=np.float64)
+    return [hashlib.blake2b(row.tobytes(), digest_size=8).hexdigest() for row in X]
+
+
+def log_dir_for(db_path: str = DB_PATH) -> str:
+    """Columnar mirror directory of the log (Data/dataset.sqlite -> Data/prediction_log)."""
+    return os.path.join(os.path.dirname(db_path) or ".", TABLE)
+
+
+def _ensure_table(conn):
+    conn.execute(
+        f"CREATE TABLE IF NOT EXISTS {TABLE} (game_id TEXT, gameday TEXT, home_team TEXT, away_team TEXT, "
+        f"model TEXT, model_hash TEXT, feature_hash TEXT, prob REAL, created_at TEXT, "
+        f"UNIQUE ({', '.join(UNIQUE_KEY)}))"
+    )
+    ensure_indexes(conn, TABLE)
+
+
+def _chunks(values, size: int = MAX_PARAMS):
+    values = list(dict.fromkeys(values))
+    return [values[i:i + size] for i in range(0, len(values), size)]
+
+
+def _logged(ids, model_hashes: list, db_path: str) -> pd.DataFrame:
+    """Logged rows for these games under these model hashes (unique-index lookups, chunked)."""
+    columns = ["game_id", "model", "model_hash", "feature_hash", "prob"]
+    frames = []
+    with connect(db_path) as conn:
+        if not table_exists(conn, TABLE):
+            return pd.DataFrame(columns=columns)
+        hashes = ", ".join("?" * len(model_hashes))
+        for chunk in _chunks(ids):
+            frames.append(pd.read_sql_query(
+                f"SELECT {', '.join(columns)} FROM {TABLE} WHERE game_id IN ({', '.join('?' * len(chunk))}) "
+                f"AND model_hash IN ({hashes})", conn, params=chunk + list(model_hashes)))
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+
+
+def record(rows: pd.DataFrame, db_path: str = DB_PATH) -> int:
+    """Append log rows (COLUMNS) in one executemany and mirror them as a Parquet part; returns rows inserted."""
+    if rows.empty:
+        return 0
+    rows = rows[COLUMNS]
+    with metrics.span("prediction_log_write"), connect(db_path) as conn:
+        _ensure_table(conn)
+        cursor = conn.executemany(
+            f"INSERT OR IGNORE INTO {TABLE} ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+            rows.astype(object).where(rows.notna(), None).itertuples(index=False, name=None),
+        )
+        inserted = cursor.rowcount
+    _write_part(rows, log_dir_for(db_path))
+    metrics.incr("prediction_log_rows", inserted)
+    return inserted
+
+
+def _write_part(rows: pd.DataFrame, log_dir: str):
+    """Atomic Parquet part (one Arrow table per write); readers never see a half-written file."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    os.makedirs(log_dir, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=log_dir, suffix=".tmp")
+    os.close(fd)
+    try:
+        pq.write_table(pa.Table.from_pandas(rows, preserve_index=False), tmp)
+        stamp = datetime.now().strftime("%Y%m%dT%H%M%S")
+        os.replace(tmp, os.path.join(log_dir, f"part-{stamp}-{uuid.uuid4().hex[:8]}.parquet"))
+    finally:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+
+
+def predict_logged(games=None, families=tuple(FAMILIES), X=None, ids=None, errors: str = "raise",
+                   db_path: str = DB_PATH) -> pd.DataFrame:
+    """
+    predict_batch, served from the log where possible. A game is rescored only if no row exists
+    for its current feature hash under the current model hash; new probabilities are logged.
+    Pass a games frame, or a bare matrix X with ids (game_id per row).
+    result.attrs: "errors" as in predict_batch, "log" = {"hits": rows served, "misses": rows scored}.
+    """
+    X = feature_matrix(games) if X is None else np.ascontiguousarray(X, dtype=float)
+    ids = game_ids(games) if ids is None else [str(i) for i in ids]
+    if games is not None:
+        result = games[[c for c in KEY_COLUMNS if c in games.columns]].reset_index(drop=True)
+    else:
+        result = pd.DataFrame(index=range(len(X)))
+    keys = {c: result[c].astype(str).tolist() if c in result.columns else [None] * len(X) for c in KEY_COLUMNS}
+
+    failures, hashes = {}, {}
+    for family in families:
+        family_hashes = {key: Model_Registry.model_hash(key) for key in FAMILIES[family]}
+        missing = [key for key, h in family_hashes.items() if h is None]
+        if missing:
+            if errors == "raise":
+                raise FileNotFoundError(f"[Prediction_Log] No model file for {missing}")
+            failures[family] = f"No model file for {missing}"
+            continue
+        hashes[family] = family_hashes
+
+    features = feature_hashes(X)
+    with metrics.span("prediction_log_lookup"):
+        logged = _logged(ids, [h for hs in hashes.values() for h in hs.values()], db_path)
+    found = {(g, m, f): p for g, m, f, p in zip(logged["game_id"], logged["model_hash"], logged["feature_hash"],
+                                                 logged["prob"])}
+    probs, todo = {}, np.zeros(len(X), dtype=bool)
+    for family, family_hashes in hashes.items():
+        for key, h in family_hashes.items():
+            probs[key] = np.array([found.get((g, h, f), np.nan) for g, f in zip(ids, features)], dtype=float)
+            todo |= np.isnan(probs[key])
+
+    new_rows = []
+    if todo.any() and hashes:
+        rows = np.flatnonzero(todo)
+        scored = predict_batch(X=X[rows], families=list(hashes), errors=errors)
+        failures.update(scored.attrs["errors"])
+        now = datetime.now().isoformat(timespec="seconds")
+        for family, family_hashes in hashes.items():
+            if family in scored.attrs["errors"]:
+                continue
+            for key, market in zip(FAMILIES[family], ("ml", "ou")):
+                fresh = scored[f"{family}_{market}"].to_numpy()
+                gap = np.isnan(probs[key][rows])
+                probs[key][rows] = np.where(gap, fresh, probs[key][rows])
+                new_rows += [(ids[i], keys["gameday"][i], keys["home_team"][i], keys["away_team"][i], key,
+                              family_hashes[key], features[i], float(p), now)
+                             for i, p in zip(rows[gap], fresh[gap])]
+        record(pd.DataFrame(new_rows, columns=COLUMNS), db_path)
+
+    for family in hashes:
+        if family not in failures:
+            result[f"{family}_ml"], result[f"{family}_ou"] = probs[FAMILIES[family][0]], probs[FAMILIES[family][1]]
+    hits = int((~todo).sum()) if hashes else 0
+    metrics.incr("prediction_log_hits", hits)
+    metrics.incr("prediction_log_misses", len(X) - hits)
+    result.attrs["errors"] = failures
+    result.attrs["log"] = {"hits": hits, "misses": len(X) - hits}
+    return result
+
+
+def lookup(game_ids=None, model: str = None, model_hash: str = None, latest: bool = False,
+           limit: int = None, db_path: str = DB_PATH) -> pd.DataFrame:
+    """
+    Logged rows, newest first, by game_id(s) and/or model key / model hash (indexed; at least one filter).
+    latest=True keeps only the newest row per (game_id, model).
+    """
+    if not game_ids and not model and not model_hash:
+        raise ValueError("lookup needs game_ids, model or model_hash")
+    filters, params = [], []
+    for column, value in (("model", model), ("model_hash", model_hash)):
+        if value:
+            filters.append(f"{quote_identifier(column)} = ?")
+            params.append(value)
+    frames = []
+    with connect(db_path) as conn:
+        if not table_exists(conn, TABLE):
+            return pd.DataFrame(columns=COLUMNS)
+        for chunk in _chunks(game_ids) if game_ids else [None]:
+            where = filters + ([f"game_id IN ({', '.join('?' * len(chunk))})"] if chunk else [])
+            frames.append(pd.read_sql_query(
+                f"SELECT {', '.join(COLUMNS)} FROM {TABLE} WHERE {' AND '.join(where)}",
+                conn, params=params + (chunk or [])))
+    rows = pd.concat(frames, ignore_index=True).sort_values("created_at", ascending=False, kind="stable")
+    if latest:
+        rows = rows.drop_duplicates(["game_id", "model"])
+    if limit:
+        rows = rows.head(limit)
+    return rows.reset_index(drop=True)
+
+
+def load_history(db_path: str = DB_PATH, columns=None) -> pd.DataFrame:
+    """The whole log from its columnar mirror (deduplicated on the unique key), for cross-version analysis."""
+    log_dir = log_dir_for(db_path)
+    parts = sorted(os.path.join(log_dir, f) for f in os.listdir(log_dir) if f.endswith(".parquet")) \
+        if os.path.isdir(log_dir) else []
+    if not parts:
+        return pd.DataFrame(columns=columns or COLUMNS)
+    read = list(dict.fromkeys(list(columns or COLUMNS) + UNIQUE_KEY))
+    history = pd.concat([pd.read_parquet(p, columns=read) for p in parts], ignore_index=True)
+    return history.drop_duplicates(UNIQUE_KEY).reset_index(drop=True)[list(columns or COLUMNS)]
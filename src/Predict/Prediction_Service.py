@@ -0,0 +1,229 @@
+"""
+Precomputed predictions for today's slate
+- Per-model ML/OU probabilities plus EV and Kelly sizing for every game
+- Slate-level Kelly portfolio (simultaneous fractions under caps) on top of the cached slate
+- Computed once per (todays_games version, model file versions) and held in memory; with
+  [prediction_log] enabled, games whose inputs and models are unchanged come from the prediction log
+- Staleness check is one indexed SQLite lookup + a stat() per model file, so
+  serving cached predictions never runs inference or reads the games table
+"""
+
+import hashlib
+import threading
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from src.Predict import Model_Registry
+from src.Predict.Batch_Predictor import FAMILIES, feature_matrix, predict_batch
+from src.Utils import Odds
+from src.Utils.config_loader import load_config
+from src.Utils.tools import DB_PATH, load_store_meta, load_table, store_dir_for, table_version
+
+_lock = threading.Lock()
+_cache = {}
+_games = {}
+_portfolios = {}
+
+
+def score_games(games, ml_probs, ou_probs, ou_odds: float = -110) -> dict:
+    """EV (per 100 staked) and Kelly % for both sides of the ML and OU markets, as lists."""
+    ml, ou = np.asarray(ml_probs, dtype=float), np.asarray(ou_probs, dtype=float)
+    home_odds = games["home_moneyline"].to_numpy(dtype=float)
+    away_odds = games["away_moneyline"].to_numpy(dtype=float)
+    return {
+        "ml_prob": ml.round(4).tolist(),
+        "ou_prob": ou.round(4).tolist(),
+        "home_ev": Odds.expected_value(ml, home_odds).tolist(),
+        "away_ev": Odds.expected_value(1 - ml, away_odds).tolist(),
+        "home_kelly": Odds.kelly_criterion(home_odds, ml).tolist(),
+        "away_kelly": Odds.kelly_criterion(away_odds, 1 - ml).tolist(),
+        "over_ev": Odds.expected_value(ou, ou_odds).tolist(),
+        "under_ev": Odds.expected_value(1 - ou, ou_odds).tolist(),
+        "over_kelly": Odds.kelly_criterion(ou_odds, ou).tolist(),
+        "under_kelly": Odds.kelly_criterion(ou_odds, 1 - ou).tolist(),
+    }
+
+
+def compute_predictions(games, families=tuple(FAMILIES), ou_odds: float = -110, log_db: str = None) -> list:
+    """
+    One record per game with a block per model family (or its error).
+    log_db: serve unchanged games from / append new probabilities to that DB's prediction log.
+    """
+    if log_db is not None:
+        from src.Predict.Prediction_Log import predict_logged
+        probs = predict_logged(games, families, errors="ignore", db_path=log_db)
+    else:
+        probs = predict_batch(games, families, errors="ignore")
+    per_family = {family: {"error": error} for family, error in probs.attrs["errors"].items()}
+    for family in families:
+        if family not in per_family:
+            per_family[family] = score_games(games, probs[f"{family}_ml"], probs[f"{family}_ou"], ou_odds=ou_odds)
+
+    records = []
+    for i, game in enumerate(games.itertuples()):
+        models = {
+            family: result if "error" in result else {k: v[i] for k, v in result.items()}
+            for family, result in per_family.items()
+        }
+        records.append({
+            "gameday": str(game.gameday),
+            "home_team": game.home_team,
+            "away_team": game.away_team,
+            "home_moneyline": float(game.home_moneyline),
+            "away_moneyline": float(game.away_moneyline),
+            "total_line": float(game.total_line),
+            "models": models,
+        })
+    return records
+
+
+def cache_key(db_path: str = DB_PATH, config: dict = None) -> tuple:
+    """(todays_games version, model file versions) - changes whenever a recompute is needed."""
+    config = config or load_config()
+    keys = [k for family in FAMILIES.values() for k in family]
+    return table_version("todays_games", db_path), Model_Registry.file_signature(keys, config)
+
+
+def get_predictions(db_path: str = DB_PATH) -> dict:
+    """
+    Cached predictions for todays_games:
+      {"predictions": [...], "etag": str, "last_modified": datetime}
+    Recomputed only when todays_games or a model file changed.
+    """
+    config = load_config()
+    key = cache_key(db_path, config)
+    entry = _cache.get(db_path)
+    if entry is not None and entry["key"] == key:
+        return entry
+
+    with _lock:
+        entry = _cache.get(db_path)
+        if entry is not None and entry["key"] == key:
+            return entry
+        games = load_table("todays_games", db_path)
+        ou_odds = config.get("betting", {}).get("ou_odds", -110)
+        predictions = compute_predictions(games, ou_odds=ou_odds, log_db=_log_db(db_path, config)) \
+            if not games.empty else []
+        entry = {
+            "key": key,
+            "predictions": predictions,
+            "etag": hashlib.sha1(repr(key).encode()).hexdigest(),
+            "last_modified": datetime.now(timezone.utc).replace(microsecond=0),
+        }
+        _cache[db_path] = entry
+        return entry
+
+
+def refresh_games(games, db_path: str = DB_PATH) -> dict:
+    """
+    Re-score only `games` (todays_games rows whose lines moved, already written back) and patch
+    them into the cached slate under the new cache key. Without a cached slate this is a no-op:
+    the next get_predictions computes everything anyway.
+    """
+    config = load_config()
+    with _lock:
+        entry = _cache.get(db_path)
+        if entry is None or games.empty:
+            return entry
+        key = cache_key(db_path, config)
+        if key[1] != entry["key"][1]:
+            # a model changed too: every game needs re-scoring
+            _cache.pop(db_path, None)
+            return None
+        ou_odds = config.get("betting", {}).get("ou_odds", -110)
+        fresh = {_game_key(r): r for r in compute_predictions(games, ou_odds=ou_odds,
+                                                              log_db=_log_db(db_path, config))}
+        entry = {
+            "key": key,
+            "predictions": [fresh.get(_game_key(r), r) for r in entry["predictions"]],
+            "etag": hashlib.sha1(repr(key).encode()).hexdigest(),
+            "last_modified": datetime.now(timezone.utc).replace(microsecond=0),
+        }
+        _cache[db_path] = entry
+        return entry
+
+
+def get_portfolio(family: str = None, bankroll: float = None, db_path: str = DB_PATH) -> dict:
+    """
+    Slate-level Kelly staking (src/Utils/Portfolio.py) over the cached predictions of one family:
+      {"family", "bets": [...], "summary": {...}}
+    Fractions are solved once per slate version; stakes are scaled to `bankroll` per call.
+    """
+    from src.Utils.Portfolio import optimize_slate
+    settings = load_config().get("portfolio", {})
+    family = family or settings.get("family", "xgb")
+    if family not in FAMILIES:
+        raise ValueError(f"Unknown model family: {family}")
+    entry = get_predictions(db_path)
+    key = (db_path, entry["etag"], family)
+    bets = _portfolios.get(key)
+    if bets is None:
+        records = [r for r in entry["predictions"] if "error" not in r["models"][family]]
+        if entry["predictions"] and not records:
+            raise RuntimeError(f"{family} predictions failed: {entry['predictions'][0]['models'][family]['error']}")
+        games = pd.DataFrame([{k: r[k] for k in ("gameday", "home_team", "away_team", "home_moneyline",
+                                                  "away_moneyline")} for r in records],
+                             columns=["gameday", "home_team", "away_team", "home_moneyline", "away_moneyline"])
+        bets = optimize_slate(games, [r["models"][family]["ml_prob"] for r in records],
+                              [r["models"][family]["ou_prob"] for r in records], bankroll=1.0, db_path=db_path)
+        with _lock:
+            for stale in [k for k in _portfolios if k[0] == db_path]:
+                _portfolios.pop(stale)
+            _portfolios[key] = bets
+
+    bankroll = float(settings.get("bankroll", 1000.0) if bankroll is None else bankroll)
+    summary = {**bets.attrs["summary"], "bankroll": bankroll}
+    result = bets.assign(stake=np.floor(bets["fraction"] * bankroll * 100 + 1e-6) / 100)
+    summary["total_stake"] = round(float(result["stake"].sum()), 2)
+    summary["expected_profit"] = round(float((result["fraction"] * result["ev"]).sum() * bankroll), 2)
+    return {"family": family, "bets": result.round(6).to_dict(orient="records"), "summary": summary}
+
+
+def _log_db(db_path: str, config: dict):
+    return db_path if config.get("prediction_log", {}).get("enabled", True) else None
+
+
+def _game_key(record: dict) -> tuple:
+    return record["gameday"], record["home_team"], record["away_team"]
+
+
+def matchup_id(game) -> str:
+    """'AWAY@HOME' id used by /api/predict (e.g. 'BUF@KC')."""
+    return f"{game['away_team']}@{game['home_team']}"
+
+
+def matchup_features(matchups, db_path: str = DB_PATH):
+    """Feature rows from todays_games for 'AWAY@HOME' ids (KeyError for unknown ids)."""
+    version = table_version("todays_games", db_path)
+    cached = _games.get(db_path)
+    if cached is None or cached[0] != version:
+        games = load_table("todays_games", db_path)
+        X = feature_matrix(games)
+        cached = _games[db_path] = (version, {matchup_id(g): i for i, g in games.iterrows()}, X)
+    _, index, X = cached
+    missing = [m for m in matchups if m not in index]
+    if missing:
+        raise KeyError(f"Unknown matchups: {missing}")
+    return X[[index[m] for m in matchups]]
+
+
+def row_features(rows, db_path: str = DB_PATH):
+    """Ad-hoc feature dicts -> matrix in the column order the models were trained on (features_all)."""
+    meta = load_store_meta("features_all", store_dir_for(db_path))
+    if meta is None:
+        raise ValueError("No feature store for features_all; build it first or send matchups")
+    columns = meta["columns"]
+    missing = sorted({c for row in rows for c in columns if c not in row})
+    if missing:
+        raise ValueError(f"Missing feature columns: {missing}")
+    return np.array([[float(row[c]) for c in columns] for row in rows])
+
+
+def invalidate(db_path: str = DB_PATH):
+    """Drop the cached slate (next request recomputes)."""
+    with _lock:
+        _cache.pop(db_path, None)
+        for key in [k for k in _portfolios if k[0] == db_path]:
+            _portfolios.pop(key)
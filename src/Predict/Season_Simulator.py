@@ -0,0 +1,287 @@
+"""
+Monte Carlo season simulator for futures markets (win totals, division winners, playoff odds)
+- Completed regular-season games are fixed results (a tie counts half a win for both teams);
+  every remaining game is a Bernoulli draw with the model's home win probability
+- One batch of seasons is a (seasons, games) matrix of draws; team wins come out of two
+  matmuls against home/away incidence matrices, standings out of a few argmax/argsort calls
+- Batches are fanned out over a process pool and reduced to fixed-size aggregates (win-total
+  histogram, seed counts, win sums) as they finish, so memory never grows with the season count
+- Batch i is seeded with (seed, i): the result depends on seed and batch size, not on worker count
+
+Standings tie-breaks are random (no head-to-head / strength-of-victory rules), so division and
+wild-card odds are slightly smoothed between teams that finish level on wins.
+
+Usage:
+    python -m src.Predict.Season_Simulator --season 2024 --sims 100000
+"""
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from src.Utils import metrics
+from src.Utils.config_loader import load_config
+from src.Utils.db import DB_PATH
+from src.Utils.Dictionaries import current_team_codes, team_divisions, team_index_current
+
+TEAMS = list(team_index_current)
+TEAM_INDEX = {team: i for i, team in enumerate(TEAMS)}
+DIVISIONS = sorted(set(team_divisions.values()))
+CONFERENCES = ("AFC", "NFC")
+PLAYOFF_SEEDS = 7   # 4 division winners + 3 wild cards per conference
+
+SETTINGS = {"sims": 100_000, "batch": 5_000, "workers": 0, "seed": 7, "family": "xgb"}
+
+
+def team_code(code: str) -> str:
+    """nflverse code -> team_index_current code."""
+    return current_team_codes.get(code, code)
+
+
+# ---------------------------------------------------------------- schedule -> arrays
+
+def season_arrays(schedule: pd.DataFrame) -> dict:
+    """
+    Regular-season schedule -> the arrays a batch needs:
+    base (team wins already banked), home / away (team index per remaining game) and p (home win
+    probability per remaining game, from the p_home column). Rows with both scores are completed.
+    """
+    if "game_type" in schedule.columns:
+        schedule = schedule[schedule["game_type"] == "REG"]
+    home = schedule["home_team"].map(team_code).map(TEAM_INDEX)
+    away = schedule["away_team"].map(team_code).map(TEAM_INDEX)
+    if home.isna().any() or away.isna().any():
+        unknown = set(schedule["home_team"][home.isna()]) | set(schedule["away_team"][away.isna()])
+        raise ValueError(f"[Season_Simulator] Unknown team codes: {sorted(unknown)}")
+    home, away = home.to_numpy(int), away.to_numpy(int)
+
+    played = np.zeros(len(schedule), dtype=bool)
+    if {"home_score", "away_score"} <= set(schedule.columns):
+        played = (schedule["home_score"].notna() & schedule["away_score"].notna()).to_numpy()
+    base = np.zeros(len(TEAMS))
+    if played.any():
+        margin = (schedule["home_score"] - schedule["away_score"]).to_numpy(float)[played]
+        np.add.at(base, home[played], np.sign(margin) / 2 + 0.5)
+        np.add.at(base, away[played], 0.5 - np.sign(margin) / 2)
+
+    p = schedule["p_home"].to_numpy(float)[~played] if "p_home" in schedule.columns \
+        else np.full((~played).sum(), np.nan)
+    if np.isnan(p).any():
+        raise ValueError(f"[Season_Simulator] {np.isnan(p).sum()} remaining game(s) have no p_home")
+    games = np.bincount(np.concatenate([home, away]), minlength=len(TEAMS))
+    return {"base": base, "home": home[~played], "away": away[~played], "p": np.clip(p, 0.0, 1.0),
+            "max_games": int(games.max(initial=0))}
+
+
+def _layout() -> dict:
+    """Team indices grouped by division (8 x 4) and by conference (2 x 16)."""
+    divisions = np.array([[TEAM_INDEX[t] for t in TEAMS if team_divisions[t] == d] for d in DIVISIONS])
+    conferences = np.array([[TEAM_INDEX[t] for t in TEAMS if team_divisions[t].startswith(c)] for c in CONFERENCES])
+    return {"divisions": divisions, "conferences": conferences}
+
+
+# ---------------------------------------------------------------- one batch
+
+def _empty(n_bins: int) -> dict:
+    return {
+        "n": 0,
+        "wins": np.zeros(len(TEAMS)),
+        "wins_sq": np.zeros(len(TEAMS)),
+        "win_hist": np.zeros((len(TEAMS), n_bins), dtype=np.int64),   # half-win bins
+        "division": np.zeros(len(TEAMS), dtype=np.int64),
+        "seeds": np.zeros((len(TEAMS), PLAYOFF_SEEDS), dtype=np.int64),
+    }
+
+
+def _merge(total: dict, part: dict) -> dict:
+    for key, value in part.items():
+        total[key] = total[key] + value
+    return total
+
+
+def simulate_batch(arrays: dict, n: int, rng: np.random.Generator, layout: dict = None) -> dict:
+    """Aggregates over n simulated seasons."""
+    layout = layout or _layout()
+    T = len(TEAMS)
+    H = np.zeros((len(arrays["home"]), T), dtype=np.float32)
+    A = np.zeros_like(H)
+    H[np.arange(len(H)), arrays["home"]] = 1
+    A[np.arange(len(A)), arrays["away"]] = 1
+
+    home_won = (rng.random((n, len(H))) < arrays["p"]).astype(np.float32)
+    wins = arrays["base"] + home_won @ H + (1 - home_won) @ A   # (n, T)
+    score = wins + rng.random(wins.shape) * 0.25   # random tie-break below half a win
+
+    divisions = layout["divisions"]
+    leader = divisions[np.arange(len(divisions)), score[:, divisions].argmax(axis=2)]   # (n, 8)
+    won_division = np.zeros(wins.shape, dtype=bool)
+    np.put_along_axis(won_division, leader, True, axis=1)
+
+    seeds = np.zeros((T, PLAYOFF_SEEDS), dtype=np.int64)
+    for members in layout["conferences"]:
+        key = score[:, members] + won_division[:, members] * 100.0   # division winners seed first
+        order = members[np.argsort(-key, axis=1)[:, :PLAYOFF_SEEDS]]   # (n, 7) team per seed
+        flat = order * PLAYOFF_SEEDS + np.arange(PLAYOFF_SEEDS)
+        seeds += np.bincount(flat.ravel(), minlength=T * PLAYOFF_SEEDS).reshape(T, PLAYOFF_SEEDS)
+
+    n_bins = 2 * arrays["max_games"] + 1
+    half = np.clip(np.rint(wins * 2).astype(np.int64), 0, n_bins - 1)
+    return {
+        "n": n,
+        "wins": wins.sum(axis=0, dtype=float),
+        "wins_sq": (wins.astype(float) ** 2).sum(axis=0),
+        "win_hist": np.bincount((half + np.arange(T) * n_bins).ravel(), minlength=T * n_bins).reshape(T, n_bins),
+        "division": won_division.sum(axis=0),
+        "seeds": seeds,
+    }
+
+
+# Per-worker state (set by _init_worker)
+_arrays = None
+_layout_cache = None
+
+
+def _init_worker(arrays):
+    global _arrays, _layout_cache
+    _arrays, _layout_cache = arrays, _layout()
+
+
+def _run_batch(seed: int, i: int, n: int) -> dict:
+    return simulate_batch(_arrays, n, np.random.default_rng([seed, i]), _layout_cache)
+
+
+# ---------------------------------------------------------------- driver
+
+class SeasonSimulation:
+    """Merged aggregates of a simulation run; every table is keyed by team_index_current code."""
+
+    def __init__(self, totals: dict):
+        self.totals = totals
+        self.n = totals["n"]
+
+    def summary(self) -> pd.DataFrame:
+        t, n = self.totals, self.n
+        mean = t["wins"] / n
+        seeds = t["seeds"] / n
+        return pd.DataFrame({
+            "name": [team_index_current[team] for team in TEAMS],
+            "division": [team_divisions[team] for team in TEAMS],
+            "mean_wins": mean.round(3),
+            "std_wins": np.sqrt(np.maximum(t["wins_sq"] / n - mean ** 2, 0)).round(3),
+            "p_division": t["division"] / n,
+            "p_playoffs": seeds.sum(axis=1),
+            "p_top_seed": seeds[:, 0],
+        }, index=pd.Index(TEAMS, name="team"))
+
+    def win_totals(self) -> pd.DataFrame:
+        """P(exactly w wins) per team; columns are win totals in half-win steps (ties)."""
+        hist = self.totals["win_hist"]
+        columns = np.arange(hist.shape[1]) / 2
+        frame = pd.DataFrame(hist / self.n, index=pd.Index(TEAMS, name="team"), columns=columns)
+        return frame.loc[:, hist.sum(axis=0) > 0]
+
+    def seed_probabilities(self) -> pd.DataFrame:
+        return pd.DataFrame(self.totals["seeds"] / self.n, index=pd.Index(TEAMS, name="team"),
+                            columns=range(1, PLAYOFF_SEEDS + 1))
+
+    def prob_over(self, team: str, line: float) -> float:
+        """P(wins > line), the over side of a season win-total market."""
+        totals = self.win_totals().loc[team_code(team)]
+        return float(totals[totals.index > line].sum())
+
+
+def simulate(schedule: pd.DataFrame, sims: int = None, batch: int = None, workers: int = None,
+             seed: int = None) -> SeasonSimulation:
+    """
+    Simulate the rest of a regular season `sims` times.
+    schedule needs home_team / away_team, home_score / away_score (NaN = not played yet) and
+    p_home for the games not played yet. Defaults come from [simulation] in config.toml.
+    workers = 0 uses every core; 1 runs in-process.
+    """
+    settings = {**SETTINGS, **load_config().get("simulation", {})}
+    sims, batch = sims or settings["sims"], batch or settings["batch"]
+    workers = settings["workers"] if workers is None else workers
+    seed = settings["seed"] if seed is None else seed
+
+    arrays = season_arrays(schedule)
+    sizes = [min(batch, sims - start) for start in range(0, sims, batch)]
+    workers = min(workers or os.cpu_count() or 1, len(sizes))
+    totals = _empty(2 * arrays["max_games"] + 1)
+
+    with metrics.span("season_simulation"):
+        if workers <= 1:
+            _init_worker(arrays)
+            for i, n in enumerate(sizes):
+                _merge(totals, _run_batch(seed, i, n))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(arrays,)) as pool:
+                futures = [pool.submit(_run_batch, seed, i, n) for i, n in enumerate(sizes)]
+                for future in as_completed(futures):
+                    _merge(totals, future.result())
+    metrics.incr("seasons_simulated", sims)
+    print(f"[Season_Simulator] Simulated {sims} seasons ({len(arrays['p'])} games left) "
+          f"in {len(sizes)} batches on {workers} worker(s)")
+    return SeasonSimulation(totals)
+
+
+def game_probabilities(games: pd.DataFrame, family: str = "xgb") -> np.ndarray:
+    """Home win probability per game from one model family (or "ensemble")."""
+    if family == "ensemble":
+        from src.Predict.Ensemble import predict_ensemble
+        return predict_ensemble(games)["ensemble_ml"].to_numpy(float)
+    from src.Predict.Batch_Predictor import predict_batch
+    return predict_batch(games, [family])[f"{family}_ml"].to_numpy(float)
+
+
+def run(season: int = None, db_path: str = DB_PATH, family: str = None, **overrides) -> SeasonSimulation:
+    """
+    Current schedule -> model probabilities for the unplayed games -> simulation; the summary and
+    win-total distribution are written to season_simulation / season_win_totals.
+    """
+    from src.DataProviders.NFLDataProvider import FEATURE_COLUMNS, STATE_PATH, _build_games, import_schedules
+    from src.features.rolling_features import TeamFeatureEngine
+    from src.Utils.tools import save_table
+
+    config = load_config()
+    season = season or config["data"]["current_season"]
+    family = family or {**SETTINGS, **config.get("simulation", {})}["family"]
+
+    schedule = import_schedules([season])
+    schedule = schedule[schedule["game_type"] == "REG"].reset_index(drop=True)
+    remaining = schedule["home_score"].isna() | schedule["away_score"].isna()
+    schedule["p_home"] = np.nan
+    if remaining.any():
+        engine = TeamFeatureEngine.load(STATE_PATH) if os.path.exists(STATE_PATH) else None
+        games = _build_games([season], schedules=schedule[remaining].copy(), engine=engine)
+        games = games.drop_duplicates("game_id")
+        # model inputs only (like todays_games); probabilities go back to the schedule by game_id
+        p = pd.Series(game_probabilities(games[FEATURE_COLUMNS], family), index=games["game_id"].to_numpy())
+        p = schedule.loc[remaining, "game_id"].map(p).to_numpy(dtype=float)
+        missing = np.isnan(p)
+        if missing.any():
+            print(f"[Season_Simulator] {missing.sum()} game(s) could not be scored, using 0.5")
+        schedule.loc[remaining, "p_home"] = np.where(missing, 0.5, p)
+
+    result = simulate(schedule, **overrides)
+    summary = result.summary().reset_index().assign(season=season, sims=result.n)
+    totals = result.win_totals().stack().rename("probability").reset_index() \
+        .rename(columns={"level_1": "wins"}).assign(season=season)
+    save_table(summary, "season_simulation", db_path)
+    save_table(totals, "season_win_totals", db_path)
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Monte Carlo simulation of the rest of a regular season")
+    parser.add_argument("--season", type=int)
+    parser.add_argument("--family", choices=["xgb", "nn", "log", "ensemble"])
+    parser.add_argument("--sims", type=int)
+    parser.add_argument("--batch", type=int, help="Seasons per vectorized batch")
+    parser.add_argument("--workers", type=int, help="Process pool size, 0 = all cores")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+    table = run(**{k: v for k, v in vars(args).items() if v is not None}).summary()
+    print(table.sort_values("p_playoffs", ascending=False).to_string())
@@ -1,8 +1,9 @@
-import xgboost as xgb
+from src.Predict.Batch_Predictor import FeatureBatch, predict_family
 from src.Utils.tools import print_game_predictions
-from src.Utils.config_loader import load_config
 
-config = load_config()
+def xgb_predict(X, batch=None):
+    """(home win probs, over probs) from the XGBoost models. Pass a FeatureBatch to reuse its DMatrix."""
+    return predict_family("xgb", batch or FeatureBatch(X))
 
 def xgb_runner(X, games):
     """
@@ -11,17 +12,5 @@ def xgb_runner(X, games):
       X     = features as numpy array
       games = dataframe of today's games
     """
-    # Load models from config
-    xgb_ml = xgb.Booster()
-    xgb_ml.load_model(config["models"]["xgb_ml"])
-
-    xgb_ou = xgb.Booster()
-    xgb_ou.load_model(config["models"]["xgb_ou"])
-
-    dtest = xgb.DMatrix(X)
-
-    # Predictions
-    ml_preds = [p[1] for p in xgb_ml.predict(dtest)]   # home win prob
-    ou_preds = [p[1] for p in xgb_ou.predict(dtest)]   # over prob
-
+    ml_preds, ou_preds = xgb_predict(X)
     print_game_predictions(games, ml_probs=ml_preds, ou_probs=ou_preds)
@@ -1,9 +1,12 @@
+import argparse
+import os
+
 from src.DataProviders.NFLDataProvider import get_todays_nfl_games, build_historical_features
 
-def create_historical_dataset():
+def create_historical_dataset(incremental=False):
     """Build and save full historical NFL dataset into features_all."""
     print("[Create_Games] Building historical NFL dataset...")
-    df = build_historical_features()
+    df = build_historical_features(incremental=incremental)
     print(f"[Create_Games] Done. Saved {len(df)} rows into features_all.")
 
 def create_todays_games():
@@ -17,6 +20,15 @@ def create_todays_games():
         print(df)
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build NFL datasets")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only fetch/upsert (season, week) partitions that changed")
+    parser.add_argument("--offline", action="store_true",
+                        help="Serve nfl_data_py imports from Data/cache only (no network)")
+    args = parser.parse_args()
+    if args.offline:
+        os.environ["NFL_OFFLINE"] = "1"
+
     # Run both for testing
-    create_historical_dataset()
+    create_historical_dataset(incremental=args.incremental)
     create_todays_games()
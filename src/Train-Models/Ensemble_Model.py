@@ -0,0 +1,24 @@
+import argparse
+
+from src.Utils.config_loader import load_config
+from src.Utils.stacking import train_ensemble
+
+config = load_config()
+db_path = config["data"]["db_path"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stacked, calibrated ensemble over the XGBoost / NN / logistic models")
+    parser.add_argument("--method", choices=["stacking", "average"], help="Meta-model (default [ensemble].method)")
+    parser.add_argument("--calibration", choices=["isotonic", "platt", "none"],
+                        help="Calibrator (default [ensemble].calibration)")
+    parser.add_argument("--families", nargs="+", choices=["xgb", "nn", "log"],
+                        help="Base families (default [ensemble].families)")
+    args = parser.parse_args()
+
+    overrides = {k: v for k, v in vars(args).items() if v is not None}
+    train_ensemble(db_path=db_path, **overrides)
+
+
+if __name__ == "__main__":
+    main()
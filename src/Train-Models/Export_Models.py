@@ -0,0 +1,29 @@
+import argparse
+
+import numpy as np
+
+from src.Predict.Compiled_Models import COMPILERS, export_model
+from src.Utils.config_loader import load_config
+from src.Utils.tools import load_training_data
+
+config = load_config()
+db_path = config["data"]["db_path"]
+
+
+def main():
+    keys = [k for k in config["models"] if k.split("_")[0] in COMPILERS]
+    parser = argparse.ArgumentParser(description="Compile the XGBoost / NN models into NumPy inference artifacts")
+    parser.add_argument("keys", nargs="*", choices=keys, help="config [models] keys (default: all of them)")
+    parser.add_argument("--rows", type=int, default=2000, help="features_all rows used for the parity check")
+    parser.add_argument("--tolerance", type=float, default=1e-4, help="Max allowed probability difference")
+    args = parser.parse_args()
+
+    X, _ = load_training_data("home_win", db_path=db_path)
+    X = np.asarray(X)
+    rows = np.random.default_rng(0).choice(len(X), min(args.rows, len(X)), replace=False)
+    for key in args.keys or keys:
+        export_model(key, X[np.sort(rows)], tolerance=args.tolerance)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,17 @@
-import sqlite3, joblib
-import pandas as pd
+import joblib
+import numpy as np
 from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import accuracy_score, classification_report
 from sklearn.model_selection import train_test_split
 from src.Utils.config_loader import load_config
+from src.Utils.tools import load_training_data
 
 config = load_config()
 db_path, model_path = config["data"]["db_path"], config["models"]["log_ou"]
 
-con = sqlite3.connect(db_path)
-data = pd.read_sql_query("SELECT * FROM features_all", con)
-con.close()
-
-y = data["ou_cover"]
-X = data.drop(columns=["home_win", "ou_cover", "gameday", "home_team", "away_team"]).values.astype(float)
+X, y = load_training_data("ou_cover", db_path=db_path)
+keep = y >= 0   # pushes aren't a class
+X, y = np.asarray(X)[keep], y[keep]
 
 X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.1, random_state=42)
 model = LogisticRegression(max_iter=1000).fit(X_train, y_train)
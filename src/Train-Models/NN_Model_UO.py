@@ -1,18 +1,26 @@
-import sqlite3, numpy as np, pandas as pd, tensorflow as tf
+import numpy as np, tensorflow as tf
 from keras.callbacks import TensorBoard, EarlyStopping, ModelCheckpoint
 import time
+from src.Predict.Compiled_Models import export_model
 from src.Utils.config_loader import load_config
+from src.Utils.scaling import fit_feature_store, scaler_path
+from src.Utils.tools import load_training_data
+from src.Utils.tuning import build_nn, nn_params
 
 config = load_config()
 db_path, model_path = config["data"]["db_path"], config["models"]["nn_ou"]
+params = nn_params(config, "nn_ou")
+binary = config["training"].get("objective", "binary") == "binary"
 
-con = sqlite3.connect(db_path)
-data = pd.read_sql_query("SELECT * FROM features_all", con)
-con.close()
+X, y = load_training_data("ou_cover", db_path=db_path)
+keep = y >= 0   # pushes aren't a class
+X_raw, y = np.asarray(X)[keep], y[keep]
 
-y = data["ou_cover"]
-X = data.drop(columns=["home_win", "ou_cover", "gameday", "home_team", "away_team"]).values.astype(float)
-X = tf.keras.utils.normalize(X, axis=1)
+# column-wise scaler from one streaming pass over features_all, saved next to the model
+# (the batch engine applies the same NumPy transform at inference)
+scaler = fit_feature_store(db_path=db_path)
+scaler.save(scaler_path(model_path))
+X = scaler.transform(X_raw)
 
 callbacks = [
     TensorBoard(log_dir=f"Logs/{time.time()}"),
@@ -20,12 +28,8 @@ callbacks = [
     ModelCheckpoint(model_path, save_best_only=True, monitor="val_loss", mode="min"),
 ]
 
-model = tf.keras.Sequential([
-    tf.keras.layers.Dense(512, activation="relu"),
-    tf.keras.layers.Dense(256, activation="relu"),
-    tf.keras.layers.Dense(128, activation="relu"),
-    tf.keras.layers.Dense(2, activation="softmax"),
-])
+model = build_nn(params, binary=binary)
+model.fit(X, y, epochs=params["epochs"], validation_split=0.1, batch_size=params["batch_size"], callbacks=callbacks)
 
-model.compile(optimizer="adam", loss="sparse_categorical_crossentropy", metrics=["accuracy"])
-model.fit(X, y, epochs=50, validation_split=0.1, batch_size=32, callbacks=callbacks)
+# the checkpointed best model, compiled for TensorFlow-free inference (scaled with the saved scaler)
+export_model("nn_ou", X_raw[:2000], path=model_path)
@@ -0,0 +1,24 @@
+import argparse
+
+from src.Utils.config_loader import load_config
+from src.Utils.tuning import STUDIES, export_best, run_study
+
+config = load_config()
+db_path = config["data"]["db_path"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hyperparameter search for the XGBoost / NN trainers")
+    parser.add_argument("study", choices=list(STUDIES))
+    parser.add_argument("--trials", type=int, help="Total trials for the study (default [tuning].trials)")
+    parser.add_argument("--workers", type=int, help="Process pool size (default [tuning].workers)")
+    parser.add_argument("--export", action="store_true", help="Write the best trial to [tuned.<study>]")
+    args = parser.parse_args()
+
+    run_study(args.study, trials=args.trials, workers=args.workers, db_path=db_path)
+    if args.export:
+        export_best(args.study, db_path=db_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,33 +1,27 @@
-import sqlite3, xgboost as xgb
-import pandas as pd, numpy as np
-from sklearn.metrics import accuracy_score
-from sklearn.model_selection import train_test_split
-from tqdm import tqdm
+from src.Predict.Compiled_Models import export_model
 from src.Utils.config_loader import load_config
+from src.Utils.tools import load_training_data
+from src.Utils.train_harness import OBJECTIVES, run_monte_carlo
+from src.Utils.tuning import xgb_params
 
 config = load_config()
-db_path, model_path = config["data"]["db_path"], config["models"]["xgb_ml"]
+db_path, model_path = config["data"]["db_path"], config["models"]["xgb_ou"]
 
-con = sqlite3.connect(db_path)
-data = pd.read_sql_query("SELECT * FROM features_all", con)
-con.close()
+# [tuned.xgb_ou] (Tune_Hyperparameters.py --export) overrides the defaults
+params, num_boost_round = xgb_params(
+    config, "xgb_ou",
+    {"max_depth": 3, "eta": 0.01, **OBJECTIVES[config["training"].get("objective", "binary")]})
 
-y = data["ou_cover"]
-X = data.drop(columns=["home_win", "ou_cover", "gameday", "home_team", "away_team"]).values.astype(float)
 
-acc_results = []
-for _ in tqdm(range(100)):
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.1)
+def main():
+    X, y = load_training_data("ou_cover", db_path=db_path)
 
-    train = xgb.DMatrix(X_train, label=y_train)
-    test = xgb.DMatrix(X_test, label=y_test)
+    training = config["training"]
+    run_monte_carlo(X, y, params, num_boost_round=num_boost_round, model_path=model_path,
+                    iterations=training["iterations"], workers=training["workers"],
+                    seed=training["seed"], test_size=training["test_size"])
+    export_model("xgb_ou", X[:2000], path=model_path)   # NumPy artifact the runners prefer
 
-    params = {"max_depth": 3, "eta": 0.01, "objective": "multi:softprob", "num_class": 2}
-    model = xgb.train(params, train, num_boost_round=750)
 
-    preds = [p.argmax() for p in model.predict(test)]
-    acc = round(accuracy_score(y_test, preds) * 100, 1)
-    acc_results.append(acc)
-
-    if acc == max(acc_results):
-        model.save_model(model_path)
+if __name__ == "__main__":
+    main()
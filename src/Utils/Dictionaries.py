@@ -35,3 +35,72 @@ team_index_current = {
     "TEN": "Tennessee Titans",
     "WAS": "Washington Commanders"
 }
+
+# Relocated franchises: historical nflverse code -> current code (team state follows the franchise)
+franchise_codes = {
+    "OAK": "LV",
+    "SD": "LAC",
+    "STL": "LA",
+    "LAR": "LA",
+}
+
+# nflverse schedule code -> team_index_current code (nflverse calls the Rams "LA")
+current_team_codes = {
+    "LA": "LAR",
+    "STL": "LAR",
+    "OAK": "LV",
+    "SD": "LAC",
+}
+
+# Division by team_index_current code; the conference is the first word
+team_divisions = {
+    "BUF": "AFC East", "MIA": "AFC East", "NE": "AFC East", "NYJ": "AFC East",
+    "BAL": "AFC North", "CIN": "AFC North", "CLE": "AFC North", "PIT": "AFC North",
+    "HOU": "AFC South", "IND": "AFC South", "JAX": "AFC South", "TEN": "AFC South",
+    "DEN": "AFC West", "KC": "AFC West", "LV": "AFC West", "LAC": "AFC West",
+    "DAL": "NFC East", "NYG": "NFC East", "PHI": "NFC East", "WAS": "NFC East",
+    "CHI": "NFC North", "DET": "NFC North", "GB": "NFC North", "MIN": "NFC North",
+    "ATL": "NFC South", "CAR": "NFC South", "NO": "NFC South", "TB": "NFC South",
+    "ARI": "NFC West", "LAR": "NFC West", "SF": "NFC West", "SEA": "NFC West",
+}
+
+# Home stadium (latitude, longitude) by team code, including pre-relocation codes,
+# used for travel distance between consecutive games
+team_coordinates = {
+    "ARI": (33.528, -112.263),
+    "ATL": (33.755, -84.401),
+    "BAL": (39.278, -76.623),
+    "BUF": (42.774, -78.787),
+    "CAR": (35.226, -80.853),
+    "CHI": (41.862, -87.617),
+    "CIN": (39.095, -84.516),
+    "CLE": (41.506, -81.700),
+    "DAL": (32.748, -97.093),
+    "DEN": (39.744, -105.020),
+    "DET": (42.340, -83.046),
+    "GB":  (44.501, -88.062),
+    "HOU": (29.685, -95.411),
+    "IND": (39.760, -86.164),
+    "JAX": (30.324, -81.637),
+    "KC":  (39.049, -94.484),
+    "LV":  (36.091, -115.184),
+    "LAC": (33.953, -118.339),
+    "LA":  (33.953, -118.339),
+    "LAR": (33.953, -118.339),
+    "MIA": (25.958, -80.239),
+    "MIN": (44.974, -93.258),
+    "NE":  (42.091, -71.264),
+    "NO":  (29.951, -90.081),
+    "NYG": (40.813, -74.074),
+    "NYJ": (40.813, -74.074),
+    "PHI": (39.901, -75.168),
+    "PIT": (40.447, -80.016),
+    "SEA": (47.595, -122.332),
+    "SF":  (37.403, -121.970),
+    "TB":  (27.976, -82.503),
+    "TEN": (36.166, -86.771),
+    "WAS": (38.908, -76.864),
+    "OAK": (37.752, -122.201),
+    "SD":  (32.783, -117.120),
+    "STL": (38.633, -90.189),
+}
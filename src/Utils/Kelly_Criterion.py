@@ -1,17 +1,14 @@
+from src.Utils import Odds
+
+
 def american_to_decimal(american_odds):
     """
     Converts American odds to decimal odds (European odds).
     """
-    if american_odds >= 100:
-        decimal_odds = (american_odds / 100)
-    else:
-        decimal_odds = (100 / abs(american_odds))
-    return round(decimal_odds, 2)
+    return round(float(Odds.american_to_net(american_odds)), 2)
 
 def calculate_kelly_criterion(american_odds, model_prob):
     """
     Calculates the fraction of the bankroll to be wagered on each bet
     """
-    decimal_odds = american_to_decimal(american_odds)
-    bankroll_fraction = round((100 * (decimal_odds * model_prob - (1 - model_prob))) / decimal_odds, 2)
-    return bankroll_fraction if bankroll_fraction > 0 else 0
\ No newline at end of file
+    return float(Odds.kelly_criterion(american_odds, model_prob))
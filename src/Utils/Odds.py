@@ -0,0 +1,120 @@
+"""
+Vectorized odds math
+- Converts whole arrays between American, decimal and implied-probability odds
+- Expected value and Kelly sizing over arrays (same results as the scalar helpers)
+- Vig removal across both sides of a market
+Every function accepts scalars, lists, numpy arrays or pandas Series; NaN passes through.
+"""
+
+import numpy as np
+
+
+def _arr(x):
+    return np.asarray(x, dtype=float)
+
+
+def _round2(x):
+    """
+    Round to 2 decimals exactly like Python's round().
+    np.round scales by 100 first, which can flip values sitting on a half-cent
+    (22.055 -> 22.06); those few near-ties are re-rounded with round().
+    """
+    x = _arr(x)
+    scaled = x * 100
+    out = np.round(scaled) / 100
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if near_tie.any():
+        out = np.array(out, copy=True)
+        out[near_tie] = [round(v, 2) for v in x[near_tie].tolist()]
+    return out
+
+
+def american_to_net(odds):
+    """Net profit per 1 unit staked (+250 -> 2.5, -200 -> 0.5)."""
+    odds = _arr(odds)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(odds >= 100, odds / 100, 100 / np.abs(odds))
+
+
+def american_to_decimal(odds):
+    """American -> decimal (European) odds, stake included (+250 -> 3.5, -200 -> 1.5)."""
+    return 1 + american_to_net(odds)
+
+
+def decimal_to_american(decimal_odds):
+    """Decimal (European) -> American odds."""
+    net = _arr(decimal_odds) - 1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(net >= 1, net * 100, -100 / net)
+
+
+def american_to_implied(odds):
+    """American odds -> implied probability (vig included)."""
+    odds = _arr(odds)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(odds > 0, 100 / (odds + 100), np.abs(odds) / (np.abs(odds) + 100))
+
+
+def implied_to_american(prob):
+    """Implied probability -> American odds."""
+    prob = _arr(prob)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(prob < 0.5, 100 * (1 - prob) / prob, -100 * prob / (1 - prob))
+
+
+def decimal_to_implied(decimal_odds):
+    """Decimal odds -> implied probability."""
+    with np.errstate(divide="ignore"):
+        return 1 / _arr(decimal_odds)
+
+
+def remove_vig(odds_a, odds_b, method: str = "multiplicative"):
+    """
+    Fair (no-vig) probabilities for both sides of a two-way market.
+    method:
+      multiplicative -> scale both implied probs by the overround
+      additive       -> subtract half of the overround from each side
+    Returns (fair_a, fair_b).
+    """
+    p_a, p_b = american_to_implied(odds_a), american_to_implied(odds_b)
+    total = p_a + p_b
+    if method == "multiplicative":
+        return p_a / total, p_b / total
+    if method == "additive":
+        half = (total - 1) / 2
+        return p_a - half, p_b - half
+    raise ValueError(f"Unknown vig removal method: {method}")
+
+
+def overround(odds_a, odds_b):
+    """Bookmaker margin of a two-way market (0.0476 for -110/-110)."""
+    return american_to_implied(odds_a) + american_to_implied(odds_b) - 1
+
+
+def payout(odds):
+    """Profit on a 100 unit stake."""
+    odds = _arr(odds)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(odds > 0, odds, (100 / -odds) * 100)
+
+
+def expected_value(p_win, odds):
+    """Expected profit of a 100 unit bet, rounded to cents."""
+    p_win = _arr(p_win)
+    return _round2(p_win * payout(odds) - (1 - p_win) * 100)
+
+
+def kelly_fraction(odds, p_win, multiplier: float = 1.0):
+    """Unrounded Kelly fraction of bankroll (0-1), floored at 0. multiplier < 1 gives fractional Kelly."""
+    b, p = american_to_net(odds), _arr(p_win)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        f = (b * p - (1 - p)) / b
+    return np.maximum(f, 0) * multiplier
+
+
+def kelly_criterion(odds, p_win):
+    """Kelly bankroll percentage, same rounding as Kelly_Criterion.calculate_kelly_criterion."""
+    b, p = _round2(american_to_net(odds)), _arr(p_win)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct = _round2((100 * (b * p - (1 - p))) / b)
+    return np.where(pct > 0, pct, 0)
@@ -0,0 +1,256 @@
+"""
+Slate-level Kelly staking
+- Candidate bets are the positive-EV side of every game's ML and OU market
+- Fractions are solved jointly: maximise the expected log bankroll over the outcomes of the
+  whole slate, so simultaneous bets share one bankroll instead of each being sized alone
+- A game's ML and OU results are correlated (favourite wins <-> over) through a joint
+  four-cell outcome distribution; different games are independent
+- Constraints: per-bet cap, per-game exposure cap and total slate exposure (bankroll cap);
+  fractional Kelly scales the solution and the caps hold on the final fractions
+- Solver: primal-dual interior-point method on a scenario matrix (every joint outcome for small
+  slates, a seeded Sobol sample otherwise); ~20 (bets x bets) solves, milliseconds per slate
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.Utils import Odds
+from src.Utils.config_loader import load_config
+from src.Utils.db import DB_PATH
+
+SETTINGS = {
+    "kelly_fraction": 0.5,   # multiplier on the full-Kelly solution
+    "max_bet": 0.05,         # per bet, fraction of bankroll
+    "max_game": 0.08,        # ML + OU of one game
+    "max_total": 0.25,       # whole slate
+    "min_edge": 0.0,         # EV per unit staked a side needs to be a candidate
+    "correlation": "auto",   # corr(favourite wins, over); "auto" = estimated from features_all
+    "scenarios": 2048,       # sampled joint outcomes when the slate has more than this many
+    "seed": 0,
+    "bankroll": 1000.0,
+}
+
+# joint outcome cells of one game: (home wins, over hits)
+CELLS = np.array([[1, 1], [1, 0], [0, 1], [0, 0]], dtype=bool)
+
+_correlations = {}
+
+
+# ---------------------------------------------------------------- inputs
+
+def favorite_over_correlation(db_path: str = DB_PATH) -> float:
+    """corr(favourite wins, over hits) over features_all (pushes and pick'ems left out), cached per table version."""
+    from src.Utils.tools import load_store_column, load_training_data, store_dir_for, table_version
+    key = (db_path, table_version("features_all", db_path))
+    if key not in _correlations:
+        X, over = load_training_data("ou_cover", columns=["spread_line"], db_path=db_path)
+        spread = np.asarray(X, dtype=float)[:, 0]
+        home_win = np.asarray(load_store_column("home_win", "features_all", store_dir_for(db_path)))
+        keep = (over >= 0) & (spread != 0)
+        favorite_won = np.where(spread > 0, home_win, 1 - home_win)[keep]
+        rho = np.corrcoef(favorite_won, over[keep])[0, 1] if keep.sum() > 2 else 0.0
+        _correlations[key] = 0.0 if np.isnan(rho) else float(rho)
+    return _correlations[key]
+
+
+def joint_probabilities(ml_prob, ou_prob, rho) -> np.ndarray:
+    """(games, 4) probabilities of the CELLS for Bernoulli marginals with correlation rho per game."""
+    p, q, rho = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (ml_prob, ou_prob, rho)))
+    both = p * q + rho * np.sqrt(p * (1 - p) * q * (1 - q))
+    both = np.clip(both, np.maximum(0, p + q - 1), np.minimum(p, q))   # Frechet bounds
+    return np.column_stack([both, p - both, q - both, 1 - p - q + both])
+
+
+def candidate_bets(games: pd.DataFrame, ml_prob, ou_prob, ou_odds: float = -110, min_edge: float = 0.0) -> pd.DataFrame:
+    """The better side of each market when its EV per unit beats min_edge; one row per bet."""
+    ml, ou = np.asarray(ml_prob, dtype=float), np.asarray(ou_prob, dtype=float)
+    n = len(games)
+    columns = {key: [] for key in ("game", "market", "side", "odds", "prob", "net", "ev", "column", "wins_on")}
+    for column, market, (side_a, side_b), p_a, odds_a, odds_b in (
+            (0, "ml", ("home", "away"), ml,
+             games["home_moneyline"].to_numpy(float), games["away_moneyline"].to_numpy(float)),
+            (1, "ou", ("over", "under"), ou, np.full(n, float(ou_odds)), np.full(n, float(ou_odds)))):
+        net_a, net_b = Odds.american_to_net(odds_a), Odds.american_to_net(odds_b)
+        ev_a, ev_b = p_a * net_a - (1 - p_a), (1 - p_a) * net_b - p_a
+        take_a = ev_a >= ev_b   # two-way market: at most one side is worth a bet
+        ev = np.where(take_a, ev_a, ev_b)
+        keep = np.isfinite(ev) & (ev > min_edge)
+        for key, value in (("game", np.arange(n)), ("market", np.full(n, market)),
+                           ("side", np.where(take_a, side_a, side_b)), ("odds", np.where(take_a, odds_a, odds_b)),
+                           ("prob", np.where(take_a, p_a, 1 - p_a)), ("net", np.where(take_a, net_a, net_b)),
+                           ("ev", ev), ("column", np.full(n, column)), ("wins_on", take_a)):
+            columns[key].append(value[keep])
+    bets = pd.DataFrame({key: np.concatenate(values) for key, values in columns.items()})
+    return bets.sort_values(["game", "market"], kind="stable").reset_index(drop=True)
+
+
+def scenario_returns(bets: pd.DataFrame, joint: np.ndarray, max_scenarios: int = 2048, seed: int = 0):
+    """
+    (R, weights, exact): per-unit return of every bet in every joint outcome of the slate.
+    Enumerates every outcome when there are at most max_scenarios of them, else samples that many
+    (a power of two keeps the Sobol sample balanced).
+    """
+    games, column = bets["game"].to_numpy(), bets["column"].to_numpy()
+    wins_on, net = bets["wins_on"].to_numpy(), bets["net"].to_numpy()
+    active, position = np.unique(games, return_inverse=True)
+    joint = joint[active]
+
+    # a game with one bet only has two outcomes, each stood for by one cell holding its probability
+    markets = np.zeros((len(active), 2), dtype=bool)
+    markets[position, column] = True
+    both, zero = markets.all(axis=1), np.zeros(len(active))
+    cell_prob = np.where(both[:, None], joint, np.where(
+        markets[:, [0]],
+        np.column_stack([joint[:, 0] + joint[:, 1], zero, joint[:, 2] + joint[:, 3], zero]),   # ML: home / away
+        np.column_stack([joint[:, 0] + joint[:, 2], joint[:, 1] + joint[:, 3], zero, zero])))   # OU: over / under
+    options = [np.arange(4) if b else np.array([0, 2]) if ml else np.array([0, 1])
+               for b, ml in zip(both, markets[:, 0])]
+    sizes = [len(o) for o in options]
+
+    exact = float(np.prod(sizes, dtype=float)) <= max_scenarios
+    if exact:
+        draws = np.indices(sizes).reshape(len(sizes), -1).T
+        cells = np.column_stack([o[draws[:, j]] for j, o in enumerate(options)])
+        weights = cell_prob[np.arange(len(active)), cells].prod(axis=1)
+    else:
+        from scipy.stats import qmc
+        # scrambled Sobol points: ~10x less error in the solved fractions than plain random draws
+        u = qmc.Sobol(len(active), scramble=True, seed=seed).random(max_scenarios)
+        cells = (u[:, :, None] > np.cumsum(joint, axis=1)[None, :, :3]).sum(axis=2)
+        weights = np.full(max_scenarios, 1.0 / max_scenarios)
+    won = CELLS[cells[:, position], column] == wins_on
+    return np.where(won, net, -1.0), weights, exact
+
+
+# ---------------------------------------------------------------- solver
+
+def _constraints(game_of, caps: dict, scale: float):
+    """A f <= b for f >= 0, per-bet, per-game and total caps (caps divided by the Kelly multiplier)."""
+    n = len(game_of)
+    games = np.unique(game_of)
+    A = np.vstack([-np.eye(n), np.eye(n), (game_of[None, :] == games[:, None]).astype(float), np.ones((1, n))])
+    b = np.r_[np.zeros(n), np.full(n, caps["max_bet"]), np.full(len(games), caps["max_game"]), caps["max_total"]]
+    b[n:] /= scale
+    return A, b
+
+
+def solve_kelly(R, weights, A, b, tol: float = 1e-9, max_iter: int = 100, mu: float = 10.0) -> np.ndarray:
+    """
+    argmax_f  sum_s weights_s * log(1 + R_s f)  subject to  A f <= b, by a primal-dual interior-point
+    method (Boyd & Vandenberghe 11.7). Needs a polytope holding small positive f (the caps above do).
+    """
+    n, m = R.shape[1], len(b)
+    Rt, root_w = np.ascontiguousarray(R.T), np.sqrt(weights)
+    f = np.full(n, 0.5 * min(b[n:].min() / n, 1.0 / n))   # strictly inside: below every cap and 1 / n
+    slack = b - A @ f
+    lam = 1e-3 / slack
+
+    def residual(x, lam, slack, t):
+        r_dual = A.T @ lam - Rt @ (weights / (1 + R @ x))
+        return np.sqrt(r_dual @ r_dual + ((lam * slack - 1 / t) ** 2).sum())
+
+    for _ in range(max_iter):
+        wealth = 1 + R @ f
+        grad = -(Rt @ (weights / wealth))   # of the negated objective
+        gap = slack @ lam
+        r_dual = grad + A.T @ lam
+        if gap < tol and np.sqrt(r_dual @ r_dual) < tol:
+            break
+        t = mu * m / gap
+        X = Rt * (root_w / wealth)
+        hess = X @ X.T + (A.T * (lam / slack)) @ A
+        df = np.linalg.solve(hess, -grad - A.T @ (1 / (t * slack)))
+        Adf, Rdf = A @ df, R @ df
+        dlam = lam / slack * Adf - lam + 1 / (t * slack)
+
+        # longest step keeping lam >= 0, slack > 0 and wealth > 0, then backtrack on the residual
+        step = min(1.0, *(0.99 * np.min(x[d < 0] / -d[d < 0]) for x, d in
+                          ((lam, dlam), (slack, -Adf), (wealth, Rdf)) if (d < 0).any()))
+        current = residual(f, lam, slack, t)
+        while step > 1e-12:
+            f_next, lam_next = f + step * df, lam + step * dlam
+            slack_next = b - A @ f_next
+            if residual(f_next, lam_next, slack_next, t) <= (1 - 0.01 * step) * current:
+                break
+            step *= 0.5
+        f, lam, slack = f_next, lam_next, slack_next
+    return np.maximum(f, 0.0)
+
+
+# ---------------------------------------------------------------- driver
+
+def optimize_slate(games: pd.DataFrame, ml_prob, ou_prob, ou_odds: float = None, bankroll: float = None,
+                   db_path: str = DB_PATH, **overrides) -> pd.DataFrame:
+    """
+    Simultaneous Kelly fractions for every candidate bet on a slate.
+    games needs home_moneyline / away_moneyline (plus any key columns to carry through);
+    ml_prob / ou_prob are the batch home-win / over probabilities. Settings come from
+    [portfolio] in config.toml. Returns one row per candidate bet (fraction 0 = don't bet),
+    with the run's totals in result.attrs["summary"].
+    """
+    config = load_config()
+    settings = {**SETTINGS, **config.get("portfolio", {}), **overrides}
+    ou_odds = config.get("betting", {}).get("ou_odds", -110) if ou_odds is None else ou_odds
+    bankroll = settings["bankroll"] if bankroll is None else bankroll
+    started = time.perf_counter()
+
+    rho = settings["correlation"]
+    if rho == "auto":
+        try:
+            rho = favorite_over_correlation(db_path)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[Portfolio] No favourite/over correlation from features_all ({e}), assuming 0")
+            rho = 0.0
+    games = games.reset_index(drop=True)
+    favorite = np.where(games["home_moneyline"].to_numpy(float) < games["away_moneyline"].to_numpy(float), 1.0, -1.0)
+    joint = joint_probabilities(ml_prob, ou_prob, favorite * float(rho))   # corr(home wins, over)
+
+    bets = candidate_bets(games, ml_prob, ou_prob, ou_odds, settings["min_edge"])
+    exact, scenarios = True, 0
+    bets["kelly"] = np.minimum(Odds.kelly_fraction(bets["odds"], bets["prob"], settings["kelly_fraction"]),
+                               settings["max_bet"])
+    bets["fraction"] = 0.0
+    if len(bets):
+        R, weights, exact = scenario_returns(bets, joint, settings["scenarios"], settings["seed"])
+        scenarios = len(weights)
+        A, b = _constraints(bets["game"].to_numpy(), settings, settings["kelly_fraction"])
+        full = solve_kelly(R, weights, A, b)
+        bets["fraction"] = np.floor(full * settings["kelly_fraction"] * 1e6 + 1e-3) / 1e6   # caps hold after rounding
+        growth = float(weights @ np.log1p(R @ bets["fraction"].to_numpy()))
+    else:
+        growth = 0.0
+
+    keys = [c for c in ("gameday", "home_team", "away_team") if c in games.columns]
+    bets = pd.concat([games.loc[bets["game"], keys].reset_index(drop=True), bets], axis=1)
+    bets["stake"] = np.floor(bets["fraction"] * bankroll * 100 + 1e-6) / 100
+    bets = bets.drop(columns=["column", "wins_on", "net"])
+    bets.attrs["summary"] = {
+        "games": len(games),
+        "candidates": len(bets),
+        "bets": int((bets["fraction"] > 0).sum()),
+        "total_fraction": round(float(bets["fraction"].sum()), 6),
+        "total_stake": round(float(bets["stake"].sum()), 2),
+        "independent_fraction": round(float(bets["kelly"].sum()), 6),
+        "expected_log_growth": round(growth, 8),
+        "expected_profit": round(float((bets["fraction"] * bets["ev"]).sum() * bankroll), 2),
+        "correlation": round(float(rho), 4),
+        "scenarios": scenarios,
+        "exact": exact,
+        "bankroll": bankroll,
+        "solve_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+    return bets
+
+
+def print_portfolio(bets: pd.DataFrame):
+    summary = bets.attrs.get("summary", {})
+    placed = bets[bets["fraction"] > 0]
+    for bet in placed.itertuples():
+        print(f"{bet.away_team} @ {bet.home_team}  {bet.market.upper():<2} {bet.side:<5} {bet.odds:+.0f}  "
+              f"p={bet.prob:.3f}  EV={bet.ev:+.3f}  stake {bet.fraction:.2%} = {bet.stake:.2f}  "
+              f"(alone: {bet.kelly:.2%})")
+    print(f"Total stake {summary.get('total_fraction', 0):.2%} of {summary.get('bankroll', 0):.0f} "
+          f"across {len(placed)} bet(s); sized alone they would take {summary.get('independent_fraction', 0):.2%}")
+    print("-" * 55)
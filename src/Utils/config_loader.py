@@ -1,6 +1,15 @@
+import os
 import tomllib
 
+_cache = {}
+
 def load_config(path: str = "config.toml") -> dict:
-    """Load repo config file."""
+    """Load repo config file. Parsed once per process and re-read only if the file changes."""
+    mtime = os.stat(path).st_mtime_ns
+    cached = _cache.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
     with open(path, "rb") as f:
-        return tomllib.load(f)
+        config = tomllib.load(f)
+    _cache[path] = (mtime, config)
+    return config
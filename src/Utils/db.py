@@ -0,0 +1,131 @@
+"""
+Shared SQLite connection manager
+- One thread-safe connection pool per database file (reset after fork)
+- WAL journaling, so readers (Flask) never block while a feature rebuild writes
+- Table names are validated identifiers; values always go through ? parameters
+- Lookup indexes on the feature tables
+"""
+
+import os
+import queue
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+DB_PATH = "Data/dataset.sqlite"
+POOL_SIZE = 8
+
+# Indexes created (IF NOT EXISTS) after every write of these tables
+INDEXES = {
+    "features_all": [("season", "week"), ("home_team", "away_team")],
+    "odds_snapshots": [("gameday", "home_team", "away_team", "ts")],
+    "prediction_log": [("model", "model_hash", "created_at")],   # game_id lookups use its UNIQUE index
+}
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def quote_identifier(name: str) -> str:
+    """Quote a table/column name for SQL. Anything but [A-Za-z0-9_] is rejected."""
+    if not _IDENTIFIER.match(name or ""):
+        raise ValueError(f"[db] Invalid SQL identifier: {name!r}")
+    return f'"{name}"'
+
+
+def _open(db_path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=30000")
+    return conn
+
+
+class ConnectionPool:
+    """Up to `size` connections to one DB file, each used by one thread at a time."""
+
+    def __init__(self, db_path: str, size: int = POOL_SIZE):
+        self.db_path = db_path
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                return _open(self.db_path)
+        return self._idle.get()
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; commits on success, rolls back on error."""
+        conn = self._acquire()
+        try:
+            yield conn
+            if conn.in_transaction:
+                conn.commit()
+        except BaseException:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        finally:
+            self._idle.put(conn)
+
+    def close_all(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        with self._lock:
+            self._created = 0
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path: str = DB_PATH) -> ConnectionPool:
+    key = os.path.abspath(db_path)
+    with _pools_lock:
+        pool = _pools.get(key)
+        # sqlite connections must not cross a fork
+        if pool is None or pool._pid != os.getpid():
+            pool = _pools[key] = ConnectionPool(db_path)
+        return pool
+
+
+@contextmanager
+def connect(db_path: str = DB_PATH):
+    """Pooled connection to db_path: `with connect(path) as conn: ...`"""
+    with get_pool(db_path).connection() as conn:
+        yield conn
+
+
+def table_exists(conn: sqlite3.Connection, table: str) -> bool:
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+    ).fetchone() is not None
+
+
+def ensure_indexes(conn: sqlite3.Connection, table: str):
+    """Create the configured lookup indexes for a table (no-op for tables without any)."""
+    for columns in INDEXES.get(table, []):
+        name = quote_identifier(f"idx_{table}_{'_'.join(columns)}")
+        cols = ", ".join(quote_identifier(c) for c in columns)
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {quote_identifier(table)} ({cols})")
+
+
+def close_all():
+    """Close every pooled connection (tests, shutdown)."""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close_all()
+        _pools.clear()
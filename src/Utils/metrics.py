@@ -0,0 +1,164 @@
+"""
+Lightweight instrumentation: timing spans and counters
+- span("load_table", table="features_all") times a block; incr("rows_loaded", n) counts
+- Off by default: every call is one flag check (span() hands back a shared no-op context)
+- On: per (name, labels) count / total / max seconds, guarded by one lock
+- Exported as Prometheus text (Flask /metrics) or a JSON summary (main.py --metrics)
+Enabled by [metrics] enabled = true, NFL_METRICS=1, enable(), or the Flask app ([metrics] flask).
+"""
+
+import json
+import os
+import threading
+import time
+
+_enabled = os.environ.get("NFL_METRICS", "") not in ("", "0")
+_lock = threading.Lock()
+_spans = {}      # (name, labels) -> [count, total seconds, max seconds]
+_counters = {}   # (name, labels) -> value
+_started = time.time()
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ("key", "start")
+
+    def __init__(self, key):
+        self.key = key
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        _record(self.key, time.perf_counter() - self.start)
+        return False
+
+
+def _key(name, labels):
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _record(key, seconds):
+    with _lock:
+        entry = _spans.get(key)
+        if entry is None:
+            _spans[key] = [1, seconds, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+            if seconds > entry[2]:
+                entry[2] = seconds
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def span(name: str, **labels):
+    """Time a block: `with metrics.span("predict", family="xgb"): ...`"""
+    if not _enabled:
+        return _NOOP
+    return _Span(_key(name, labels))
+
+
+def observe(name: str, seconds: float, **labels):
+    """Record an already-measured duration as a span."""
+    if _enabled:
+        _record(_key(name, labels), seconds)
+
+
+def incr(name: str, value: float = 1, **labels):
+    if not _enabled:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def reset():
+    global _started
+    with _lock:
+        _spans.clear()
+        _counters.clear()
+        _started = time.time()
+
+
+def _labels(labels, extra=()) -> str:
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    escape = lambda v: v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{escape(v)}"' for k, v in pairs) + "}"
+
+
+def prometheus_text(prefix: str = "nfl") -> str:
+    """Prometheus exposition format: spans as one summary + max gauge, counters as *_total."""
+    with _lock:
+        spans = sorted(_spans.items())
+        counters = sorted(_counters.items())
+    lines = [f"# HELP {prefix}_span_seconds Time spent in instrumented spans",
+             f"# TYPE {prefix}_span_seconds summary"]
+    for (name, labels), (count, total, _) in spans:
+        tags = _labels(labels, [("span", name)])
+        lines.append(f"{prefix}_span_seconds_count{tags} {count}")
+        lines.append(f"{prefix}_span_seconds_sum{tags} {total:.6f}")
+    lines.append(f"# TYPE {prefix}_span_seconds_max gauge")
+    for (name, labels), (_, _, longest) in spans:
+        lines.append(f"{prefix}_span_seconds_max{_labels(labels, [('span', name)])} {longest:.6f}")
+    for name in dict.fromkeys(name for (name, _), _ in counters):
+        lines.append(f"# TYPE {prefix}_{name}_total counter")
+        lines += [f"{prefix}_{name}_total{_labels(labels)} {value:g}"
+                  for (n, labels), value in counters if n == name]
+    lines.append(f"# TYPE {prefix}_uptime_seconds gauge")
+    lines.append(f"{prefix}_uptime_seconds {time.time() - _started:.3f}")
+    return "\n".join(lines) + "\n"
+
+
+def summary() -> dict:
+    """JSON-ready run summary, spans sorted by total time."""
+    with _lock:
+        spans = list(_spans.items())
+        counters = list(_counters.items())
+    return {
+        "wall_seconds": round(time.time() - _started, 4),
+        "spans": [
+            {"name": name, "labels": dict(labels), "count": count, "total_ms": round(total * 1000, 3),
+             "mean_ms": round(total / count * 1000, 3), "max_ms": round(longest * 1000, 3)}
+            for (name, labels), (count, total, longest) in sorted(spans, key=lambda s: -s[1][1])
+        ],
+        "counters": [{"name": name, "labels": dict(labels), "value": value}
+                     for (name, labels), value in sorted(counters)],
+    }
+
+
+def write_summary(path: str = "-", **extra):
+    """Write summary() (plus extra fields) as JSON to a file, or stdout for "-"."""
+    text = json.dumps({**extra, **summary()}, indent=2)
+    if path == "-":
+        print(text)
+        return
+    with open(path, "w") as f:
+        f.write(text + "\n")
@@ -0,0 +1,126 @@
+"""
+Persisted column-wise feature scaling for the NN models
+- Statistics (count / mean / M2 / min / max per column, NaN-aware) are accumulated in one
+  streaming pass over the memory-mapped feature store, chunk by chunk (Chan et al. merge)
+- standard: (x - mean) / std, minmax: (x - min) / (max - min); missing values land on 0 (the mean / min)
+- Saved next to each model (<model>.scaler.npz) and applied as plain NumPy by the trainers,
+  the batch engine and the compiled artifacts, so train and inference transforms are identical
+"""
+
+import io
+import json
+import os
+
+import numpy as np
+
+from src.Utils.db import DB_PATH
+
+SUFFIX = ".scaler.npz"
+METHODS = ("standard", "minmax")
+
+
+def scaler_path(model_path: str) -> str:
+    """Models/NN_Models/Trained-Model-NFL-ML.h5 -> Models/NN_Models/Trained-Model-NFL-ML.scaler.npz"""
+    return os.path.splitext(model_path.rstrip("/\\"))[0] + SUFFIX
+
+
+class RunningStats:
+    """Per-column count / mean / M2 / min / max, merged chunk by chunk."""
+
+    def __init__(self, n_columns: int):
+        self.count = np.zeros(n_columns)
+        self.mean = np.zeros(n_columns)
+        self.m2 = np.zeros(n_columns)
+        self.min = np.full(n_columns, np.inf)
+        self.max = np.full(n_columns, -np.inf)
+
+    def update(self, chunk):
+        chunk = np.asarray(chunk, dtype=float)
+        valid = ~np.isnan(chunk)
+        n = valid.sum(axis=0)
+        seen = n > 0
+        if not seen.any():
+            return self
+        filled = np.where(valid, chunk, 0.0)
+        mean = np.divide(filled.sum(axis=0), n, out=np.zeros_like(self.mean), where=seen)
+        m2 = np.where(valid, (chunk - mean) ** 2, 0.0).sum(axis=0)
+
+        total = self.count + n
+        delta = mean - self.mean
+        weight = np.divide(n, total, out=np.zeros_like(self.mean), where=total > 0)
+        self.m2 += m2 + delta ** 2 * self.count * weight
+        self.mean += delta * weight
+        self.count = total
+        self.min = np.fmin(self.min, np.where(valid, chunk, np.inf).min(axis=0))
+        self.max = np.fmax(self.max, np.where(valid, chunk, -np.inf).max(axis=0))
+        return self
+
+
+class Scaler:
+    """offset / scale per column: transform(X) = (X - offset) / scale, NaN -> 0."""
+
+    def __init__(self, method: str, offset, scale, columns=None, n_rows: int = 0):
+        if method not in METHODS:
+            raise ValueError(f"[scaling] Unknown method {method}, expected one of {METHODS}")
+        self.method, self.columns, self.n_rows = method, list(columns or []), int(n_rows)
+        self.offset = np.asarray(offset, dtype=float)
+        self.scale = np.asarray(scale, dtype=float)
+
+    @classmethod
+    def from_stats(cls, stats: RunningStats, method: str = "standard", columns=None) -> "Scaler":
+        seen = stats.count > 0
+        if method == "standard":
+            offset = np.where(seen, stats.mean, 0.0)
+            std = np.sqrt(np.divide(stats.m2, stats.count, out=np.zeros_like(stats.m2), where=seen))
+            scale = std
+        else:
+            offset = np.where(seen, stats.min, 0.0)
+            scale = np.where(seen, stats.max - stats.min, 1.0)
+        scale = np.where(scale > 0, scale, 1.0)   # constant / empty columns pass through centred
+        return cls(method, offset, scale, columns, int(stats.count.max(initial=0)))
+
+    def transform(self, X) -> np.ndarray:
+        X = np.asarray(X, dtype=float)
+        if X.shape[-1] != len(self.offset):
+            raise ValueError(f"[scaling] Expected {len(self.offset)} columns, got {X.shape[-1]}")
+        out = (X - self.offset) / self.scale
+        return np.nan_to_num(out, copy=False, nan=0.0)
+
+    def save(self, path: str):
+        from src.Utils.train_harness import save_atomic
+        buffer = io.BytesIO()
+        meta = {"method": self.method, "columns": self.columns, "n_rows": self.n_rows}
+        np.savez(buffer, __meta__=np.array(json.dumps(meta)), offset=self.offset, scale=self.scale)
+        save_atomic(buffer.getvalue(), path)
+        print(f"[scaling] Saved {self.method} scaler ({len(self.offset)} columns, {self.n_rows} rows) to {path}")
+
+
+def load_scaler(path: str) -> Scaler:
+    with np.load(path, allow_pickle=False) as npz:
+        meta = json.loads(str(npz["__meta__"]))
+        return Scaler(meta["method"], npz["offset"], npz["scale"], meta["columns"], meta["n_rows"])
+
+
+def fit_scaler(X, method: str = "standard", columns=None, chunk_rows: int = 65_536, index=None) -> Scaler:
+    """Fit on an array (or memmap) in row chunks; one pass, bounded memory. index projects columns per chunk."""
+    stats = RunningStats(np.shape(X)[1] if index is None else len(index))
+    for start in range(0, len(X), chunk_rows):
+        chunk = X[start:start + chunk_rows]
+        stats.update(chunk if index is None else chunk[:, index])
+    return Scaler.from_stats(stats, method, columns)
+
+
+def fit_feature_store(table: str = "features_all", columns=None, db_path: str = DB_PATH,
+                      method: str = None, chunk_rows: int = None) -> Scaler:
+    """
+    Scaler over the columnar mirror of a feature table (refreshed from SQLite first if stale),
+    for the same columns load_training_data serves. Defaults come from [scaling] in config.toml.
+    """
+    from src.Utils.config_loader import load_config
+    from src.Utils.tools import load_feature_matrix, load_training_data, store_dir_for
+    settings = load_config().get("scaling", {})
+    load_training_data("home_win", table, columns=["season"], db_path=db_path)   # refreshes the store if stale
+    X, names = load_feature_matrix(table, None, store_dir_for(db_path))   # memmap, read chunk by chunk
+    index = None if columns is None else [names.index(c) for c in columns]
+    return fit_scaler(X, method or settings.get("method", "standard"), names if columns is None else list(columns),
+                      chunk_rows or settings.get("chunk_rows", 65_536), index)
@@ -0,0 +1,188 @@
+"""
+Ensemble training (stacking) for src/Predict/Ensemble.py
+- Out-of-fold probabilities from every base family (XGBoost, NN, logistic), with folds
+  grouped by season so no fold model ever sees games from the season it predicts
+- Meta-model per market: logistic regression on the base logits ("stacking") or
+  non-negative weights that minimise log loss ("average")
+- Calibrator (Platt or isotonic) fitted on out-of-fold meta predictions
+- Everything is written as one .npz artifact (config [models] ensemble)
+"""
+
+import os
+from datetime import datetime
+
+import numpy as np
+
+from src.Predict.Batch_Predictor import FAMILIES
+from src.Predict.Ensemble import MARKETS, Ensemble, logit
+from src.Utils.config_loader import load_config
+from src.Utils.db import DB_PATH
+from src.Utils.scaling import fit_scaler
+from src.Utils.tools import load_feature_matrix, load_training_data, store_dir_for
+from src.Utils.train_harness import OBJECTIVES
+from src.Utils.tuning import XGB_DEFAULTS, build_nn, nn_params, xgb_params
+
+LABELS = {"ml": "home_win", "ou": "ou_cover"}
+
+SETTINGS = {"folds": 5, "method": "stacking", "calibration": "isotonic", "families": list(FAMILIES), "seed": 42}
+
+
+def season_folds(seasons, k: int) -> np.ndarray:
+    """Fold id per row: whole seasons are dealt round-robin into k folds."""
+    unique = np.unique(seasons)
+    fold_of = {season: i % min(k, len(unique)) for i, season in enumerate(unique)}
+    return np.array([fold_of[s] for s in seasons])
+
+
+# ---------------------------------------------------------------- base families
+
+def _fit_predict(family: str, key: str, X_train, y_train, X_test, config: dict, seed: int) -> np.ndarray:
+    """Train one family the way its trainer does and return P(class 1) on X_test."""
+    if family == "xgb":
+        import xgboost as xgb
+        params, rounds = xgb_params(config, key, {"max_depth": XGB_DEFAULTS["max_depth"],
+                                                  "eta": XGB_DEFAULTS["eta"], **OBJECTIVES["binary"]})
+        booster = xgb.train({**params, "seed": seed}, xgb.DMatrix(X_train, label=y_train), num_boost_round=rounds)
+        return booster.predict(xgb.DMatrix(X_test))
+    if family == "log":
+        from sklearn.linear_model import LogisticRegression
+        return LogisticRegression(max_iter=1000).fit(X_train, y_train).predict_proba(X_test)[:, 1]
+    if family == "nn":
+        import tensorflow as tf
+        tf.keras.utils.set_random_seed(seed)
+        params = nn_params(config, key)
+        scaler = fit_scaler(X_train)
+        model = build_nn(params, binary=True)
+        model.fit(scaler.transform(X_train), y_train, epochs=params["epochs"], batch_size=params["batch_size"],
+                  validation_split=0.1, verbose=0,
+                  callbacks=[tf.keras.callbacks.EarlyStopping(patience=10, restore_best_weights=True)])
+        return model.predict(scaler.transform(X_test), batch_size=max(len(X_test), 1), verbose=0)[:, 0]
+    raise ValueError(f"[stacking] Unknown family {family}")
+
+
+def out_of_fold(X, y, folds, families, market: str, config: dict, seed: int = 42):
+    """
+    (rows, families) matrix of out-of-fold probabilities and the families that could be trained
+    (a family whose framework is not installed is dropped with a message).
+    """
+    columns, trained = [], []
+    for family in families:
+        key = f"{family}_{market}"
+        oof = np.empty(len(y))
+        try:
+            for fold in np.unique(folds):
+                test = folds == fold
+                oof[test] = _fit_predict(family, key, X[~test], y[~test], X[test], config, seed + int(fold))
+        except ImportError as e:
+            print(f"[stacking] Skipping {family}: {e}")
+            continue
+        columns.append(oof)
+        trained.append(family)
+    if not trained:
+        raise RuntimeError("[stacking] No base family could be trained")
+    return np.column_stack(columns), trained
+
+
+# ---------------------------------------------------------------- meta-model + calibration
+
+def fit_meta(P, y, method: str) -> dict:
+    """{"method", "weights", "intercept"} combining the columns of P."""
+    if method == "stacking":
+        from sklearn.linear_model import LogisticRegression
+        meta = LogisticRegression(C=1.0).fit(logit(P), y)
+        return {"method": method, "weights": meta.coef_[0].tolist(), "intercept": float(meta.intercept_[0])}
+    if method == "average":
+        from scipy.optimize import minimize
+        P = np.clip(P, 1e-6, 1 - 1e-6)
+
+        def loss(w):
+            w = np.exp(w) / np.exp(w).sum()
+            p = P @ w
+            return -np.mean(y * np.log(p) + (1 - y) * np.log(1 - p))
+
+        w = minimize(loss, np.zeros(P.shape[1]), method="L-BFGS-B").x
+        return {"method": method, "weights": (np.exp(w) / np.exp(w).sum()).tolist(), "intercept": 0.0}
+    raise ValueError(f"[stacking] Unknown method {method}")
+
+
+def fit_calibration(p, y, calibration: str):
+    """(spec fields, arrays) for a calibrator mapping meta probabilities p to calibrated ones."""
+    if calibration == "platt":
+        from sklearn.linear_model import LogisticRegression
+        platt = LogisticRegression(C=1e6).fit(logit(p)[:, None], y)
+        return {"platt": [float(platt.coef_[0, 0]), float(platt.intercept_[0])]}, {}
+    if calibration == "isotonic":
+        from sklearn.isotonic import IsotonicRegression
+        iso = IsotonicRegression(out_of_bounds="clip", y_min=1e-3, y_max=1 - 1e-3).fit(p, y)
+        return {}, {"iso_x": np.asarray(iso.X_thresholds_, dtype=float),
+                    "iso_y": np.asarray(iso.y_thresholds_, dtype=float)}
+    if calibration == "none":
+        return {}, {}
+    raise ValueError(f"[stacking] Unknown calibration {calibration}")
+
+
+def scores(p, y) -> dict:
+    p = np.clip(p, 1e-6, 1 - 1e-6)
+    return {
+        "log_loss": round(float(-np.mean(y * np.log(p) + (1 - y) * np.log(1 - p))), 5),
+        "brier": round(float(np.mean((p - y) ** 2)), 5),
+        "accuracy": round(float(np.mean((p > 0.5) == y)), 4),
+    }
+
+
+def fit_market(P, y, folds, families, method: str, calibration: str):
+    """
+    Meta-model + calibrator for one market from its out-of-fold matrix.
+    The calibrator sees out-of-fold meta predictions (meta refit without each fold); the
+    final meta-model is fit on every row. Returns (market spec, arrays, report).
+    """
+    raw = np.empty(len(y))
+    for fold in np.unique(folds):
+        test = folds == fold
+        partial = Ensemble({"markets": {"m": {**fit_meta(P[~test], y[~test], method), "families": families,
+                                               "calibration": "none"}}})
+        raw[test] = partial.raw("m", P[test])
+
+    spec = {"families": families, "calibration": calibration, **fit_meta(P, y, method)}
+    fields, arrays = fit_calibration(raw, y, calibration)
+    spec.update(fields)
+    calibrated = Ensemble({"markets": {"m": spec}}, {f"m_{k}": v for k, v in arrays.items()}).calibrate("m", raw)
+
+    report = {family: scores(P[:, i], y) for i, family in enumerate(families)}
+    report["meta"] = scores(raw, y)
+    report["calibrated"] = scores(calibrated, y)
+    spec["oof"] = report
+    return spec, arrays, report
+
+
+# ---------------------------------------------------------------- driver
+
+def train_ensemble(db_path: str = DB_PATH, path: str = None, **overrides) -> Ensemble:
+    """Train every market from features_all and write the artifact to config [models] ensemble."""
+    config = load_config()
+    settings = {**SETTINGS, **config.get("ensemble", {}), **overrides}
+    path = path or config["models"]["ensemble"]
+
+    markets, arrays = {}, {}
+    for market in MARKETS:
+        X, y = load_training_data(LABELS[market], db_path=db_path)
+        seasons = np.asarray(load_feature_matrix("features_all", ["season"], store_dir_for(db_path))[0])[:, 0]
+        keep = np.asarray(y) >= 0   # pushes aren't a class
+        X, y, seasons = np.asarray(X, dtype=float)[keep], np.asarray(y).astype(int)[keep], seasons[keep]
+        folds = season_folds(seasons, settings["folds"])
+
+        print(f"[stacking] {market}: out-of-fold predictions over {len(np.unique(folds))} season folds")
+        P, families = out_of_fold(X, y, folds, settings["families"], market, config, settings["seed"])
+        spec, market_arrays, report = fit_market(P, y, folds, families, settings["method"], settings["calibration"])
+        markets[market] = spec
+        arrays.update({f"{market}_{k}": v for k, v in market_arrays.items()})
+        for name, s in report.items():
+            print(f"[stacking] {market} {name:<10} log loss {s['log_loss']:.4f}  brier {s['brier']:.4f}  "
+                  f"accuracy {s['accuracy']:.1%}")
+
+    ensemble = Ensemble({"markets": markets, "trained": datetime.now().isoformat(timespec="seconds"),
+                         "settings": settings}, arrays)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    ensemble.save(path)
+    print(f"[stacking] Saved ensemble to {path}")
+    return ensemble
@@ -0,0 +1,51 @@
+"""
+Import-time profiler for CLI / worker startup
+- enable() wraps builtins.__import__ and times every module's first import
+- report() lists modules by cumulative and self time (self = minus nested imports)
+Cheap enough to leave in place; it only runs when --profile-startup is passed.
+"""
+
+import builtins
+import sys
+import time
+
+_original_import = builtins.__import__
+_records = {}   # module -> [cumulative seconds, self seconds]
+_stack = []
+_started = None
+
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    if level or name in sys.modules:
+        return _original_import(name, globals, locals, fromlist, level)
+    start = time.perf_counter()
+    _stack.append(0.0)
+    try:
+        return _original_import(name, globals, locals, fromlist, level)
+    finally:
+        elapsed = time.perf_counter() - start
+        nested = _stack.pop()
+        if _stack:
+            _stack[-1] += elapsed
+        record = _records.setdefault(name, [0.0, 0.0])
+        record[0] += elapsed
+        record[1] += elapsed - nested
+
+
+def enable():
+    global _started
+    _started = time.perf_counter()
+    builtins.__import__ = _timed_import
+
+
+def disable():
+    builtins.__import__ = _original_import
+
+
+def report(top: int = 25) -> str:
+    total = time.perf_counter() - _started if _started else 0.0
+    rows = sorted(_records.items(), key=lambda item: item[1][0], reverse=True)[:top]
+    lines = [f"[startup] {total:.3f}s since profiling started, slowest imports:",
+             f"{'module':<40}{'cumulative':>12}{'self':>10}"]
+    lines += [f"{name:<40}{cum:>11.3f}s{own:>9.3f}s" for name, (cum, own) in rows]
+    return "\n".join(lines)
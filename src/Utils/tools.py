@@ -1,22 +1,256 @@
+import hashlib
+import json
+import os
+import shutil
 import sqlite3
+from datetime import datetime
+
+import numpy as np
 import pandas as pd
 
-DB_PATH = "Data/dataset.sqlite"
+from src.Utils import metrics
+from src.Utils.db import DB_PATH, connect, ensure_indexes, quote_identifier, table_exists
+
+PARTITIONS_TABLE = "feature_partitions"
+VERSIONS_TABLE = "table_versions"
+PARTITION_KEYS = ["season", "week"]
+
+# Columnar mirror of feature tables: one directory of .npy files per table
+FEATURE_STORE_DIR = "Data/feature_store"   # == store_dir_for(DB_PATH)
+LABEL_COLUMNS = ["home_win", "ou_cover"]
+KEY_COLUMNS = ["gameday", "home_team", "away_team"]
+NON_FEATURE_COLUMNS = LABEL_COLUMNS + KEY_COLUMNS
 
-def load_table(table: str, db_path: str = DB_PATH) -> pd.DataFrame:
-    """Generic loader for any table in the SQLite DB."""
-    conn = sqlite3.connect(db_path)
-    df = pd.read_sql_query(f"SELECT * FROM {table}", conn)
-    conn.close()
+def load_table(table: str, db_path: str = DB_PATH, where: dict = None, columns=None) -> pd.DataFrame:
+    """
+    Generic loader for any table in the SQLite DB.
+    where={"season": 2024, "week": 5} filters with bound parameters; columns projects.
+    """
+    cols = ", ".join(quote_identifier(c) for c in columns) if columns else "*"
+    sql = f"SELECT {cols} FROM {quote_identifier(table)}"
+    params = ()
+    if where:
+        sql += " WHERE " + " AND ".join(f"{quote_identifier(c)} = ?" for c in where)
+        params = tuple(where.values())
+    with metrics.span("load_table", table=table), connect(db_path) as conn:
+        df = pd.read_sql_query(sql, conn, params=params)
+    metrics.incr("rows_loaded", len(df), table=table)
     return df
 
 def save_table(df: pd.DataFrame, table: str, db_path: str = DB_PATH, mode: str = "replace"):
     """Generic saver to SQLite."""
-    conn = sqlite3.connect(db_path)
-    df.to_sql(table, conn, if_exists=mode, index=False)
-    conn.close()
+    quote_identifier(table)
+    with metrics.span("save_table", table=table), connect(db_path) as conn:
+        df.to_sql(table, conn, if_exists=mode, index=False)
+        ensure_indexes(conn, table)
+        _bump_version(conn, table)
     print(f"[tools] Saved {len(df)} rows to {db_path}:{table}")
 
+def update_rows(df: pd.DataFrame, table: str, columns, keys=KEY_COLUMNS, db_path: str = DB_PATH) -> int:
+    """UPDATE `columns` of existing rows matched on `keys`, in one executemany. Returns rows changed."""
+    assignments = ", ".join(f"{quote_identifier(c)} = ?" for c in columns)
+    match = " AND ".join(f"{quote_identifier(k)} = ?" for k in keys)
+    values = df[list(columns) + list(keys)].astype(object).where(df[list(columns) + list(keys)].notna(), None)
+    with connect(db_path) as conn:
+        cursor = conn.executemany(
+            f"UPDATE {quote_identifier(table)} SET {assignments} WHERE {match}", values.itertuples(index=False)
+        )
+        _bump_version(conn, table)
+    return cursor.rowcount
+
+def _bump_version(conn, table: str):
+    """Every write through these helpers bumps the table's version (used to detect stale mirrors/caches)."""
+    conn.execute(f"CREATE TABLE IF NOT EXISTS {VERSIONS_TABLE} "
+                 f"(table_name TEXT PRIMARY KEY, version INTEGER, updated_at TEXT)")
+    conn.execute(
+        f"INSERT INTO {VERSIONS_TABLE} VALUES (?, 1, ?) "
+        "ON CONFLICT(table_name) DO UPDATE SET version = version + 1, updated_at = excluded.updated_at",
+        (table, datetime.now().isoformat(timespec="seconds"))
+    )
+
+def table_version(table: str, db_path: str = DB_PATH) -> int:
+    """Current version of a table (0 if it was never written through save_table/upsert_partitions)."""
+    with connect(db_path) as conn:
+        try:
+            row = conn.execute(f"SELECT version FROM {VERSIONS_TABLE} WHERE table_name = ?", (table,)).fetchone()
+        except sqlite3.OperationalError:
+            row = None
+    return row[0] if row else 0
+
+def _ensure_partitions_table(conn):
+    conn.execute(
+        f"CREATE TABLE IF NOT EXISTS {PARTITIONS_TABLE} ("
+        "table_name TEXT, season INTEGER, week INTEGER, checksum TEXT, n_rows INTEGER, "
+        "complete INTEGER, updated_at TEXT, PRIMARY KEY (table_name, season, week))"
+    )
+
+def partition_checksums(df: pd.DataFrame) -> dict:
+    """
+    Checksum of every (season, week) partition of a frame.
+    Row hashes are sorted first, so row order doesn't matter.
+    """
+    row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    return {
+        (int(season), int(week)): hashlib.sha1(np.sort(row_hashes[idx]).tobytes()).hexdigest()
+        for (season, week), idx in df.groupby(PARTITION_KEYS).indices.items()
+    }
+
+def load_partitions(table: str, db_path: str = DB_PATH) -> pd.DataFrame:
+    """Materialized (season, week) partitions of a table with their checksums."""
+    with connect(db_path) as conn:
+        _ensure_partitions_table(conn)
+        return pd.read_sql_query(
+            f"SELECT season, week, checksum, n_rows, complete, updated_at FROM {PARTITIONS_TABLE} "
+            "WHERE table_name = ?", conn, params=(table,)
+        )
+
+def stale_seasons(seasons, table: str, current_season: int, db_path: str = DB_PATH) -> list:
+    """
+    Seasons that need fetching for an incremental build: the current season, plus any season
+    that has no materialized partitions yet or still has unfinished weeks.
+    """
+    parts = load_partitions(table, db_path)
+    finished = parts.groupby("season")["complete"].min()
+    finished = set(finished[finished == 1].index)
+    return [s for s in seasons if s == current_season or s not in finished]
+
+def upsert_partitions(df: pd.DataFrame, table: str, complete: dict = None,
+                      db_path: str = DB_PATH, replace: bool = False) -> int:
+    """
+    Write only the (season, week) partitions of df whose checksum changed.
+    Partitions of the refreshed seasons that no longer exist in df are removed.
+    complete maps (season, week) -> True when every game in it is final.
+    replace=True rewrites the whole table (full rebuild) and resets its partition index.
+    Returns the number of partitions written.
+    """
+    complete = complete or {}
+    checksums = partition_checksums(df)
+    now = datetime.now().isoformat(timespec="seconds")
+
+    name = quote_identifier(table)
+    with metrics.span("upsert_partitions", table=table), connect(db_path) as conn:
+        _ensure_partitions_table(conn)
+        if replace:
+            conn.execute(f"DELETE FROM {PARTITIONS_TABLE} WHERE table_name = ?", (table,))
+            stored = {}
+        else:
+            stored = {
+                (s, w): c for s, w, c in conn.execute(
+                    f"SELECT season, week, checksum FROM {PARTITIONS_TABLE} WHERE table_name = ?", (table,)
+                )
+            }
+        refreshed_seasons = {s for s, _ in checksums}
+        changed = [key for key, checksum in checksums.items() if stored.get(key) != checksum]
+        removed = [key for key in stored if key[0] in refreshed_seasons and key not in checksums]
+
+        if table_exists(conn, table) and not replace:
+            conn.executemany(f"DELETE FROM {name} WHERE season = ? AND week = ?", changed + removed)
+        conn.executemany(
+            f"DELETE FROM {PARTITIONS_TABLE} WHERE table_name = ? AND season = ? AND week = ?",
+            [(table, s, w) for s, w in removed]
+        )
+
+        keys = pd.MultiIndex.from_frame(df[PARTITION_KEYS].astype(int))
+        rows = df[keys.isin(changed)]
+        rows.to_sql(table, conn, if_exists="replace" if replace else "append", index=False)
+        ensure_indexes(conn, table)
+
+        n_rows = rows.groupby(PARTITION_KEYS).size()
+        conn.executemany(
+            f"INSERT OR REPLACE INTO {PARTITIONS_TABLE} VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(table, s, w, checksums[(s, w)], int(n_rows.get((s, w), 0)), int(bool(complete.get((s, w)))), now)
+             for s, w in changed]
+        )
+        if changed or removed or replace:
+            _bump_version(conn, table)
+    if changed or removed or replace:
+        write_feature_store(load_table(table, db_path), table, store_dir_for(db_path),
+                            version=table_version(table, db_path))
+    print(f"[tools] Upserted {len(changed)} partitions ({len(rows)} rows), "
+          f"removed {len(removed)}, unchanged {len(checksums) - len(changed)} in {db_path}:{table}")
+    return len(changed)
+
+def store_dir_for(db_path: str = DB_PATH) -> str:
+    """Feature store directory that mirrors a SQLite DB (Data/dataset.sqlite -> Data/feature_store)."""
+    return os.path.join(os.path.dirname(db_path) or ".", "feature_store")
+
+def write_feature_store(df: pd.DataFrame, table: str, store_dir: str = FEATURE_STORE_DIR, version: int = None):
+    """
+    Mirror a feature table as memory-mappable .npy files:
+      X.npy               float64 feature matrix, column-major so column projection reads only those columns
+      <label>.npy         label vectors (home_win, ou_cover) when present
+      <key>.npy           gameday / home_team / away_team (and any other text column) as fixed-width strings
+      meta.json           feature column order, row count, source table version
+    The directory is swapped in atomically.
+    """
+    target = os.path.join(store_dir, table)
+    tmp = f"{target}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    features = df.drop(columns=NON_FEATURE_COLUMNS, errors="ignore")
+    text = [c for c in features.columns if not pd.api.types.is_numeric_dtype(features[c])]
+    features = features.drop(columns=text)
+    np.save(os.path.join(tmp, "X.npy"), np.asfortranarray(features.to_numpy(dtype=np.float64)))
+    labels = [c for c in LABEL_COLUMNS if c in df.columns]
+    for col in labels:
+        np.save(os.path.join(tmp, f"{col}.npy"), df[col].to_numpy(dtype=np.int64))
+    keys = [c for c in KEY_COLUMNS if c in df.columns] + text
+    for col in keys:
+        np.save(os.path.join(tmp, f"{col}.npy"), df[col].astype(str).to_numpy(dtype=str))
+    with open(os.path.join(tmp, "meta.json"), "w") as f:
+        json.dump({"columns": list(features.columns), "labels": labels, "keys": keys,
+                   "n_rows": len(df), "version": version}, f)
+
+    old = f"{target}.old"
+    shutil.rmtree(old, ignore_errors=True)
+    if os.path.exists(target):
+        os.replace(target, old)
+    os.replace(tmp, target)
+    shutil.rmtree(old, ignore_errors=True)
+
+def load_store_meta(table: str, store_dir: str = FEATURE_STORE_DIR) -> dict:
+    path = os.path.join(store_dir, table, "meta.json")
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+def load_feature_matrix(table: str = "features_all", columns=None, store_dir: str = FEATURE_STORE_DIR,
+                        mmap: bool = True):
+    """
+    Numeric feature matrix from the columnar store -> (X, column names).
+    With mmap and no projection X is a zero-copy read-only view of the file;
+    columns=[...] reads only those columns.
+    """
+    meta = load_store_meta(table, store_dir)
+    if meta is None:
+        raise FileNotFoundError(f"[tools] No feature store for {table} in {store_dir}")
+    X = np.load(os.path.join(store_dir, table, "X.npy"), mmap_mode="r" if mmap else None)
+    if columns is None:
+        return X, meta["columns"]
+    idx = [meta["columns"].index(c) for c in columns]
+    return np.ascontiguousarray(X[:, idx]), list(columns)
+
+def load_store_column(name: str, table: str = "features_all", store_dir: str = FEATURE_STORE_DIR):
+    """A label or key vector (home_win, ou_cover, gameday, home_team, away_team) from the store."""
+    return np.load(os.path.join(store_dir, table, f"{name}.npy"), mmap_mode="r")
+
+def load_training_data(label: str, table: str = "features_all", columns=None, db_path: str = DB_PATH):
+    """
+    (X, y) for training. Served from the columnar store when it matches the SQLite table,
+    otherwise rebuilt from SQLite first.
+    """
+    store_dir = store_dir_for(db_path)
+    meta = load_store_meta(table, store_dir)
+    version = table_version(table, db_path)
+    if meta is None or meta["version"] != version:
+        print(f"[tools] Refreshing feature store for {table}")
+        write_feature_store(load_table(table, db_path), table, store_dir, version=version)
+    with metrics.span("load_feature_matrix", table=table):
+        X, _ = load_feature_matrix(table, columns, store_dir)
+    return X, np.asarray(load_store_column(label, table, store_dir))
+
 def print_game_predictions(games: pd.DataFrame, ml_probs=None, ou_probs=None):
     """
     Nicely print game predictions.
@@ -0,0 +1,130 @@
+"""
+Monte Carlo training harness for the XGBoost trainers
+- Fans random train/test splits out over a process pool
+- Every split is seeded (seed + i) so runs are reproducible
+- Each worker builds the full-data DMatrix once and slices it per split
+- Only the best booster is written, atomically, after all splits finish
+"""
+
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+from tqdm import tqdm
+
+# [training].objective -> xgboost objective params. "binary" trains one probability column per game,
+# "softmax" the legacy 2-class softprob layout (twice the trees, half thrown away at inference).
+OBJECTIVES = {
+    "binary": {"objective": "binary:logistic", "eval_metric": "logloss"},
+    "softmax": {"objective": "multi:softprob", "num_class": 2, "eval_metric": "mlogloss"},
+}
+
+# Per-worker state (set by _init_worker)
+_dfull = None
+_y = None
+_params = None
+_rounds = None
+_test_size = None
+_best_acc = -1.0
+
+
+def split_indices(n: int, test_size: float, seed: int):
+    """Seeded shuffle split -> (train_idx, test_idx)."""
+    perm = np.random.default_rng(seed).permutation(n)
+    n_test = max(1, int(round(n * test_size)))
+    return np.sort(perm[n_test:]), np.sort(perm[:n_test])
+
+
+def _init_worker(X, y, params, num_boost_round, test_size):
+    import xgboost as xgb
+    global _dfull, _y, _params, _rounds, _test_size, _best_acc
+    _dfull = xgb.DMatrix(X, label=y, nthread=params.get("nthread", -1))
+    _y, _params, _rounds, _test_size, _best_acc = y, params, num_boost_round, test_size, -1.0
+
+
+def _predict_labels(probs):
+    """multi:softprob -> argmax, binary:logistic -> threshold at 0.5."""
+    probs = np.asarray(probs)
+    return probs.argmax(axis=1) if probs.ndim == 2 else (probs > 0.5).astype(int)
+
+
+def _run_split(seed: int):
+    """Train one split. Returns (seed, accuracy, raw model or None if it can't be the best)."""
+    import xgboost as xgb
+    global _best_acc
+    train_idx, test_idx = split_indices(_dfull.num_row(), _test_size, seed)
+    model = xgb.train(_params, _dfull.slice(train_idx), num_boost_round=_rounds)
+
+    preds = _predict_labels(model.predict(_dfull.slice(test_idx)))
+    acc = round(float((preds == _y[test_idx]).mean()) * 100, 1)
+
+    # >= so the lowest seed among equally accurate splits always reaches the parent
+    raw = None
+    if acc >= _best_acc:
+        _best_acc = acc
+        raw = bytes(model.save_raw(raw_format="json"))
+    return seed, acc, raw
+
+
+def save_atomic(raw: bytes, path: str):
+    """Write to a temp file next to path, then rename over it."""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(raw)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def summarize(accuracies) -> dict:
+    acc = np.asarray(accuracies, dtype=float)
+    return {
+        "n": int(acc.size),
+        "mean": round(float(acc.mean()), 2),
+        "std": round(float(acc.std()), 2),
+        "min": float(acc.min()),
+        "p25": float(np.percentile(acc, 25)),
+        "median": float(np.median(acc)),
+        "p75": float(np.percentile(acc, 75)),
+        "max": float(acc.max()),
+    }
+
+
+def run_monte_carlo(X, y, params: dict, num_boost_round: int, model_path: str,
+                    iterations: int = 100, workers: int = 0, seed: int = 42,
+                    test_size: float = 0.1) -> dict:
+    """
+    Train `iterations` seeded splits in parallel and save the most accurate booster.
+    workers = 0 uses every core; each worker gets an equal share of xgboost threads.
+    """
+    y = np.asarray(y).astype(int)
+    keep = y >= 0   # pushes aren't a class
+    X, y = np.ascontiguousarray(np.asarray(X)[keep], dtype=np.float32), y[keep]
+    workers = workers or os.cpu_count() or 1
+    workers = min(workers, iterations)
+    params = {**params, "nthread": max(1, (os.cpu_count() or 1) // workers)}
+
+    best_seed, best_acc, best_raw = None, -1.0, None
+    accuracies = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(X, y, params, num_boost_round, test_size)) as pool:
+        futures = [pool.submit(_run_split, seed + i) for i in range(iterations)]
+        for future in tqdm(as_completed(futures), total=iterations):
+            split_seed, acc, raw = future.result()
+            accuracies.append(acc)
+            if raw is not None and (acc > best_acc or (acc == best_acc and split_seed < best_seed)):
+                best_seed, best_acc, best_raw = split_seed, acc, raw
+
+    save_atomic(best_raw, model_path)
+
+    report = {"best_seed": best_seed, "best_accuracy": best_acc, **summarize(accuracies)}
+    print(f"[train_harness] Accuracy over {report['n']} splits: "
+          f"mean {report['mean']}% ± {report['std']} (min {report['min']}, "
+          f"median {report['median']}, max {report['max']})")
+    print(f"[train_harness] Saved best model (seed {best_seed}, {best_acc}%) to {model_path}")
+    return report
@@ -0,0 +1,330 @@
+"""
+Hyperparameter search for the XGBoost and NN trainers
+- Random search over each family's space, trials fanned out over worker processes
+- Early stopping on a seeded validation fold (no fixed 750 rounds / 50 epochs)
+- Median pruning: at every report step a trial is stopped if it is worse than the
+  median of finished trials at the same step (shared through SQLite, so it works across workers)
+- Trials live in SQLite (tuning_trials / tuning_steps) so an interrupted study resumes
+- The winning config is exported to config.toml as [tuned.<study>], which the trainers read
+"""
+
+import json
+import math
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import numpy as np
+
+from src.Utils.config_loader import load_config
+from src.Utils.db import DB_PATH, connect
+from src.Utils.train_harness import OBJECTIVES, split_indices
+
+STUDIES = {
+    "xgb_ml": ("xgb", "home_win"),
+    "xgb_ou": ("xgb", "ou_cover"),
+    "nn_ml": ("nn", "home_win"),
+    "nn_ou": ("nn", "ou_cover"),
+}
+
+# Current hard-coded trainer settings, used when no [tuned.<study>] exists
+XGB_DEFAULTS = {"max_depth": 3, "eta": 0.01, "num_boost_round": 750}
+NN_DEFAULTS = {"layers": [512, 256, 128], "activation": "relu", "dropout": 0.0,
+               "learning_rate": 0.001, "batch_size": 32, "epochs": 50}
+
+SETTINGS = {
+    "trials": 50, "workers": 0, "seed": 7, "valid_size": 0.15, "max_rounds": 2000,
+    "early_stopping": 50, "report_every": 50, "min_trials": 5, "max_epochs": 100, "patience": 10,
+    "objective": "binary",
+}
+
+
+def _log_uniform(rng, low, high):
+    return float(math.exp(rng.uniform(math.log(low), math.log(high))))
+
+
+def sample_params(family: str, rng) -> dict:
+    """One random point of a family's search space."""
+    if family == "xgb":
+        return {
+            "max_depth": int(rng.integers(2, 8)),
+            "eta": _log_uniform(rng, 0.005, 0.3),
+            "subsample": float(rng.uniform(0.6, 1.0)),
+            "colsample_bytree": float(rng.uniform(0.6, 1.0)),
+            "min_child_weight": int(rng.integers(1, 11)),
+            "lambda": _log_uniform(rng, 0.1, 10.0),
+        }
+    if family == "nn":
+        layers = [[512, 256, 128], [256, 128], [128, 64], [256, 128, 64], [64, 32]]
+        return {
+            "layers": layers[int(rng.integers(len(layers)))],
+            "activation": str(rng.choice(["relu", "elu", "selu", "leaky_relu"])),
+            "dropout": float(rng.choice([0.0, 0.1, 0.2, 0.3, 0.5])),
+            "learning_rate": _log_uniform(rng, 1e-4, 1e-2),
+            "batch_size": int(rng.choice([32, 64, 128, 256])),
+        }
+    raise ValueError(f"Unknown family: {family}")
+
+
+# ---------------------------------------------------------------- SQLite trial history
+
+def _ensure_tables(conn):
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS tuning_trials (study TEXT, trial INTEGER, params TEXT, state TEXT, "
+        "value REAL, best_step INTEGER, started_at TEXT, finished_at TEXT, PRIMARY KEY (study, trial))"
+    )
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS tuning_steps (study TEXT, trial INTEGER, step INTEGER, value REAL, "
+        "PRIMARY KEY (study, trial, step))"
+    )
+
+
+def _start_trial(db_path, study, trial, params):
+    with connect(db_path) as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO tuning_trials VALUES (?, ?, ?, 'running', NULL, NULL, ?, NULL)",
+            (study, trial, json.dumps(params), datetime.now().isoformat(timespec="seconds"))
+        )
+        conn.execute("DELETE FROM tuning_steps WHERE study = ? AND trial = ?", (study, trial))
+
+
+def _finish_trial(db_path, study, trial, state, value, best_step):
+    with connect(db_path) as conn:
+        conn.execute(
+            "UPDATE tuning_trials SET state = ?, value = ?, best_step = ?, finished_at = ? "
+            "WHERE study = ? AND trial = ?",
+            (state, value, best_step, datetime.now().isoformat(timespec="seconds"), study, trial)
+        )
+
+
+def report_step(db_path, study, trial, step, value, min_trials) -> bool:
+    """Record an intermediate validation loss; True if the trial should be pruned."""
+    with connect(db_path) as conn:
+        conn.execute("INSERT OR REPLACE INTO tuning_steps VALUES (?, ?, ?, ?)", (study, trial, step, value))
+        others = [row[0] for row in conn.execute(
+            "SELECT s.value FROM tuning_steps s JOIN tuning_trials t ON s.study = t.study AND s.trial = t.trial "
+            "WHERE s.study = ? AND s.step = ? AND t.state = 'complete'", (study, step)
+        )]
+    return len(others) >= min_trials and value > float(np.median(others))
+
+
+def load_trials(study: str, db_path: str = DB_PATH):
+    import pandas as pd
+    with connect(db_path) as conn:
+        _ensure_tables(conn)
+        return pd.read_sql_query("SELECT * FROM tuning_trials WHERE study = ? ORDER BY trial", conn, params=(study,))
+
+
+def best_trial(study: str, db_path: str = DB_PATH) -> dict:
+    with connect(db_path) as conn:
+        _ensure_tables(conn)
+        row = conn.execute(
+            "SELECT trial, params, value, best_step FROM tuning_trials "
+            "WHERE study = ? AND state = 'complete' ORDER BY value LIMIT 1", (study,)
+        ).fetchone()
+    if row is None:
+        return None
+    return {"trial": row[0], "params": json.loads(row[1]), "value": row[2], "best_step": row[3]}
+
+
+# ---------------------------------------------------------------- model builders shared with the trainers
+
+def xgb_params(config: dict, study: str, base: dict):
+    """(params, num_boost_round) for a trainer: base params + [tuned.<study>] if present."""
+    tuned = dict(config.get("tuned", {}).get(study, {}))
+    rounds = tuned.pop("num_boost_round", XGB_DEFAULTS["num_boost_round"])
+    return {**base, **tuned}, int(rounds)
+
+
+def nn_params(config: dict, study: str) -> dict:
+    return {**NN_DEFAULTS, **config.get("tuned", {}).get(study, {})}
+
+
+def build_nn(params: dict, binary: bool = True):
+    """
+    Keras dense stack for a params dict (layers, activation, dropout, learning_rate).
+    binary=True ends in Dense(1, sigmoid) (one probability per game), False in the legacy Dense(2, softmax).
+    """
+    import tensorflow as tf
+    layers = []
+    for units in params["layers"]:
+        layers.append(tf.keras.layers.Dense(units, activation=params["activation"]))
+        if params.get("dropout"):
+            layers.append(tf.keras.layers.Dropout(params["dropout"]))
+    layers.append(tf.keras.layers.Dense(1, activation="sigmoid") if binary
+                  else tf.keras.layers.Dense(2, activation="softmax"))
+    model = tf.keras.Sequential(layers)
+    model.compile(optimizer=tf.keras.optimizers.Adam(params["learning_rate"]),
+                  loss="binary_crossentropy" if binary else "sparse_categorical_crossentropy",
+                  metrics=["accuracy"])
+    return model
+
+
+# ---------------------------------------------------------------- workers
+
+_state = {}
+
+
+def _init_worker(family, label, db_path, settings):
+    from src.Utils.tools import load_training_data
+    X, y = load_training_data(label, db_path=db_path)
+    X, y = np.asarray(X, dtype=float), np.asarray(y).astype(int)
+    keep = y >= 0   # pushes aren't a class
+    X, y = X[keep], y[keep]
+    train_idx, valid_idx = split_indices(len(y), settings["valid_size"], settings["seed"])
+    _state.update(family=family, db_path=db_path, settings=settings)
+    if family == "xgb":
+        import xgboost as xgb
+        threads = max(1, (os.cpu_count() or 1) // settings["workers"])
+        _state["dtrain"] = xgb.DMatrix(X[train_idx], label=y[train_idx], nthread=threads)
+        _state["dvalid"] = xgb.DMatrix(X[valid_idx], label=y[valid_idx], nthread=threads)
+        _state["nthread"] = threads
+    else:
+        from src.Utils.scaling import fit_feature_store
+        X = fit_feature_store(db_path=db_path).transform(X)   # same scaler the NN trainers save
+        _state["train"] = (X[train_idx], y[train_idx])
+        _state["valid"] = (X[valid_idx], y[valid_idx])
+
+
+def _train_xgb(study, trial, params, settings):
+    import xgboost as xgb
+    db_path = _state["db_path"]
+
+    class Pruning(xgb.callback.TrainingCallback):
+        pruned = False
+
+        def after_iteration(self, model, epoch, evals_log):
+            step = epoch + 1
+            if step % settings["report_every"]:
+                return False
+            value = next(iter(evals_log["valid"].values()))[-1]
+            Pruning.pruned = report_step(db_path, study, trial, step, value, settings["min_trials"])
+            return Pruning.pruned
+
+    full = {**params, **OBJECTIVES[settings["objective"]], "nthread": _state["nthread"]}
+    booster = xgb.train(full, _state["dtrain"], num_boost_round=settings["max_rounds"],
+                        evals=[(_state["dvalid"], "valid")], early_stopping_rounds=settings["early_stopping"],
+                        callbacks=[Pruning()], verbose_eval=False)
+    state = "pruned" if Pruning.pruned else "complete"
+    return state, float(booster.best_score), int(booster.best_iteration) + 1
+
+
+def _train_nn(study, trial, params, settings):
+    import tensorflow as tf
+    db_path = _state["db_path"]
+
+    class Pruning(tf.keras.callbacks.Callback):
+        pruned = False
+
+        def on_epoch_end(self, epoch, logs=None):
+            if report_step(db_path, study, trial, epoch + 1, float(logs["val_loss"]), settings["min_trials"]):
+                Pruning.pruned = True
+                self.model.stop_training = True
+
+    tf.keras.utils.set_random_seed(settings["seed"] + trial)
+    model = build_nn(params, binary=settings["objective"] == "binary")
+    history = model.fit(*_state["train"], validation_data=_state["valid"], epochs=settings["max_epochs"],
+                        batch_size=params["batch_size"], verbose=0,
+                        callbacks=[tf.keras.callbacks.EarlyStopping(patience=settings["patience"]), Pruning()])
+    losses = history.history["val_loss"]
+    best = int(np.argmin(losses))
+    return ("pruned" if Pruning.pruned else "complete"), float(losses[best]), best + 1
+
+
+def _run_trial(study, trial):
+    settings = _state["settings"]
+    params = sample_params(_state["family"], np.random.default_rng(settings["seed"] * 100_003 + trial))
+    _start_trial(_state["db_path"], study, trial, params)
+    try:
+        train = _train_xgb if _state["family"] == "xgb" else _train_nn
+        state, value, best_step = train(study, trial, params, settings)
+    except Exception as e:
+        _finish_trial(_state["db_path"], study, trial, "failed", None, None)
+        return trial, "failed", str(e)
+    _finish_trial(_state["db_path"], study, trial, state, value, best_step)
+    return trial, state, value
+
+
+# ---------------------------------------------------------------- study driver + export
+
+def run_study(study: str, trials: int = None, workers: int = None, db_path: str = DB_PATH, **overrides) -> dict:
+    """
+    Run (or resume) a study until it has `trials` finished trials; returns the best trial.
+    Settings come from [tuning] in config.toml, then keyword overrides.
+    """
+    family, label = STUDIES[study]
+    config = load_config()
+    settings = {**SETTINGS, "objective": config.get("training", {}).get("objective", "binary"),
+                **config.get("tuning", {}), **overrides}
+    if trials is not None:
+        settings["trials"] = trials
+    if workers is not None:
+        settings["workers"] = workers
+    settings["workers"] = settings["workers"] or os.cpu_count() or 1
+
+    with connect(db_path) as conn:
+        _ensure_tables(conn)
+        done = {row[0] for row in conn.execute(
+            "SELECT trial FROM tuning_trials WHERE study = ? AND state IN ('complete', 'pruned')", (study,)
+        )}
+    todo = [t for t in range(settings["trials"]) if t not in done]
+    print(f"[tuning] {study}: {len(done)} trials already finished, running {len(todo)}")
+
+    if todo:
+        with ProcessPoolExecutor(max_workers=min(settings["workers"], len(todo)), initializer=_init_worker,
+                                 initargs=(family, label, db_path, settings)) as pool:
+            futures = [pool.submit(_run_trial, study, t) for t in todo]
+            for future in as_completed(futures):
+                trial, state, value = future.result()
+                print(f"[tuning] {study} trial {trial}: {state} {value}")
+
+    best = best_trial(study, db_path)
+    if best:
+        print(f"[tuning] {study} best trial {best['trial']}: loss {best['value']:.5f} "
+              f"at step {best['best_step']} with {best['params']}")
+    return best
+
+
+def _toml_value(value) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, (list, tuple)):
+        return "[" + ", ".join(_toml_value(v) for v in value) + "]"
+    return json.dumps(str(value))
+
+
+def write_config_section(section: str, values: dict, path: str = "config.toml"):
+    """Replace (or append) a flat [section] table in config.toml, leaving the rest of the file untouched."""
+    with open(path) as f:
+        lines = f.read().splitlines()
+    header = f"[{section}]"
+    body = [header] + [f"{key} = {_toml_value(value)}" for key, value in values.items()]
+
+    if header in lines:
+        start = lines.index(header)
+        end = next((i for i in range(start + 1, len(lines)) if re.match(r"^\s*\[", lines[i])), len(lines))
+        while end > start + 1 and not lines[end - 1].strip():
+            end -= 1
+        lines[start:end] = body
+    else:
+        lines += [""] + body
+
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(tmp, path)
+
+
+def export_best(study: str, db_path: str = DB_PATH, path: str = "config.toml") -> dict:
+    """Write the best trial of a study to [tuned.<study>] (num_boost_round / epochs = best step)."""
+    best = best_trial(study, db_path)
+    if best is None:
+        raise ValueError(f"[tuning] No finished trials for {study}")
+    values = dict(best["params"])
+    values["num_boost_round" if STUDIES[study][0] == "xgb" else "epochs"] = best["best_step"]
+    write_config_section(f"tuned.{study}", values, path)
+    print(f"[tuning] Exported {study} trial {best['trial']} to {path} [tuned.{study}]")
+    return values
@@ -0,0 +1,237 @@
+"""
+Play-by-play team-game features in bounded memory
+- One season of play-by-play is fetched at a time (PBP_COLUMNS only, no participation data)
+  and cached as Parquet by DataCache; the cached file is then streamed back in row batches
+  sized from [pbp] memory_mb, so at most one batch of plays is in memory
+- Every batch is cast to compact dtypes (float32 stats, int8 flags, categorical team codes)
+  and reduced to per (game, team) sums and counts for offense and defense; partial sums from
+  different batches are added up and turned into rates once the season has been read
+- Each season's team-game rows are upserted into SQLite pbp_team_games, which refreshes the
+  columnar feature store, before the next season is touched
+
+Usage:
+    python -m src.features.pbp_features --seasons 2012 2024
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from src.DataProviders.DataCache import cached_file
+from src.Utils import metrics
+from src.Utils.config_loader import load_config
+from src.Utils.Dictionaries import team_coordinates
+from src.Utils.db import DB_PATH
+
+TABLE = "pbp_team_games"
+PBP_COLUMNS = [
+    "game_id", "season", "week", "game_date", "home_team", "away_team", "posteam", "defteam",
+    "play_type", "epa", "success", "yards_gained", "pass", "rush", "sack", "interception", "fumble_lost",
+]
+TEAM_CODES = pd.CategoricalDtype(sorted(team_coordinates))   # every nflverse code, relocations included
+FLAGS = ["pass", "rush", "sack", "interception", "fumble_lost", "success"]
+EXPLOSIVE_YARDS = 20
+
+# per (game, team) sums; a rate is <sum> / <count>
+SUMS = ["plays", "epa", "success", "pass_plays", "pass_epa", "rush_plays", "rush_epa", "explosive", "sacks",
+        "turnovers"]
+RATES = {   # output column -> (numerator, denominator)
+    "epa_per_play": ("epa", "plays"),
+    "success_rate": ("success", "plays"),
+    "pass_epa": ("pass_epa", "pass_plays"),
+    "rush_epa": ("rush_epa", "rush_plays"),
+    "pass_rate": ("pass_plays", "plays"),
+    "explosive_rate": ("explosive", "plays"),
+    "sack_rate": ("sacks", "pass_plays"),
+}
+SETTINGS = {"memory_mb": 256, "batch_rows": 0}
+
+
+def fetch_pbp(seasons) -> pd.DataFrame:
+    """nfl.import_pbp_data projected to PBP_COLUMNS, float32, without the participation join."""
+    import nfl_data_py as nfl
+    return nfl.import_pbp_data(list(seasons), columns=PBP_COLUMNS, include_participation=False, downcast=True)
+
+
+def compact(plays: pd.DataFrame) -> pd.DataFrame:
+    """Cast a batch to the dtypes the aggregation works in (roughly a third of nflverse's footprint)."""
+    out = pd.DataFrame({
+        "game_id": plays["game_id"].astype("category"),
+        "season": plays["season"].astype(np.int16),
+        "week": plays["week"].astype(np.int8),
+        "posteam": plays["posteam"].astype(TEAM_CODES),
+        "defteam": plays["defteam"].astype(TEAM_CODES),
+        "epa": plays["epa"].astype(np.float32),
+        "yards_gained": plays["yards_gained"].astype(np.float32),
+    })
+    for flag in FLAGS:
+        out[flag] = plays[flag].fillna(0).astype(np.int8)
+    return out
+
+
+def iter_pbp(seasons, fetch=None, memory_mb: float = None, batch_rows: int = None, columns=PBP_COLUMNS):
+    """
+    Yield (season, compact batch) over the play-by-play of each season, one batch at a time.
+    batch_rows = 0 sizes batches so a raw batch plus its working copies stay within memory_mb.
+    """
+    import pyarrow.parquet as pq
+    settings = {**SETTINGS, **load_config().get("pbp", {})}
+    memory_mb = memory_mb or settings["memory_mb"]
+    batch_rows = batch_rows or settings["batch_rows"]
+    for season in seasons:
+        path = cached_file("pbp", fetch or fetch_pbp, season)
+        if path is None:
+            continue
+        if not path.endswith(".parquet"):   # pickle fallback of the cache: no row-group access
+            plays = pd.read_pickle(path)
+            rows = batch_rows or len(plays)
+            for start in range(0, len(plays), rows):
+                yield season, compact(plays.iloc[start:start + rows])
+            continue
+        source = pq.ParquetFile(path)
+        present = [c for c in columns if c in source.schema_arrow.names]
+        rows = batch_rows or _batch_rows(source, present, memory_mb)
+        for batch in source.iter_batches(batch_size=rows, columns=present):
+            plays = batch.to_pandas()
+            if "season" not in plays.columns:
+                plays["season"] = season
+            yield season, compact(plays)
+
+
+def _batch_rows(source, columns, memory_mb: float) -> int:
+    """Rows per batch: a quarter of the budget for the raw batch (pandas copies + group-by take the rest)."""
+    probe = next(source.iter_batches(batch_size=1024, columns=columns)).to_pandas()
+    per_row = probe.memory_usage(deep=True, index=False).sum() / max(len(probe), 1)
+    return max(1024, int(memory_mb * 2 ** 20 / 4 / per_row))
+
+
+def _side_sums(plays: pd.DataFrame, team: str) -> pd.DataFrame:
+    """Sums per (game_id, team) with `team` = posteam (offense) or defteam (defense)."""
+    scrimmage = plays[(plays["pass"] == 1) | (plays["rush"] == 1)]
+    passing = scrimmage["pass"] == 1
+    sums = pd.DataFrame({
+        "game_id": scrimmage["game_id"],
+        "team": scrimmage[team],
+        "plays": np.ones(len(scrimmage), dtype=np.int32),
+        "epa": scrimmage["epa"].fillna(0).astype(np.float64),
+        "success": scrimmage["success"],
+        "pass_plays": passing.astype(np.int32),
+        "pass_epa": scrimmage["epa"].where(passing, 0).fillna(0).astype(np.float64),
+        "rush_plays": (~passing).astype(np.int32),
+        "rush_epa": scrimmage["epa"].where(~passing, 0).fillna(0).astype(np.float64),
+        "explosive": (scrimmage["yards_gained"] >= EXPLOSIVE_YARDS).astype(np.int32),
+        "sacks": scrimmage["sack"],
+        "turnovers": scrimmage["interception"] + scrimmage["fumble_lost"],
+    })
+    return sums.groupby(["game_id", "team"], observed=True)[SUMS].sum()
+
+
+class PbpAggregator:
+    """Running per (game, team) sums for one season; fixed size (~2 rows per game) whatever the batch count."""
+
+    def __init__(self):
+        self.offense, self.defense, self.games, self.rows = None, None, [], 0
+
+    @staticmethod
+    def _add(total, part):
+        if total is None:
+            return part
+        return total.add(part, fill_value=0)
+
+    def update(self, plays: pd.DataFrame):
+        self.offense = self._add(self.offense, _side_sums(plays, "posteam"))
+        self.defense = self._add(self.defense, _side_sums(plays, "defteam"))
+        self.games.append(plays[["game_id", "season", "week"]].drop_duplicates("game_id"))
+        self.rows += len(plays)
+        return self
+
+    def team_games(self, schedule: pd.DataFrame = None) -> pd.DataFrame:
+        """
+        One row per team-game: keys (season, week, game_id, gameday, team, opponent, home)
+        + off_/def_ rates and turnovers.
+        schedule (game_id, home_team, away_team, gameday) adds opponent / home / gameday when given.
+        """
+        if self.offense is None:
+            return pd.DataFrame()
+        frames = {}
+        for side, sums in (("off", self.offense), ("def", self.defense)):
+            rates = {f"{side}_{name}": sums[num] / sums[den].where(sums[den] > 0) for name, (num, den) in RATES.items()}
+            rates[f"{side}_plays"] = sums["plays"]
+            rates[f"{side}_turnovers"] = sums["turnovers"]
+            frames[side] = pd.DataFrame(rates)
+        out = frames["off"].join(frames["def"], how="outer").astype(np.float32).reset_index()
+
+        games = pd.concat(self.games).drop_duplicates("game_id").astype({"game_id": str})
+        out = out.astype({"game_id": str}).merge(games, on="game_id", how="left")
+        if schedule is not None:
+            sides = schedule[[c for c in ("game_id", "gameday", "home_team", "away_team") if c in schedule.columns]]
+            out = out.merge(sides, on="game_id", how="left")
+            out["home"] = (out["team"].astype(str) == out["home_team"]).astype(np.int8)
+            out["opponent"] = np.where(out["home"] == 1, out["away_team"], out["home_team"])
+            out = out.drop(columns=["home_team", "away_team"])
+        keys = ["season", "week", "game_id"] + [c for c in ("gameday",) if c in out.columns] + ["team"]
+        keys += [c for c in ("opponent", "home") if c in out.columns]
+        out = out[keys + [c for c in out.columns if c not in keys]]
+        out["team"] = out["team"].astype(TEAM_CODES)
+        if "opponent" in out.columns:
+            out["opponent"] = out["opponent"].astype(TEAM_CODES)
+        return out.sort_values(["season", "week", "game_id", "team"]).reset_index(drop=True)
+
+
+def aggregate_season(batches, schedule: pd.DataFrame = None) -> tuple:
+    """Fold a season's batches into team-game rows; returns (rows, plays read, largest batch in MB)."""
+    aggregator, peak = PbpAggregator(), 0.0
+    for plays in batches:
+        with metrics.span("pbp_batch"):
+            aggregator.update(plays)
+        peak = max(peak, plays.memory_usage(deep=True, index=False).sum() / 2 ** 20)
+        metrics.incr("pbp_rows", len(plays))
+    return aggregator.team_games(schedule), aggregator.rows, peak
+
+
+def build_pbp_features(seasons, db_path: str = DB_PATH, incremental: bool = False, fetch=None,
+                       schedules=None, **overrides) -> int:
+    """
+    Stream play-by-play season by season and upsert each season's team-game rows into
+    pbp_team_games (and its feature store). incremental=True skips finished seasons already stored.
+    schedules(seasons) -> frame with game_id / home_team / away_team (defaults to the cached nflverse schedules).
+    Returns the number of team-game rows written.
+    """
+    from itertools import groupby
+    from src.Utils.tools import stale_seasons, upsert_partitions
+
+    current_season = load_config()["data"]["current_season"]
+    seasons = list(seasons)
+    if incremental:
+        seasons = stale_seasons(seasons, TABLE, current_season, db_path)
+        if not seasons:
+            print(f"[pbp_features] {TABLE} is up to date.")
+            return 0
+    if schedules is None:
+        from src.DataProviders.NFLDataProvider import import_schedules as schedules
+
+    written = 0
+    for season, batches in groupby(iter_pbp(seasons, fetch, **overrides), key=lambda item: item[0]):
+        rows, n_plays, peak = aggregate_season((plays for _, plays in batches), schedules([season]))
+        if rows.empty:
+            continue
+        weeks = rows["week"].unique()
+        complete = {(int(season), int(w)): season < current_season for w in weeks}
+        upsert_partitions(rows, TABLE, complete, db_path)
+        written += len(rows)
+        print(f"[pbp_features] {season}: {n_plays} plays -> {len(rows)} team-games "
+              f"(largest batch {peak:.1f} MB)")
+    return written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream play-by-play into per team-game features (pbp_team_games)")
+    parser.add_argument("--seasons", type=int, nargs=2, metavar=("FIRST", "LAST"))
+    parser.add_argument("--incremental", action="store_true", help="Skip finished seasons already stored")
+    parser.add_argument("--memory-mb", type=float, help="Memory budget for one batch of plays")
+    args = parser.parse_args()
+    config_seasons = load_config()["data"]["seasons"]
+    first, last = args.seasons or (min(config_seasons), max(config_seasons))
+    overrides = {"memory_mb": args.memory_mb} if args.memory_mb else {}
+    build_pbp_features(range(first, last + 1), incremental=args.incremental, **overrides)
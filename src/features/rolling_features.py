@@ -0,0 +1,208 @@
+"""
+As-of team feature engine
+- Keeps running per-team aggregates in flat NumPy arrays (one slot per franchise):
+  EWMA offensive EPA/play, rolling points per game, last game date and last game site
+- A week enters the state once none of its games is still upcoming (past games without a
+  score, e.g. cancelled, are skipped); each update touches only the teams that played (O(teams) per week)
+- Features for a game are a gather from the state *before* that game, so nothing
+  from the game itself or later weeks leaks in
+- The state is saved next to the feature store, so today's slate only has to apply
+  the weeks completed since the last build
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.Utils.Dictionaries import franchise_codes, team_coordinates
+
+TEAM_FEATURES = ["epa", "ppg", "rest", "travel"]
+
+
+def haversine_miles(lat1, lon1, lat2, lon2) -> np.ndarray:
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(a, dtype=float)) for a in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 3958.8 * 2 * np.arcsin(np.sqrt(a))
+
+
+def _days(gameday) -> np.ndarray:
+    return pd.to_datetime(pd.Series(gameday)).to_numpy().astype("datetime64[D]").astype(np.int64)
+
+
+def weekly_team_epa(weekly: pd.DataFrame) -> pd.DataFrame:
+    """Per-game offensive EPA/play from nflverse weekly player stats -> (season, week, team, epa)."""
+    plays = weekly["attempts"].fillna(0) + weekly["sacks"].fillna(0) + weekly["carries"].fillna(0)
+    epa = weekly["passing_epa"].fillna(0) + weekly["rushing_epa"].fillna(0)
+    totals = pd.DataFrame({
+        "season": weekly["season"], "week": weekly["week"], "team": weekly["recent_team"],
+        "epa": epa, "plays": plays,
+    }).groupby(["season", "week", "team"], as_index=False).sum()
+    totals["epa"] = totals["epa"] / totals["plays"].where(totals["plays"] > 0)
+    return totals[["season", "week", "team", "epa"]]
+
+
+def team_games(games: pd.DataFrame, team_epa: pd.DataFrame = None) -> pd.DataFrame:
+    """
+    One row per team per game: game_id, season, week, gameday, team, is_home, points, epa, lat, lon.
+    The game site is the home team's stadium (neutral-site games are approximated the same way).
+    """
+    site = games["home_team"].map(team_coordinates)
+    sides = []
+    for side in ("home", "away"):
+        rows = pd.DataFrame({
+            "game_id": games["game_id"].to_numpy(),
+            "season": games["season"].to_numpy(),
+            "week": games["week"].to_numpy(),
+            "gameday": games["gameday"].to_numpy(),
+            "team": games[f"{side}_team"].to_numpy(),
+            "is_home": side == "home",
+            "points": games[f"{side}_score"].to_numpy(dtype=float),
+        })
+        rows["lat"] = [s[0] if isinstance(s, tuple) else np.nan for s in site]
+        rows["lon"] = [s[1] if isinstance(s, tuple) else np.nan for s in site]
+        sides.append(rows)
+    rows = pd.concat(sides, ignore_index=True)
+
+    if team_epa is not None:
+        rows = rows.merge(team_epa, on=["season", "week", "team"], how="left")
+    else:
+        rows["epa"] = np.nan
+    return rows.sort_values(["season", "week", "gameday", "game_id", "is_home"], ignore_index=True)
+
+
+class TeamFeatureEngine:
+    """Running per-franchise aggregates; see module docstring."""
+
+    def __init__(self, alpha: float = 0.3, window: int = 8, max_rest: int = 14):
+        self.alpha, self.window, self.max_rest = alpha, window, max_rest
+        self.teams = {}
+        self.epa = np.empty(0)
+        self.points = np.empty((0, window))
+        self.games = np.empty(0, dtype=np.int64)
+        self.last_day = np.empty(0, dtype=np.int64)
+        self.last_site = np.empty((0, 2))
+        self.applied = 0   # season * 100 + week of the last week in the state
+
+    def _index(self, teams) -> np.ndarray:
+        """Franchise slots for team codes, growing the state arrays for new franchises."""
+        codes = [franchise_codes.get(t, t) for t in teams]
+        new = [c for c in dict.fromkeys(codes) if c not in self.teams]
+        if new:
+            n = len(new)
+            self.teams.update({c: len(self.teams) + i for i, c in enumerate(new)})
+            self.epa = np.r_[self.epa, np.full(n, np.nan)]
+            self.points = np.vstack([self.points, np.full((n, self.window), np.nan)])
+            self.games = np.r_[self.games, np.zeros(n, dtype=np.int64)]
+            self.last_day = np.r_[self.last_day, np.zeros(n, dtype=np.int64)]
+            home = np.array([team_coordinates.get(c, (np.nan, np.nan)) for c in new], dtype=float)
+            self.last_site = np.vstack([self.last_site, home])
+        return np.fromiter((self.teams[c] for c in codes), dtype=np.int64, count=len(codes))
+
+    def snapshot(self, rows: pd.DataFrame) -> pd.DataFrame:
+        """As-of features (epa, ppg, rest, travel) for team-game rows, from the current state."""
+        idx = self._index(rows["team"])
+        days = _days(rows["gameday"])
+        played = self.games[idx] > 0
+        rest = np.where(played, np.minimum(days - self.last_day[idx], self.max_rest), self.max_rest)
+        counts = np.minimum(self.games[idx], self.window)
+        ppg = np.nansum(self.points[idx], axis=1) / np.where(played, counts, np.nan)
+        return pd.DataFrame({
+            "epa": self.epa[idx],
+            "ppg": ppg,
+            "rest": rest.astype(float),
+            "travel": haversine_miles(self.last_site[idx, 0], self.last_site[idx, 1], rows["lat"], rows["lon"]),
+        }, index=rows.index)
+
+    def update(self, rows: pd.DataFrame):
+        """Fold one completed week of team-game rows into the state."""
+        idx = self._index(rows["team"])
+        epa = rows["epa"].to_numpy(dtype=float)
+        old = self.epa[idx]
+        blended = np.where(np.isnan(old), epa, self.alpha * epa + (1 - self.alpha) * old)
+        self.epa[idx] = np.where(np.isnan(epa), old, blended)
+        self.points[idx, self.games[idx] % self.window] = rows["points"].to_numpy(dtype=float)
+        self.games[idx] += 1
+        self.last_day[idx] = _days(rows["gameday"])
+        self.last_site[idx] = rows[["lat", "lon"]].to_numpy(dtype=float)
+        self.applied = max(self.applied, int(rows["season"].iloc[0]) * 100 + int(rows["week"].iloc[0]))
+
+    def replay(self, rows: pd.DataFrame, today=None) -> pd.DataFrame:
+        """
+        Walk team-game rows week by week: snapshot each week, then fold in its scored games.
+        Folding stops at the first week that still has upcoming games (unscored, dated today or
+        later) so it is picked up again once played; unscored games dated before today (cancelled,
+        missing scores) are skipped. Weeks already in the state are skipped.
+        Returns the snapshots, indexed like rows.
+        """
+        today = _days([pd.Timestamp(today) if today is not None else pd.Timestamp.now().normalize()])[0]
+        rows = rows[rows["season"] * 100 + rows["week"] > self.applied]
+        out, folding = [], True
+        for (season, week_no), week in rows.groupby(["season", "week"], sort=True):
+            out.append(self.snapshot(week))
+            scored = week["points"].notna().to_numpy()
+            folding = folding and not (~scored & (_days(week["gameday"]) >= today)).any()
+            if folding:
+                if scored.any():
+                    self.update(week[scored])
+                self.applied = max(self.applied, int(season) * 100 + int(week_no))
+        return pd.concat(out) if out else pd.DataFrame(columns=TEAM_FEATURES, dtype=float)
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.tmp.npz"
+        np.savez(tmp, teams=np.array(list(self.teams), dtype=str), epa=self.epa, points=self.points,
+                 games=self.games, last_day=self.last_day, last_site=self.last_site,
+                 settings=np.array([self.alpha, self.window, self.max_rest, self.applied], dtype=float))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str):
+        with np.load(path) as state:
+            alpha, window, max_rest, applied = state["settings"]
+            engine = cls(float(alpha), int(window), int(max_rest))
+            engine.teams = {t: i for i, t in enumerate(state["teams"].tolist())}
+            engine.epa, engine.points = state["epa"], state["points"]
+            engine.games, engine.last_day = state["games"], state["last_day"]
+            engine.last_site, engine.applied = state["last_site"], int(applied)
+        return engine
+
+
+def engine_from_config(config: dict) -> TeamFeatureEngine:
+    settings = config.get("features", {}).get("rolling", {})
+    return TeamFeatureEngine(settings.get("ewma_alpha", 0.3), settings.get("ppg_window", 8),
+                             settings.get("max_rest", 14))
+
+
+def add_team_features(games: pd.DataFrame, rows: pd.DataFrame, snapshots: pd.DataFrame) -> pd.DataFrame:
+    """Pivot team-game snapshots onto games as home_/away_ columns plus the diffs."""
+    snap = rows.loc[snapshots.index, ["game_id", "is_home"]].join(snapshots)
+    for side, is_home in (("home", True), ("away", False)):
+        part = snap[snap["is_home"] == is_home].drop(columns="is_home")
+        games = games.merge(part.rename(columns={f: f"{side}_{f}" for f in TEAM_FEATURES}), on="game_id", how="left")
+    games["epa_diff"] = games["home_epa"] - games["away_epa"]
+    games["ppg_diff"] = games["home_ppg"] - games["away_ppg"]
+    games["rest_diff"] = games["home_rest"] - games["away_rest"]
+    return games
+
+
+def as_of_features(games: pd.DataFrame, history: pd.DataFrame, engine: TeamFeatureEngine = None,
+                   state_path: str = None, today=None):
+    """
+    Point-in-time team features for `games` (which need game_id).
+    `history` holds the team-game rows the state learns from, the games' own rows included.
+    A fresh engine replays all of history (historical builds); a loaded engine only replays the
+    weeks after engine.applied, so scoring the next slate costs O(teams) per newly completed week.
+    Returns (games with home_/away_ features, engine); the state is saved to state_path if given.
+    today (default: now) separates upcoming games from past games without a score.
+    """
+    engine = engine or TeamFeatureEngine()
+    snapshots = engine.replay(history, today)
+    wanted = history[history["game_id"].isin(games["game_id"])]
+    missing = wanted.index.difference(snapshots.index)
+    if len(missing):
+        # games from weeks already folded into a loaded state: read the current state
+        snapshots = pd.concat([snapshots, engine.snapshot(wanted.loc[missing])])
+    if state_path:
+        engine.save(state_path)
+    return add_team_features(games, history, snapshots.loc[wanted.index]), engine